@@ -0,0 +1,73 @@
+"""bench_luadata.py
+
+Compares reading the Lua 'data' table one attribute at a time through
+LuaTable objects against the bulk export in ProtoReader.luaData.
+
+Usage: python benchmarks/bench_luadata.py PROTOTYPES_DIR [REPEAT]
+"""
+
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio.prototype import FIELDS, ProtoReader, Prototypes
+
+def perAttribute(reader: ProtoReader, subdir: str) -> int:
+  """Touch every attribute initialize() used to read through LuaTable."""
+  data = reader.lua.globals().data
+  n = 0
+  for key, table in data.items():
+    if key == 'extend':
+      continue
+    n += 1
+    if subdir == 'item':
+      if table.flags and 'hidden' in table.flags.values():
+        continue
+      table.name, table.type, table.group, table.subgroup, table.order
+      table.fuel_value
+    elif subdir == 'fluid':
+      (table.name, table.default_temperature, table.max_temperature,
+       table.heat_capacity, table.order)
+    else:
+      table.name
+      for variant in (table.normal or table, table.expensive):
+        if not variant:
+          continue
+        for x in variant.ingredients.values():
+          x[1] or x.name, x[2] or x.amount
+        if variant.result:
+          variant.result, variant.result_count
+        elif variant.results:
+          for x in variant.results.values():
+            x.name, x.amount, x.probability
+        variant.energy_required
+  return n
+
+def bulk(reader: ProtoReader, subdir: str) -> int:
+  return len(reader.luaData())
+
+def bulkFields(reader: ProtoReader, subdir: str) -> int:
+  return len(reader.luaData(FIELDS[subdir]))
+
+def main(protoPath: Path, repeat: int):
+  reader = ProtoReader(protoPath, Prototypes())
+  print(f'{"subdir":<8} {"tables":>7} {"per-attribute":>14} {"bulk":>10} '
+        f'{"bulk+fields":>12} {"speedup":>8}')
+  for subdir in ('item', 'fluid', 'recipe'):
+    reader.loadPrototypes(subdir)
+    n = bulk(reader, subdir)
+    times = [
+      min(timeit.repeat(lambda: func(reader, subdir), number=1,
+                        repeat=repeat))
+      for func in (perAttribute, bulk, bulkFields)
+    ]
+    print(f'{subdir:<8} {n:>7} {times[0] * 1e3:>12.2f}ms '
+          f'{times[1] * 1e3:>8.2f}ms {times[2] * 1e3:>10.2f}ms '
+          f'{times[0] / times[2]:>7.1f}x')
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2:
+    sys.exit(__doc__.strip())
+  main(Path(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 20)
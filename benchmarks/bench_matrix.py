@@ -0,0 +1,49 @@
+"""bench_matrix.py
+
+Times MatrixSolver.balance on a prototypes tree: compiling the Prototypes
+and building the recipe matrix, balancing every product on its own, and
+balancing all of them at once.
+
+Usage: python benchmarks/bench_matrix.py PROTOTYPES_DIR [REPEAT]
+"""
+
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import prototype
+from factoratio.compiled import CompiledPrototypes
+from factoratio.matrix import MatrixSolver, RecipeMatrix
+
+def main(protoPath: Path, repeat: int):
+  prototypes = prototype.initialize(protoPath)
+  solver = MatrixSolver(prototypes)
+
+  def build():
+    return RecipeMatrix(CompiledPrototypes(prototypes))
+
+  matrix = solver.matrix()
+  targets = [name for name in prototypes.recipes
+             if name in matrix.itemIndex and name not in solver.raw]
+
+  def each():
+    for name in targets:
+      solver.balance({name: 1})
+
+  def together():
+    return solver.balance(dict.fromkeys(targets, 1))
+
+  print(f'{matrix!r}, {len(targets)} targets, '
+        f'{len(together().crafts)} recipes in the combined plan')
+  for label, func, number in (('build matrix', build, 1),
+                              ('balance each', each, 1),
+                              ('balance all', together, 1)):
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    print(f'{label:<14} {best * 1e3:>10.2f}ms')
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2:
+    sys.exit(__doc__.strip())
+  main(Path(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 3)
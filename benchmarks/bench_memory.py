@@ -0,0 +1,71 @@
+"""bench_memory.py
+
+Measures the memory held by a full prototype load: how many Items, Fluids,
+Ingredients, Recipes, Fuels and unit numbers it creates, the size of each,
+attribute storage included, and the memory the loaded Prototypes retain.
+
+Usage: python benchmarks/bench_memory.py PROTOTYPES_DIR
+"""
+
+import gc
+from pathlib import Path
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import prototype
+from factoratio.producer import baseModules
+
+def sizeof(obj) -> int:
+  """Return the size of an object, including its attribute dict if any."""
+  size = sys.getsizeof(obj)
+  if hasattr(obj, '__dict__'):
+    size += sys.getsizeof(obj.__dict__)
+  return size
+
+def collect(prototypes: prototype.Prototypes) -> dict:
+  """Return the objects of a prototype load by class name, deduplicated."""
+  objects = {}
+  def add(obj):
+    objects.setdefault(type(obj).__name__, {})[id(obj)] = obj
+  for obj in [*prototypes.items.values(), *prototypes.fluids.values(),
+              *baseModules.values()]:
+    add(obj)
+  for fuel in prototypes.fuels.values():
+    add(fuel)
+    add(fuel.energy)
+  for fluid in prototypes.fluids.values():
+    if fluid.heat_capacity is not None:
+      add(fluid.heat_capacity)
+  for recipe in prototypes.recipes.values():
+    for variant in (recipe, recipe.expensive()):
+      if variant is not None:
+        add(variant)
+        for ingredient in (*variant.input, *variant.output):
+          add(ingredient)
+  return objects
+
+def main(protoPath: Path):
+  gc.collect()
+  tracemalloc.start()
+  before = tracemalloc.get_traced_memory()[0]
+  prototypes = prototype.initialize(protoPath, useCache=False, parallel=False)
+  gc.collect()
+  retained = tracemalloc.get_traced_memory()[0] - before
+  tracemalloc.stop()
+
+  total = 0
+  print(f"{'class':<16} {'count':>8} {'bytes each':>11} {'total':>12}")
+  for name, objs in sorted(collect(prototypes).items()):
+    size = sum(map(sizeof, objs.values()))
+    total += size
+    print(f'{name:<16} {len(objs):>8} {size / len(objs):>11.1f} '
+          f'{size / 1024:>10.1f}KB')
+  print(f'objects total {total / 1024:.1f}KB; Prototypes retain '
+        f'{retained / 1024:.1f}KB, definition tables included')
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2:
+    sys.exit(__doc__.strip())
+  main(Path(sys.argv[1]))
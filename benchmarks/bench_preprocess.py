@@ -0,0 +1,70 @@
+"""bench_preprocess.py
+
+Compares the old line-by-line preprocessing of prototype definition files
+against prototype.preprocess, on large generated files.
+
+Usage: python benchmarks/bench_preprocess.py [NPROTOTYPES [REPEAT]]
+"""
+
+from pathlib import Path
+import re
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import factoratio.prototype as prototype
+
+def generate(path: Path, nPrototypes: int):
+  """Write a definition file with nPrototypes recipe-like tables."""
+  with path.open('w') as f:
+    f.write('local sounds = require("prototypes.entity.sounds")\n')
+    f.write('data:extend(\n{\n')
+    for i in range(nPrototypes):
+      f.write('  {\n'
+              '    type = "recipe",\n'
+              f'    name = "recipe-{i}",\n'
+              '    energy_required = 0.5,\n'
+              f'    ingredients = {{{{"item-{i}", 1}}, {{"item-{i + 1}", 2}}}},\n'
+              f'    result = "item-{i + 2}",\n')
+      if i % 100 == 0:
+        f.write('    working_sound = require("prototypes.sounds").furnace,\n')
+      f.write('  },\n')
+    f.write('})\n')
+
+def legacy(path: Path) -> str:
+  """The loop ProtoReader.loadPrototypes used before preprocess."""
+  code = ''
+  with path.open() as p:
+    for line in p:
+      if not re.search(r'= require\(', line):
+        code += line
+  return code
+
+def cold(path: Path) -> str:
+  prototype._preprocessed.clear()
+  return prototype.preprocess(path.read_bytes())[1]
+
+def warm(path: Path) -> str:
+  return prototype.preprocess(path.read_bytes())[1]
+
+def main(sizes, repeat: int):
+  print(f'{"prototypes":>10} {"size":>9} {"legacy":>10} {"cold":>10} '
+        f'{"warm":>10} {"speedup":>8}')
+  with tempfile.TemporaryDirectory() as tmp:
+    for n in sizes:
+      path = Path(tmp) / f'recipe-{n}.lua'
+      generate(path, n)
+      assert legacy(path) == cold(path)
+      times = [
+        min(timeit.repeat(lambda: func(path), number=1, repeat=repeat))
+        for func in (legacy, cold, warm)
+      ]
+      print(f'{n:>10} {path.stat().st_size / 1024:>7.0f}kB '
+            f'{times[0] * 1e3:>8.2f}ms {times[1] * 1e3:>8.2f}ms '
+            f'{times[2] * 1e3:>8.2f}ms {times[0] / times[1]:>7.1f}x')
+
+if __name__ == '__main__':
+  sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [1000, 10000, 100000]
+  main(sizes, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
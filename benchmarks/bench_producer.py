@@ -0,0 +1,59 @@
+"""bench_producer.py
+
+Times the Producer calls made for every step of a planning query: craft,
+productionRateInverse and rates, on a fully moduled assembling machine. Then
+compares sweeping every module loadout and a range of counts through rates
+one combination at a time against a single batchRates call.
+
+Usage: python benchmarks/bench_producer.py [NINGREDIENTS [REPEAT]]
+"""
+
+import itertools
+from pathlib import Path
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import producer
+from factoratio.item import Ingredient, Item, Recipe
+from factoratio.producer import Module, effectsArray
+
+def main(nIngredients: int, repeat: int):
+  assembler = producer.base['Assembler3']
+  speed = Module('Speed', 3, 0.7, 0.5, 0, 0.07)
+  productivity = Module('Productivity', 3, 0.8, -0.15, 0.1, 0.1)
+  assembler.modules = [speed, speed, productivity, productivity]
+  items = [Item(f'item-{i}', 'item', None, 'a') for i in range(nIngredients + 1)]
+  recipe = Recipe(1, [Ingredient(x, 2) for x in items[:-1]],
+                  [Ingredient(items[-1], 1)])
+  number = 10000
+  for label, func in (
+      ('craft', lambda: assembler.craft(recipe)),
+      ('productionRateInverse',
+       lambda: assembler.productionRateInverse(recipe, items[-1].name, 10)),
+      ('rates', lambda: assembler.rates(recipe, 10))):
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f'{label:<22} {best * 1e6:>8.2f}us')
+
+  efficiency = Module('Efficiency', 3, -0.5, 0, 0, 0)
+  loadouts = list(itertools.product((None, speed, productivity, efficiency),
+                                    repeat=assembler.maxSlots)) * 40
+  counts = list(range(1, len(loadouts) + 1))
+
+  def scalar():
+    for modules, count in zip(loadouts, counts):
+      assembler.modules = modules
+      assembler.rates(recipe, count)
+
+  def batch():
+    assembler.batchRates(recipe, counts, effectsArray(loadouts))
+
+  times = [min(timeit.repeat(func, number=1, repeat=repeat))
+           for func in (scalar, batch)]
+  print(f'sweep of {len(loadouts)}: rates {times[0] * 1e3:.2f}ms, '
+        f'batchRates {times[1] * 1e3:.2f}ms, {times[0] / times[1]:.0f}x')
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 6,
+       int(sys.argv[2]) if len(sys.argv) > 2 else 5)
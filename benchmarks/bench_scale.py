@@ -0,0 +1,69 @@
+"""bench_scale.py
+
+Times the loader and the solvers on synthetic prototype trees at multiples of
+vanilla size; see synthetic.py. For each scale: loading the Lua definitions,
+loading from the prototype cache, compiling the Prototypes, and solving a
+chain for top-tier products with Solver and MatrixSolver.
+
+Usage: python benchmarks/bench_scale.py [SCALE...]
+
+SCALE defaults to 1 10 100.
+"""
+
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import prototype
+from factoratio.matrix import MatrixSolver
+from factoratio.solver import Solver
+from synthetic import Spec, generate
+
+# The number of top-tier products solved for at each scale
+TARGETS = 50
+
+def timed(func):
+  """Call func; return its result and the time it took."""
+  start = time.perf_counter()
+  result = func()
+  return result, time.perf_counter() - start
+
+def main(scales):
+  print(f"{'scale':>6} {'recipes':>8} {'load':>9} {'cached':>9} "
+        f"{'compile':>9} {'solve':>9} {'balance':>9}")
+  for scale in scales:
+    spec = Spec().scaled(scale)
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      generate(path, spec)
+      protoPath = path / 'prototypes'
+      prototypes, load = timed(lambda: prototype.initialize(
+        protoPath, useCache=False, parallel=False))
+      cachePath = path / prototype.CACHE_NAME
+      digest = prototype.fingerprint(protoPath)
+      prototype.writeCache(cachePath, digest, prototypes)
+      _, cached = timed(lambda: prototype.readCache(cachePath, digest))
+
+    _, compile_ = timed(lambda: prototypes.compiled())
+    top = list(prototypes.subgroups[f'tier-{spec.depth}'])[:TARGETS]
+    solver = Solver(prototypes)
+    _, solve = timed(lambda: [solver.solve(name, 1) for name in top])
+
+    matrixSolver = MatrixSolver(prototypes)
+    def balance():
+      for name in top:
+        try:
+          matrixSolver.balance({name: 1})
+        except ValueError as err:
+          # Solver handles every target, so neither should fail
+          sys.exit(f"{scale:g}x: balancing '{name}' failed: {err}")
+    _, balanced = timed(balance)
+    print(f'{scale:>5g}x {len(prototypes.recipes):>8} {load * 1e3:>7.0f}ms '
+          f'{cached * 1e3:>7.0f}ms {compile_ * 1e3:>7.0f}ms '
+          f'{solve * 1e3:>7.0f}ms {balanced * 1e3:>7.0f}ms')
+
+if __name__ == '__main__':
+  main([float(x) for x in sys.argv[1:]] or [1, 10, 100])
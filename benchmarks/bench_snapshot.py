@@ -0,0 +1,83 @@
+"""bench_snapshot.py
+
+Compares the two ways a worker process can get its Prototypes, on synthetic
+prototype trees at multiples of vanilla size; see synthetic.py: unpickling
+its own copy, as a worker pool does with Prototypes passed to it, or opening
+a shared snapshot; see snapshot.py. For each scale: the size of the pickle
+and of the snapshot, the time to write the snapshot, the time to get the
+Prototypes in the worker, the memory that allocates, and the time of the
+first solves, which build whatever a snapshot builds lazily.
+
+Usage: python benchmarks/bench_snapshot.py [SCALE...]
+
+SCALE defaults to 1 10 100.
+"""
+
+import gc
+from pathlib import Path
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import prototype, snapshot
+from factoratio.solver import Solver
+from synthetic import Spec, generate
+
+# The number of top-tier products solved for at each scale
+TARGETS = 50
+
+def timed(func):
+  """Call func; return its result and the time it took."""
+  start = time.perf_counter()
+  result = func()
+  return result, time.perf_counter() - start
+
+def allocated(func):
+  """Call func; return its result and the memory it left allocated."""
+  gc.collect()
+  tracemalloc.start()
+  try:
+    result = func()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0]
+  finally:
+    tracemalloc.stop()
+
+def main(scales):
+  print(f"{'scale':>6} {'':>8} {'size':>9} {'write':>9} {'open':>9} "
+        f"{'memory':>9} {'solve':>9}")
+  for scale in scales:
+    spec = Spec().scaled(scale)
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      generate(path, spec)
+      prototypes = prototype.initialize(path / 'prototypes', useCache=False,
+                                        parallel=False)
+      top = list(prototypes.subgroups[f'tier-{spec.depth}'])[:TARGETS]
+
+      data, dump = timed(lambda: pickle.dumps(prototypes,
+                                              pickle.HIGHEST_PROTOCOL))
+      snapshotPath = path / 'prototypes.snapshot'
+      _, write = timed(lambda: snapshot.write(snapshotPath, prototypes))
+
+      cases = (('pickle', len(data), dump, lambda: pickle.loads(data)),
+               ('snapshot', snapshotPath.stat().st_size, write,
+                lambda: snapshot.load(snapshotPath)))
+      for name, size, written, open_ in cases:
+        _, memory = allocated(open_)
+        copy, opened = timed(open_)
+        solver = Solver(copy)
+        _, solve = timed(lambda solver=solver: [solver.solve(x, 1)
+                                                for x in top])
+        label = f'{scale:>5g}x' if name == 'pickle' else ''
+        print(f'{label:>6} {name:>8} {size / 1024:>7.0f}KB '
+              f'{written * 1e3:>7.1f}ms {opened * 1e3:>7.1f}ms '
+              f'{memory / 1024:>7.0f}KB {solve * 1e3:>7.0f}ms')
+        del copy, solver
+
+if __name__ == '__main__':
+  main([float(x) for x in sys.argv[1:]] or [1, 10, 100])
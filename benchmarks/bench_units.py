@@ -0,0 +1,47 @@
+"""bench_units.py
+
+Times parsing the unit strings found in prototype definitions, e.g. '150kW'
+or '4MJ': one at a time without the parse cache, one at a time with it, and
+in bulk. With a prototypes tree, also loads it and reports how often the
+parse cache was hit.
+
+Usage: python benchmarks/bench_units.py [PROTOTYPES_DIR [REPEAT]]
+"""
+
+from pathlib import Path
+import random
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import prototype
+from factoratio.util import Joule, parseUnits, parseUnitsMany
+
+def main(protoPath: Path, repeat: int):
+  # Few distinct values repeated many times, as in real prototypes
+  random.seed(0)
+  distinct = [f'{random.choice((1, 2, 4, 5, 8, 12, 25, 100))}'
+              f'{random.choice(("", ".5"))}{random.choice("kMG")}J'
+              for _ in range(40)]
+  strings = [random.choice(distinct) for _ in range(20000)]
+  uncached = parseUnits.__wrapped__
+
+  for label, func in (
+      ('uncached', lambda: [uncached(x, 'J') for x in strings]),
+      ('cached', lambda: [parseUnits(x, 'J') for x in strings]),
+      ('Joule objects', lambda: [Joule(x) for x in strings]),
+      ('parseUnitsMany', lambda: parseUnitsMany(strings, 'J'))):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'{label:<15} {best * 1e3:>8.2f}ms for {len(strings)} strings')
+
+  if protoPath is not None:
+    parseUnits.cache_clear()
+    prototype.initialize(protoPath, useCache=False, parallel=False)
+    info = parseUnits.cache_info()
+    print(f'prototype load: {info.hits} cache hits, {info.misses} misses, '
+          f'{info.currsize} strings cached')
+
+if __name__ == '__main__':
+  main(Path(sys.argv[1]) if len(sys.argv) > 1 else None,
+       int(sys.argv[2]) if len(sys.argv) > 2 else 5)
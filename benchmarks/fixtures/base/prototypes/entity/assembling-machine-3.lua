@@ -0,0 +1,26 @@
+require ("prototypes.entity.demo-pipecovers")
+require ("circuit-connector-sprites")
+local hit_effects = require ("prototypes.entity.demo-hit-effects")
+local sounds = require ("prototypes.entity.demo-sounds")
+
+data:extend(
+{
+  {
+    type = "assembling-machine",
+    name = "assembling-machine-3",
+    flags = {"placeable-neutral", "placeable-player", "player-creation"},
+    damaged_trigger_effect = hit_effects.entity(),
+    open_sound = sounds.machine_open,
+    close_sound = sounds.machine_close,
+    crafting_categories = {"basic-crafting", "crafting", "advanced-crafting", "crafting-with-fluid"},
+    crafting_speed = 1.25,
+    energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 2},
+    energy_usage = "375kW",
+    module_specification = {module_slots = 4},
+    fluid_boxes = {{production_type = "input", pipe_covers = pipecoverspictures(), base_area = 10}},
+    circuit_wire_connection_points = circuit_connector_definitions.create(universal_connector_template,
+      {{variation = 18, shadow_offset = {2, 2}}}),
+    circuit_wire_max_distance = default_circuit_wire_max_distance,
+    animation = util.empty_sprite()
+  }
+})
@@ -0,0 +1,14 @@
+local hit_effects = {}
+
+hit_effects.entity = function(offset_deviation, offset)
+  local offset = offset or {0, 1}
+  return
+  {
+    type = "create-entity",
+    entity_name = "spark-explosion",
+    offset_deviation = offset_deviation or {{-0.5, -0.5}, {0.5, 0.5}},
+    offsets = {offset}
+  }
+end
+
+return hit_effects
@@ -0,0 +1,4 @@
+function pipecoverspictures()
+  return {north = {filename = "pipe-cover-north.png"}, east = {filename = "pipe-cover-east.png"},
+    south = {filename = "pipe-cover-south.png"}, west = {filename = "pipe-cover-west.png"}}
+end
@@ -0,0 +1,6 @@
+local sounds = {}
+
+sounds.machine_open = {{filename = "__base__/sound/machine-open.ogg", volume = 0.5}}
+sounds.machine_close = {{filename = "__base__/sound/machine-close.ogg", volume = 0.5}}
+
+return sounds
@@ -0,0 +1,37 @@
+data:extend(
+{
+  {type = "container", name = "wooden-chest", inventory_size = 16},
+  {type = "assembling-machine", name = "assembling-machine-1", crafting_categories = {"crafting", "basic-crafting", "advanced-crafting"},
+    crafting_speed = 0.5, energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 4},
+    energy_usage = "75kW", animation = {filename = "a.png", width = 108}},
+  {type = "assembling-machine", name = "assembling-machine-2", crafting_categories = {"basic-crafting", "crafting", "advanced-crafting", "crafting-with-fluid"},
+    crafting_speed = 0.75, energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 3},
+    energy_usage = "150kW", module_specification = {module_slots = 2}, fluid_boxes = {pipe_covers = pipecoverspictures()}},
+  {type = "assembling-machine", name = "chemical-plant", crafting_categories = {"chemistry"}, crafting_speed = 1,
+    energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 4},
+    energy_usage = "210kW", module_specification = {module_slots = 3}},
+  {type = "assembling-machine", name = "oil-refinery", crafting_categories = {"oil-processing"}, crafting_speed = 1,
+    energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 6},
+    energy_usage = "420kW", module_specification = {module_slots = 3}},
+  {type = "assembling-machine", name = "centrifuge", crafting_categories = {"centrifuging"}, crafting_speed = 1,
+    energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 4, drain = "11.6kW"},
+    energy_usage = "350kW", module_specification = {module_slots = 2}},
+  {type = "furnace", name = "stone-furnace", crafting_categories = {"smelting"}, crafting_speed = 1,
+    energy_source = {type = "burner", fuel_category = "chemical", effectivity = 1, emissions_per_minute = 2, smoke = {{name = "smoke", frequency = 10}}},
+    energy_usage = "90kW"},
+  {type = "furnace", name = "electric-furnace", crafting_categories = {"smelting"}, crafting_speed = 2,
+    energy_source = {type = "electric", usage_priority = "secondary-input", emissions_per_minute = 1},
+    energy_usage = "180kW", module_specification = {module_slots = 2}},
+  {type = "mining-drill", name = "burner-mining-drill", resource_categories = {"basic-solid"}, mining_speed = 0.25,
+    energy_source = {type = "burner", fuel_category = "chemical", emissions_per_minute = 12}, energy_usage = "150kW"},
+  {type = "mining-drill", name = "electric-mining-drill", resource_categories = {"basic-solid"}, mining_speed = 0.5,
+    energy_source = {type = "electric", emissions_per_minute = 10}, energy_usage = "90kW", module_specification = {module_slots = 3}},
+  {type = "mining-drill", name = "pumpjack", resource_categories = {"basic-fluid"}, mining_speed = 1,
+    energy_source = {type = "electric", emissions_per_minute = 10}, energy_usage = "90kW", module_specification = {module_slots = 2}},
+  {type = "rocket-silo", name = "rocket-silo", crafting_categories = {"rocket-building"}, crafting_speed = 1,
+    energy_source = {type = "electric", usage_priority = "primary-input"}, energy_usage = "250kW", module_specification = {module_slots = 4}},
+  {type = "beacon", name = "beacon", energy_source = {type = "electric", usage_priority = "secondary-input"}, energy_usage = "480kW",
+    distribution_effectivity = 0.5, supply_area_distance = 3, module_specification = {module_slots = 2}},
+  {type = "boiler", name = "boiler", energy_consumption = "1.8MW", target_temperature = 165,
+    energy_source = {type = "burner", fuel_category = "chemical", effectivity = 1, emissions_per_minute = 30}},
+})
@@ -0,0 +1,10 @@
+data:extend(
+{
+  {type = "fluid", name = "water", default_temperature = 15, max_temperature = 100, heat_capacity = "0.2KJ", base_color = {r=0, g=0.34, b=0.6}, order = "a[fluid]-a[water]"},
+  {type = "fluid", name = "steam", default_temperature = 15, max_temperature = 1000, heat_capacity = "0.2KJ", gas_temperature = 15, auto_barrel = false, order = "a[fluid]-b[steam]"},
+  {type = "fluid", name = "crude-oil", default_temperature = 25, heat_capacity = "0.1KJ", max_temperature = 100, order = "a[fluid]-b[crude-oil]"},
+  {type = "fluid", name = "heavy-oil", default_temperature = 25, heat_capacity = "0.1KJ", max_temperature = 100, order = "a[fluid]-b[heavy-oil]"},
+  {type = "fluid", name = "light-oil", default_temperature = 25, heat_capacity = "0.1KJ", max_temperature = 100, order = "a[fluid]-c[light-oil]"},
+  {type = "fluid", name = "petroleum-gas", default_temperature = 25, heat_capacity = "0.1KJ", max_temperature = 100, order = "a[fluid]-d[petroleum-gas]"},
+  {type = "fluid", name = "sulfuric-acid", default_temperature = 25, heat_capacity = "0.1KJ", max_temperature = 100, order = "a[fluid]-f[sulfuric-acid]"},
+})
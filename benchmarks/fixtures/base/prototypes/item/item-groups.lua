@@ -0,0 +1,15 @@
+data:extend(
+{
+  {type = "item-group", name = "logistics", order = "a", icon = "__base__/graphics/item-group/logistics.png", icon_size = 64},
+  {type = "item-group", name = "production", order = "b"},
+  {type = "item-group", name = "intermediate-products", order = "c"},
+  {type = "item-group", name = "other", order = "z"},
+  {type = "item-group", name = "fluids", order = "e"},
+  {type = "item-subgroup", name = "storage", group = "logistics", order = "a"},
+  {type = "item-subgroup", name = "raw-resource", group = "intermediate-products", order = "a"},
+  {type = "item-subgroup", name = "raw-material", group = "intermediate-products", order = "b"},
+  {type = "item-subgroup", name = "intermediate-product", group = "intermediate-products", order = "g"},
+  {type = "item-subgroup", name = "science-pack", group = "intermediate-products", order = "h"},
+  {type = "item-subgroup", name = "other", group = "other", order = "z"},
+  {type = "item-subgroup", name = "module", group = "production", order = "f"},
+})
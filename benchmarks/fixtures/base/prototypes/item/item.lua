@@ -0,0 +1,34 @@
+local sounds = require("prototypes.entity.sounds")
+data:extend(
+{
+  {type = "item", name = "wooden-chest", icon = "__base__/graphics/icons/wooden-chest.png", icon_size = 64, subgroup = "storage", order = "a[items]-a[wooden-chest]", place_result = "wooden-chest", fuel_category = "chemical", fuel_value = "2MJ", stack_size = 50},
+  {type = "item", name = "wood", subgroup = "raw-resource", order = "a[wood]", fuel_value = "2MJ", fuel_category = "chemical", stack_size = 100},
+  {type = "item", name = "coal", subgroup = "raw-resource", order = "b[coal]", fuel_value = "4MJ", fuel_category = "chemical", stack_size = 50},
+  {type = "item", name = "stone", subgroup = "raw-resource", order = "d[stone]", stack_size = 50},
+  {type = "item", name = "iron-ore", subgroup = "raw-resource", order = "e[iron-ore]", stack_size = 50},
+  {type = "item", name = "copper-ore", subgroup = "raw-resource", order = "f[copper-ore]", stack_size = 50},
+  {type = "item", name = "uranium-ore", subgroup = "raw-resource", order = "g[uranium-ore]", stack_size = 50},
+  {type = "item", name = "iron-plate", subgroup = "raw-material", order = "a[iron-plate]", stack_size = 100},
+  {type = "item", name = "copper-plate", subgroup = "raw-material", order = "b[copper-plate]", stack_size = 100},
+  {type = "item", name = "steel-plate", subgroup = "raw-material", order = "d[steel-plate]", stack_size = 100},
+  {type = "item", name = "plastic-bar", subgroup = "raw-material", order = "f[plastic-bar]", stack_size = 100},
+  {type = "item", name = "sulfur", subgroup = "raw-material", order = "g[sulfur]", stack_size = 50},
+  {type = "item", name = "solid-fuel", subgroup = "raw-material", order = "c[solid-fuel]", fuel_value = "12MJ", fuel_category = "chemical", fuel_acceleration_multiplier = 1.2, stack_size = 50},
+  {type = "item", name = "iron-gear-wheel", subgroup = "intermediate-product", order = "c[iron-gear-wheel]", stack_size = 100},
+  {type = "item", name = "copper-cable", subgroup = "intermediate-product", order = "a[copper-cable]", stack_size = 200},
+  {type = "item", name = "electronic-circuit", subgroup = "intermediate-product", order = "e[electronic-circuit]", stack_size = 200},
+  {type = "item", name = "advanced-circuit", subgroup = "intermediate-product", order = "f[advanced-circuit]", stack_size = 200},
+  {type = "item", name = "low-density-structure", subgroup = "intermediate-product", order = "o[low-density-structure]", stack_size = 10},
+  {type = "item", name = "rocket-control-unit", subgroup = "intermediate-product", order = "p[rocket-control-unit]", stack_size = 10},
+  {type = "item", name = "rocket-fuel", subgroup = "intermediate-product", order = "q[rocket-fuel]", fuel_value = "100MJ", fuel_category = "chemical", fuel_acceleration_multiplier = 1.8, stack_size = 10},
+  {type = "item", name = "rocket-part", subgroup = "intermediate-product", order = "q[rocket-part]", stack_size = 5},
+  {type = "item", name = "uranium-235", subgroup = "intermediate-product", order = "r[uranium-235]", stack_size = 100},
+  {type = "item", name = "uranium-238", subgroup = "intermediate-product", order = "r[uranium-238]", stack_size = 100},
+  {type = "tool", name = "automation-science-pack", subgroup = "science-pack", order = "a[automation-science-pack]", stack_size = 200, durability = 1},
+  {type = "tool", name = "logistic-science-pack", subgroup = "science-pack", order = "b[logistic-science-pack]", stack_size = 200, durability = 1},
+  {type = "item", name = "inserter", subgroup = "storage", order = "b[inserter]", stack_size = 50},
+  {type = "item", name = "transport-belt", subgroup = "storage", order = "a[transport-belt]", stack_size = 100},
+  {type = "item", name = "empty-barrel", subgroup = "intermediate-product", order = "d[empty-barrel]", stack_size = 10},
+  {type = "item", name = "simple-entity-with-owner", flags = {"hidden"}, subgroup = "other", order = "s", stack_size = 50},
+  {type = "item", name = "electric-energy-interface", flags = {"hidden"}, subgroup = "other", order = "a", stack_size = 50},
+})
@@ -0,0 +1,7 @@
+data:extend(
+{
+  {type = "module", name = "speed-module", subgroup = "module", category = "speed", tier = 1, order = "a[speed]-a[speed-module-1]", stack_size = 50, effect = { speed = {bonus = 0.2}, consumption = {bonus = 0.5}}},
+  {type = "module", name = "productivity-module", subgroup = "module", category = "productivity", tier = 1, order = "c[productivity]-a[productivity-module-1]", stack_size = 50,
+   effect = { productivity = {bonus = 0.04}, consumption = {bonus = 0.4}, pollution = {bonus = 0.05}, speed = {bonus = -0.05}},
+   limitation = {"iron-gear-wheel", "electronic-circuit"}},
+})
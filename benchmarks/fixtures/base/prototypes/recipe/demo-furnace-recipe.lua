@@ -0,0 +1,33 @@
+data:extend(
+{
+  {type = "recipe", name = "advanced-oil-processing", category = "oil-processing", enabled = false, energy_required = 5,
+    ingredients = {{type = "fluid", name = "water", amount = 50}, {type = "fluid", name = "crude-oil", amount = 100}},
+    results = {{type = "fluid", name = "heavy-oil", amount = 25}, {type = "fluid", name = "light-oil", amount = 45}, {type = "fluid", name = "petroleum-gas", amount = 55}},
+    main_product = ""},
+  {type = "recipe", name = "basic-oil-processing", category = "oil-processing", enabled = false, energy_required = 5,
+    ingredients = {{type = "fluid", name = "crude-oil", amount = 100, fluidbox_index = 2}},
+    results = {{type = "fluid", name = "petroleum-gas", amount = 45, fluidbox_index = 3}}},
+  {type = "recipe", name = "heavy-oil-cracking", category = "chemistry", enabled = false, energy_required = 2,
+    ingredients = {{type = "fluid", name = "water", amount = 30}, {type = "fluid", name = "heavy-oil", amount = 40}},
+    results = {{type = "fluid", name = "light-oil", amount = 30}}, main_product = ""},
+  {type = "recipe", name = "light-oil-cracking", category = "chemistry", enabled = false, energy_required = 2,
+    ingredients = {{type = "fluid", name = "water", amount = 30}, {type = "fluid", name = "light-oil", amount = 30}},
+    results = {{type = "fluid", name = "petroleum-gas", amount = 20}}, main_product = ""},
+  {type = "recipe", name = "plastic-bar", category = "chemistry", energy_required = 1, enabled = false,
+    ingredients = {{type = "fluid", name = "petroleum-gas", amount = 20}, {type = "item", name = "coal", amount = 1}},
+    results = {{type = "item", name = "plastic-bar", amount = 2}}},
+  {type = "recipe", name = "sulfur", category = "chemistry", energy_required = 1, enabled = false,
+    ingredients = {{type = "fluid", name = "water", amount = 30}, {type = "fluid", name = "petroleum-gas", amount = 30}},
+    results = {{type = "item", name = "sulfur", amount = 2}}},
+  {type = "recipe", name = "sulfuric-acid", category = "chemistry", energy_required = 1, enabled = false,
+    ingredients = {{type = "item", name = "sulfur", amount = 5}, {type = "item", name = "iron-plate", amount = 1}, {type = "fluid", name = "water", amount = 100}},
+    results = {{type = "fluid", name = "sulfuric-acid", amount = 50}}},
+  {type = "recipe", name = "solid-fuel-from-light-oil", category = "chemistry", energy_required = 2, enabled = false,
+    ingredients = {{type = "fluid", name = "light-oil", amount = 10}}, results = {{type = "item", name = "solid-fuel", amount = 1}}},
+  {type = "recipe", name = "uranium-processing", energy_required = 12, enabled = false, category = "centrifuging",
+    ingredients = {{"uranium-ore", 10}},
+    results = {{name = "uranium-235", probability = 0.007, amount = 1}, {name = "uranium-238", probability = 0.993, amount = 1}}},
+  {type = "recipe", name = "kovarex-enrichment-process", energy_required = 60, enabled = false, category = "centrifuging",
+    ingredients = {{"uranium-235", 40}, {"uranium-238", 5}},
+    results = {{name = "uranium-235", amount = 41}, {name = "uranium-238", amount = 2}}, main_product = ""},
+})
@@ -0,0 +1,29 @@
+data:extend(
+{
+  {type = "recipe", name = "wooden-chest", ingredients = {{"wood", 2}}, result = "wooden-chest"},
+  {type = "recipe", name = "iron-plate", category = "smelting", energy_required = 3.2, ingredients = {{"iron-ore", 1}}, result = "iron-plate"},
+  {type = "recipe", name = "copper-plate", category = "smelting", energy_required = 3.2, ingredients = {{"copper-ore", 1}}, result = "copper-plate"},
+  {type = "recipe", name = "steel-plate", category = "smelting",
+    normal = {enabled = false, energy_required = 16, ingredients = {{"iron-plate", 5}}, result = "steel-plate"},
+    expensive = {enabled = false, energy_required = 32, ingredients = {{"iron-plate", 10}}, result = "steel-plate"}},
+  {type = "recipe", name = "iron-gear-wheel",
+    normal = {ingredients = {{"iron-plate", 2}}, result = "iron-gear-wheel"},
+    expensive = {ingredients = {{"iron-plate", 4}}, result = "iron-gear-wheel"}},
+  {type = "recipe", name = "copper-cable", ingredients = {{"copper-plate", 1}}, result = "copper-cable", result_count = 2},
+  {type = "recipe", name = "electronic-circuit",
+    normal = {ingredients = {{"iron-plate", 1}, {"copper-cable", 3}}, result = "electronic-circuit"},
+    expensive = {ingredients = {{"iron-plate", 2}, {"copper-cable", 8}}, result = "electronic-circuit"}},
+  {type = "recipe", name = "advanced-circuit", enabled = false, energy_required = 6,
+    normal = {enabled = false, energy_required = 6, ingredients = {{"electronic-circuit", 2}, {"plastic-bar", 2}, {"copper-cable", 4}}, result = "advanced-circuit"},
+    expensive = {enabled = false, energy_required = 6, ingredients = {{"electronic-circuit", 2}, {"plastic-bar", 4}, {"copper-cable", 8}}, result = "advanced-circuit"}},
+  {type = "recipe", name = "inserter", ingredients = {{"electronic-circuit", 1}, {"iron-gear-wheel", 1}, {"iron-plate", 1}}, result = "inserter"},
+  {type = "recipe", name = "transport-belt", ingredients = {{"iron-plate", 1}, {"iron-gear-wheel", 1}}, result = "transport-belt", result_count = 2},
+  {type = "recipe", name = "automation-science-pack", energy_required = 5, ingredients = {{"copper-plate", 1}, {"iron-gear-wheel", 1}}, result = "automation-science-pack"},
+  {type = "recipe", name = "logistic-science-pack", energy_required = 6, ingredients = {{"inserter", 1}, {"transport-belt", 1}}, result = "logistic-science-pack"},
+  {type = "recipe", name = "empty-barrel", category = "crafting", energy_required = 1, ingredients = {{"steel-plate", 1}}, result = "empty-barrel"},
+  {type = "recipe", name = "simple-entity-with-owner", ingredients = {{"iron-plate", 1}}, result = "simple-entity-with-owner"},
+  {type = "recipe", name = "speed-module", enabled = false, energy_required = 15, ingredients = {{"advanced-circuit", 5}, {"electronic-circuit", 5}}, result = "speed-module"},
+  {type = "recipe", name = "productivity-module", enabled = false, energy_required = 15, ingredients = {{"advanced-circuit", 5}, {"electronic-circuit", 5}}, result = "productivity-module"},
+  {type = "recipe", name = "rocket-part", energy_required = 3, enabled = false, category = "rocket-building",
+    ingredients = {{"rocket-control-unit", 10}, {"low-density-structure", 10}, {"rocket-fuel", 10}}, result = "rocket-part"},
+})
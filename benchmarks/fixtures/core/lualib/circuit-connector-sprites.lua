@@ -0,0 +1,20 @@
+circuit_connector_definitions = {}
+default_circuit_wire_max_distance = 9
+
+universal_connector_template =
+{
+  connector_main = {filename = "__base__/graphics/entity/circuit-connector/ccm-universal-04a-base-sequence.png", width = 52, height = 50},
+  wire_pins = {filename = "__base__/graphics/entity/circuit-connector/ccm-universal-04c-wire-sequence.png", width = 62, height = 58}
+}
+
+function circuit_connector_definitions.create(template, definitions)
+  local connectors = {}
+  for i, definition in ipairs(definitions) do
+    connectors[i] =
+    {
+      sprites = {connector_main = util.table.deepcopy(template.connector_main), variation = definition.variation},
+      points = {shadow = {red = util.by_pixel(definition.shadow_offset[1], definition.shadow_offset[2])}}
+    }
+  end
+  return connectors
+end
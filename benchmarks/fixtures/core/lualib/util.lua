@@ -0,0 +1,32 @@
+util =
+{
+  table = {}
+}
+
+function util.table.deepcopy(object)
+  local lookup_table = {}
+  local function _copy(object)
+    if type(object) ~= "table" then
+      return object
+    elseif lookup_table[object] then
+      return lookup_table[object]
+    end
+    local new_table = {}
+    lookup_table[object] = new_table
+    for index, value in pairs(object) do
+      new_table[_copy(index)] = _copy(value)
+    end
+    return setmetatable(new_table, getmetatable(object))
+  end
+  return _copy(object)
+end
+
+function util.by_pixel(x, y)
+  return {x / 32, y / 32}
+end
+
+function util.empty_sprite()
+  return {filename = "__core__/graphics/empty.png", priority = "extra-high", width = 1, height = 1, frame_count = 1}
+end
+
+return util
@@ -0,0 +1,39 @@
+"""profile_load.py
+
+Profiles a prototype load: prints the time spent in each phase of
+prototype.initialize, with its counters, and optionally saves the profile as
+JSON. Reads the Lua definitions unless --cache is given.
+
+Usage: python benchmarks/profile_load.py PROTOTYPES_DIR [--parallel]
+                                         [--cache] [-o FILE]
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factoratio import instrument, prototype
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Profile the phases of a prototype load.')
+  parser.add_argument('path', type=Path, help="a 'prototypes' directory")
+  parser.add_argument('--parallel', action='store_true',
+                      help='read definition files in worker processes')
+  parser.add_argument('--cache', action='store_true',
+                      help='use the prototype cache')
+  parser.add_argument('-o', '--output', type=Path,
+                      help='save the profile to this JSON file')
+  args = parser.parse_args()
+
+  with instrument.profile('load') as profile:
+    prototype.initialize(args.path, useCache=args.cache,
+                         parallel=args.parallel)
+  print(profile.format())
+  if args.output:
+    profile.dump(args.output)
+
+if __name__ == '__main__':
+  main()
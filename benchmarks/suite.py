@@ -0,0 +1,401 @@
+"""suite.py
+
+The benchmark suite: times the paths taken by every planning run, i.e.
+loading prototypes, the Producer calls made for each step, unit arithmetic,
+fuel calculations and Recipe lookups, on the fixed prototype tree bundled in
+benchmarks/fixtures. Nothing is downloaded and no Factorio installation is
+needed.
+
+Each case calls its function NUMBER times per round, for REPEAT rounds, and
+reports the time per call. Results can be saved as JSON and compared with
+those of another commit; the comparison uses the fastest round of each case,
+the figure least disturbed by other activity on the machine:
+
+  python benchmarks/suite.py -o before.json
+  (check out another commit)
+  python benchmarks/suite.py -o after.json --compare before.json
+  python benchmarks/suite.py --compare before.json after.json
+
+With --compare, the exit status is 1 if any case got slower by more than the
+threshold.
+
+Before timing anything, the suite runs a few checks that the paths it times
+give consistent answers, e.g. that reading prototypes in parallel and
+serially agree; the exit status is 1 if any of them fails.
+
+Usage: python benchmarks/suite.py [-k PATTERN] [-r REPEAT] [-o FILE]
+                                  [--compare OLD [NEW]] [--threshold PERCENT]
+"""
+
+import argparse
+from datetime import datetime, timezone
+import json
+import math
+from pathlib import Path
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from factoratio import prototype, producer
+from factoratio.producer import BurnerProducer, Pumpjack
+from factoratio.query import QueryEngine
+from factoratio.solver import Solver
+from factoratio.util import Joule, Watt
+
+ROOT = Path(__file__).resolve().parent
+FIXTURE = ROOT / 'fixtures' / 'base' / 'prototypes'
+
+# Bumped whenever the layout of the results file changes
+RESULTS_VERSION = 1
+
+# The Recipe each machine of producer.base is timed on, by its key there
+RECIPES = {
+  'Assembler1': 'electronic-circuit',
+  'Assembler2': 'electronic-circuit',
+  'Assembler3': 'electronic-circuit',
+  'BurnDrill': 'coal',
+  'ElecDrill': 'iron-ore',
+  'StoneFurance': 'iron-plate',
+  'SteelFurance': 'steel-plate',
+  'ElecFurance': 'copper-plate',
+  'ChemPlant': 'plastic-bar',
+  'OilRefinery': 'advanced-oil-processing',
+  'Centrifuge': 'uranium-processing',
+  'RocketSilo': 'rocket-part',
+  'Pumpjack': 'crude-oil'
+}
+
+# The Fuel burned by burner machines, and the yield of the Pumpjack's field
+FUEL = 'coal'
+YIELD = 250
+
+# name: (make, number); make takes the fixture Prototypes and returns the
+# function to time
+CASES: Dict[str, tuple] = {}
+
+# name: check; check takes the fixture Prototypes and raises AssertionError
+# if something is wrong
+CHECKS: Dict[str, Callable[[prototype.Prototypes], None]] = {}
+
+
+def case(name: str, number: int=1000):
+  """Register a benchmark case; see CASES."""
+  def register(make: Callable[[prototype.Prototypes], Callable]):
+    CASES[name] = (make, number)
+    return make
+  return register
+
+def check(name: str):
+  """Register a check; see CHECKS."""
+  def register(func: Callable[[prototype.Prototypes], None]):
+    CHECKS[name] = func
+    return func
+  return register
+
+@check('prototype.readTables.parallel')
+def readTablesParallel(prototypes):
+  # Two workers force the parallel path even on a single CPU
+  serial = prototype.readTables(FIXTURE, parallel=False)
+  parallel = prototype.readTables(FIXTURE, parallel=True, workers=2)
+  assert serial == parallel, 'parallel and serial reads differ'
+
+@check('prototype.entities')
+def entitiesLoaded(prototypes):
+  # Entity files that fail are skipped rather than raised; the fixture's use
+  # requires and globals as vanilla's do, and must all load
+  files = {path.relative_to(FIXTURE).as_posix()
+           for path in FIXTURE.glob('entity/*.lua')}
+  skipped = sorted(files - set(prototypes.sources))
+  assert not skipped, f"skipped {', '.join(skipped)}"
+
+@check('query.rates.plan')
+def ratesAgreeWithPlans(prototypes):
+  # The machines a plan needs for the Recipe making its target are those a
+  # rates query gives for that Recipe
+  engine = QueryEngine(prototypes)
+  for name in prototypes.products:
+    plan = engine.answer({'type': 'plan', 'item': name})
+    if 'error' in plan:
+      continue
+    recipe, planned = next(iter(plan['recipes'].items()))
+    rates = engine.answer({'item': name, 'recipe': recipe})
+    assert math.isclose(rates['machines'], planned['machines']), \
+      (f"'{name}': rates gives {rates['machines']} machines, plan "
+       f"{planned['machines']}")
+
+
+@case('prototype.initialize', number=5)
+def initializeCold(prototypes):
+  def run():
+    # Preprocessed definitions are memoized; drop them for a true cold load
+    prototype._preprocessed.clear()
+    prototype.initialize(FIXTURE, useCache=False, parallel=False)
+  return run
+
+@case('prototype.initialize.cached', number=10)
+def initializeCached(prototypes):
+  # What initialize does on a cache hit, against a private cache file that
+  # is removed along with the returned function
+  tmpDir = tempfile.TemporaryDirectory()
+  cachePath = Path(tmpDir.name) / prototype.CACHE_NAME
+  prototype.writeCache(cachePath, prototype.fingerprint(FIXTURE), prototypes)
+  def run(tmpDir=tmpDir):
+    return prototype.readCache(cachePath, prototype.fingerprint(FIXTURE))
+  return run
+
+def _machineCases():
+  """Register craft, rates and productionRateInverse for each base machine."""
+  for key in producer.base:
+    def inputs(prototypes, key=key):
+      machine = producer.base[key]
+      recipe = prototypes.recipes[RECIPES[key]]
+      product = recipe.output[0].what.name
+      if isinstance(machine, Pumpjack):
+        return machine, recipe, (recipe, YIELD, 10), (recipe, YIELD, 10.0)
+      rateArgs = (recipe, 10)
+      if isinstance(machine, BurnerProducer):
+        rateArgs = (recipe, prototypes.fuels[FUEL], 10)
+      return machine, recipe, rateArgs, (recipe, product, 10.0)
+
+    def craft(prototypes, inputs=inputs):
+      machine, recipe, _, _ = inputs(prototypes)
+      return lambda: machine.craft(recipe)
+
+    def rates(prototypes, inputs=inputs):
+      machine, _, args, _ = inputs(prototypes)
+      return lambda: machine.rates(*args)
+
+    def inverse(prototypes, inputs=inputs):
+      machine, _, _, args = inputs(prototypes)
+      return lambda: machine.productionRateInverse(*args)
+
+    case(f'producer.craft[{key}]')(craft)
+    case(f'producer.rates[{key}]')(rates)
+    case(f'producer.productionRateInverse[{key}]')(inverse)
+
+_machineCases()
+
+@case('units.parse', number=10000)
+def unitsParse(prototypes):
+  return lambda: Watt('150kW')
+
+@case('units.add', number=10000)
+def unitsAdd(prototypes):
+  a, b = Watt('375k'), Watt('12.5k')
+  return lambda: a + b
+
+@case('units.sub', number=10000)
+def unitsSub(prototypes):
+  a, b = Joule('4M'), Joule('150k')
+  return lambda: a - b
+
+@case('units.mul', number=10000)
+def unitsMul(prototypes):
+  a = Watt('90k')
+  return lambda: a * 1.6
+
+@case('units.div', number=10000)
+def unitsDiv(prototypes):
+  a, b = Joule('4M'), Watt('90k')
+  return lambda: a / b
+
+@case('units.format', number=10000)
+def unitsFormat(prototypes):
+  a = Watt('12.5M')
+  return lambda: str(a)
+
+@case('fuel.burnTime', number=1000)
+def burnTime(prototypes):
+  fuels = list(prototypes.fuels.values())
+  usage = producer.base['StoneFurance'].energyUsage
+  return lambda: [fuel.burnTime(usage, 10) for fuel in fuels]
+
+@case('fuel.fuelConsumptionRate', number=1000)
+def fuelConsumptionRate(prototypes):
+  burners = [x for x in producer.base.values()
+             if isinstance(x, BurnerProducer)]
+  fuels = list(prototypes.fuels.values())
+  return lambda: [burner.fuelConsumptionRate(fuel, 10)
+                  for burner in burners for fuel in fuels]
+
+@case('lookup.recipesProducing', number=100)
+def recipesProducing(prototypes):
+  names = list(prototypes.products)
+  return lambda: [prototypes.recipesProducing(x) for x in names]
+
+@case('lookup.recipesConsuming', number=100)
+def recipesConsuming(prototypes):
+  names = list(prototypes.products)
+  return lambda: [prototypes.recipesConsuming(x) for x in names]
+
+@case('lookup.producersFor', number=100)
+def producersFor(prototypes):
+  categories = prototypes.categories
+  return lambda: [prototypes.producersFor(x) for x in categories]
+
+@case('lookup.recipeFor', number=100)
+def recipeFor(prototypes):
+  solver = Solver(prototypes)
+  names = list(prototypes.products)
+  def run():
+    solver.clear()
+    return [solver.recipeFor(x) for x in names]
+  return run
+
+@case('lookup.recipeFor.memoized', number=100)
+def recipeForMemoized(prototypes):
+  solver = Solver(prototypes)
+  names = list(prototypes.products)
+  return lambda: [solver.recipeFor(x) for x in names]
+
+
+def formatTime(seconds: float) -> str:
+  """Format a duration with the largest unit that keeps it above one."""
+  for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+    if seconds >= scale:
+      return f'{seconds / scale:.2f}{unit}'
+  return f'{seconds / 1e-9:.1f}ns'
+
+def gitCommit() -> Optional[dict]:
+  """Return the checked out commit and whether the tree has changes."""
+  try:
+    commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    status = subprocess.run(['git', 'status', '--porcelain', '--', '.'],
+                            cwd=ROOT.parent, capture_output=True, text=True,
+                            check=True)
+  except (OSError, subprocess.CalledProcessError):
+    return None
+  return {'commit': commit.stdout.strip(), 'dirty': bool(status.stdout)}
+
+def runChecks(pattern: str=None) -> bool:
+  """Run the checks whose names match pattern; return whether all passed."""
+  prototypes = prototype.initialize(FIXTURE, useCache=False, parallel=False)
+  passed = True
+  for name, func in CHECKS.items():
+    if pattern and not re.search(pattern, name):
+      continue
+    try:
+      func(prototypes)
+    except AssertionError as err:
+      print(f'{name:<45} FAILED: {err}')
+      passed = False
+  return passed
+
+def run(pattern: str=None, repeat: int=5) -> dict:
+  """Run the cases whose names match pattern and return the results."""
+  prototypes = prototype.initialize(FIXTURE, useCache=False, parallel=False)
+  results = {}
+  for name, (make, number) in CASES.items():
+    if pattern and not re.search(pattern, name):
+      continue
+    func = make(prototypes)
+    func()  # Warm up memoized state, as a planning run would
+    times = [t / number for t in timeit.repeat(func, number=number,
+                                               repeat=repeat)]
+    results[name] = {
+      'number': number,
+      'min': min(times),
+      'median': statistics.median(times),
+      'mean': statistics.fmean(times),
+      'stdev': statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+    print(f'{name:<45} {formatTime(min(times)):>10} '
+          f'(median {formatTime(statistics.median(times))})')
+  return {
+    'version': RESULTS_VERSION,
+    'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    'git': gitCommit(),
+    'python': platform.python_version(),
+    'implementation': platform.python_implementation(),
+    'numpy': np.__version__,
+    'platform': platform.platform(),
+    'fixture': FIXTURE.relative_to(ROOT).as_posix(),
+    'repeat': repeat,
+    'results': results
+  }
+
+def compare(old: dict, new: dict, threshold: float) -> bool:
+  """Print the change of each case between two results.
+
+  Returns whether any case got slower by more than threshold, a fraction.
+  """
+  def label(data):
+    git = data.get('git') or {}
+    commit = git.get('commit', 'unknown')[:10]
+    return f"{commit}{'+' if git.get('dirty') else ''} ({data.get('date')})"
+
+  print(f'old: {label(old)}\nnew: {label(new)}')
+  regressed = False
+  oldResults, newResults = old['results'], new['results']
+  for name in dict.fromkeys([*oldResults, *newResults]):
+    if name not in oldResults or name not in newResults:
+      print(f"{name:<45} only in {'old' if name in oldResults else 'new'}")
+      continue
+    before, after = oldResults[name]['min'], newResults[name]['min']
+    ratio = after / before
+    if ratio > 1 + threshold:
+      note = 'slower'
+      regressed = True
+    elif ratio < 1 / (1 + threshold):
+      note = 'faster'
+    else:
+      note = ''
+    print(f'{name:<45} {formatTime(before):>10} -> {formatTime(after):>10} '
+          f'{ratio:>6.2f}x {note}')
+  return regressed
+
+def main(argv=None) -> int:
+  parser = argparse.ArgumentParser(
+    description='Run the benchmark suite on the bundled fixture prototypes.')
+  parser.add_argument('-k', dest='pattern',
+                      help='only run cases whose name matches this regex')
+  parser.add_argument('-r', '--repeat', type=int, default=5,
+                      help='rounds per case (default: %(default)s)')
+  parser.add_argument('-o', '--output', type=Path,
+                      help='save the results to this JSON file')
+  parser.add_argument('--compare', nargs='+', type=Path, metavar='FILE',
+                      help='compare with OLD results; with NEW results as '
+                           'well, compare those instead of running')
+  parser.add_argument('--threshold', type=float, default=10,
+                      help='percentage by which a case may get slower before '
+                           'it counts as a regression (default: %(default)s)')
+  parser.add_argument('-l', '--list', action='store_true',
+                      help='list the cases and exit')
+  args = parser.parse_args(argv)
+
+  if args.list:
+    print('\n'.join(name for name in CASES
+                    if not args.pattern or re.search(args.pattern, name)))
+    return 0
+  if args.compare and len(args.compare) > 2:
+    parser.error('--compare takes at most two files')
+
+  if args.compare and len(args.compare) == 2:
+    new = json.loads(args.compare[1].read_text())
+  else:
+    if not runChecks(args.pattern):
+      return 1
+    new = run(args.pattern, args.repeat)
+    if args.output:
+      args.output.write_text(json.dumps(new, indent=2) + '\n')
+  if args.compare:
+    old = json.loads(args.compare[0].read_text())
+    if args.pattern:
+      for data in (old, new):
+        data['results'] = {name: x for name, x in data['results'].items()
+                           if re.search(args.pattern, name)}
+    return int(compare(old, new, args.threshold / 100))
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,371 @@
+"""synthetic.py
+
+Generates synthetic Factorio-style prototype trees, for measuring the loader
+and the solvers at modpack scale without a game installation. The tree has
+the layout and Lua shape ProtoReader reads: 'item', 'fluid' and 'recipe'
+subdirectories of definition files calling data:extend, next to an
+'info.json'.
+
+Products are laid out in tiers. Raw resources, the vanilla ones included,
+make up tier 0 and have no Recipe; every other product has a Recipe named
+after it, taking ingredients from lower tiers, so the Recipe graph is as
+deep as there are tiers. Some Recipes also make byproducts of their tier,
+take part in a Recipe cycle, or have an Expensive Mode variant, which takes
+twice the ingredients and time. Generation is deterministic for a given
+Spec.
+
+Usage: python benchmarks/synthetic.py OUTPUT_DIR [SCALE [SEED]]
+
+SCALE is relative to vanilla, e.g. 10 for a tree ten times its size.
+"""
+
+import copy
+from dataclasses import dataclass, replace
+import json
+from pathlib import Path
+import random
+import sys
+from typing import Dict, Iterator, List
+
+# Raw resources named as in vanilla, so that resource Recipes are added and
+# the Solver treats them as raw by default
+RAW_ITEMS = ('iron-ore', 'copper-ore', 'stone', 'coal', 'uranium-ore', 'wood')
+RAW_FLUIDS = ('water', 'crude-oil')
+
+# Items in tier 0 that can be burned, with their fuel value
+FUEL_VALUES = {'coal': '4MJ', 'wood': '2MJ'}
+
+# Crafting times drawn for Recipes, in seconds
+TIMES = (0.5, 1, 2, 3.2, 5, 10, 15, 30)
+
+
+@dataclass(frozen=True)
+class Spec():
+  """The shape of a synthetic prototype tree.
+
+  The defaults are roughly the size of vanilla Factorio.
+
+  Attributes
+  ----------
+  items: int
+      The number of Items, raw resources included.
+
+  fluids: int
+      The number of Fluids, raw resources included.
+
+  raws: int
+      The number of raw resources, at least len(RAW_ITEMS) +
+      len(RAW_FLUIDS).
+
+  depth: int
+      The number of tiers above the raw resources, i.e. the length of the
+      longest chain of Recipes.
+
+  fanIn: int
+      The maximum number of ingredients of a Recipe.
+
+  fanOut: int
+      The maximum number of products of a multi-output Recipe.
+
+  multiOutput: float
+      The share of Recipes with byproducts.
+
+  cycles: float
+      The share of Recipes starting a Recipe cycle: each takes a product of
+      the tier above as an ingredient, and that product's Recipe takes this
+      one in turn. In the top tier, the Recipe takes its own product as a
+      catalyst instead, as Kovarex enrichment does.
+
+  expensive: float
+      The share of Recipes with an Expensive Mode variant.
+
+  fuels: float
+      The share of Items other than raw resources that can be burned.
+
+  perFile: int
+      The number of prototypes per definition file.
+
+  seed: int
+      The seed of the random choices.
+  """
+
+  items: int = 200
+  fluids: int = 10
+  raws: int = 10
+  depth: int = 8
+  fanIn: int = 5
+  fanOut: int = 3
+  multiOutput: float = 0.05
+  cycles: float = 0.02
+  expensive: float = 0.25
+  fuels: float = 0.05
+  perFile: int = 500
+  seed: int = 0
+
+  def scaled(self, scale: float) -> 'Spec':
+    """Return this Spec with scale times as many products."""
+    return replace(
+      self, items=round(self.items * scale),
+      fluids=max(len(RAW_FLUIDS), round(self.fluids * scale)),
+      raws=max(len(RAW_ITEMS) + len(RAW_FLUIDS), round(self.raws * scale)))
+
+
+def toLua(value) -> str:
+  """Format a Python value as a Lua expression.
+
+  Dicts become tables with named fields and lists become sequences.
+  """
+  if isinstance(value, bool):
+    return 'true' if value else 'false'
+  if isinstance(value, (int, float)):
+    return repr(value)
+  if isinstance(value, str):
+    return json.dumps(value)
+  if isinstance(value, dict):
+    return '{' + ', '.join(f'{k} = {toLua(v)}' for k, v in value.items()) + '}'
+  return '{' + ', '.join(map(toLua, value)) + '}'
+
+def _definitionFile(tables: List[dict]) -> str:
+  """Format prototypes as a definition file, one prototype per line."""
+  return ('local sounds = require("prototypes.entity.sounds")\n\n'
+          'data:extend(\n{\n'
+          + ''.join(f'  {toLua(table)},\n' for table in tables) + '})\n')
+
+
+class _Generator():
+  """Draws the prototypes of a Spec; see generate."""
+
+  def __init__(self, spec: Spec):
+    if spec.raws < len(RAW_ITEMS) + len(RAW_FLUIDS):
+      raise ValueError(f'At least {len(RAW_ITEMS) + len(RAW_FLUIDS)} raw '
+                       f'resources are needed; got {spec.raws}')
+    if spec.items + spec.fluids <= spec.raws:
+      raise ValueError('There must be more products than raw resources')
+    self.spec = spec
+    self.random = random.Random(spec.seed)
+
+    # Extra raw resources are split between Items and Fluids like the
+    # products as a whole
+    extra = spec.raws - len(RAW_ITEMS) - len(RAW_FLUIDS)
+    extraFluids = round(extra * spec.fluids / (spec.items + spec.fluids))
+    rawItems = [*RAW_ITEMS,
+                *(f'ore-{i}' for i in range(extra - extraFluids))]
+    rawFluids = [*RAW_FLUIDS, *(f'raw-fluid-{i}' for i in range(extraFluids))]
+    nItems = max(0, spec.items - len(rawItems))
+    nFluids = max(0, spec.fluids - len(rawFluids))
+    self.items = rawItems + [f'item-{i}' for i in range(nItems)]
+    self.fluids = rawFluids + [f'fluid-{i}' for i in range(nFluids)]
+    self.isFluid = set(self.fluids)
+
+    # Spread the other products evenly over the tiers, fluids among items
+    products = [*(f'item-{i}' for i in range(nItems)),
+                *(f'fluid-{i}' for i in range(nFluids))]
+    self.random.shuffle(products)
+    self.tiers = [rawItems + rawFluids]
+    for t in range(spec.depth):
+      self.tiers.append(products[t * len(products) // spec.depth
+                                 :(t + 1) * len(products) // spec.depth])
+    self.tierOf = {name: t for t, tier in enumerate(self.tiers)
+                   for name in tier}
+    # The products of all tiers below each tier
+    self.below = [[]]
+    for tier in self.tiers[:-1]:
+      self.below.append(self.below[-1] + tier)
+    # Ingredients owed to Recipes of the next tier to close cycles
+    self.backEdges = {}
+    # The ingredients of each Recipe that close a cycle, by Recipe name; see
+    # _variant
+    self.catalysts = {}
+
+  def _amount(self, name: str) -> int:
+    if name in self.isFluid:
+      return self.random.choice((10, 20, 30, 50, 100))
+    return self.random.randint(1, 10)
+
+  def _spec(self, name: str, amount: int, long: bool=False, **extra):
+    if name in self.isFluid:
+      return {'type': 'fluid', 'name': name, 'amount': amount, **extra}
+    if long or extra:
+      return {'type': 'item', 'name': name, 'amount': amount, **extra}
+    return [name, amount]
+
+  def _ingredients(self, name: str) -> List[str]:
+    spec, rng = self.spec, self.random
+    tier = self.tierOf[name]
+    lower = self.below[tier]
+    # One ingredient from the tier below keeps the Recipe graph deep
+    chosen = [rng.choice(self.tiers[tier - 1])]
+    for _ in range(rng.randint(1, spec.fanIn) - 1):
+      chosen.append(rng.choice(lower))
+    catalysts = self.backEdges.pop(name, [])
+    if rng.random() < spec.cycles:
+      if tier + 1 < len(self.tiers):
+        above = rng.choice(self.tiers[tier + 1])
+        self.backEdges.setdefault(above, []).append(name)
+        catalysts.append(above)
+      else:
+        catalysts.append(name)
+    if catalysts:
+      self.catalysts[name] = set(catalysts)
+    return list(dict.fromkeys(chosen + catalysts))
+
+  def _byproducts(self, name: str) -> List[str]:
+    spec, rng = self.spec, self.random
+    if spec.fanOut < 2 or rng.random() >= spec.multiOutput:
+      return []
+    tier = [x for x in self.tiers[self.tierOf[name]] if x != name]
+    return rng.sample(tier, min(len(tier), rng.randint(1, spec.fanOut - 1)))
+
+  def _category(self, name: str, inputs: List[str], outputs: List[str]):
+    if any(x in self.isFluid for x in outputs):
+      return 'oil-processing' if len(outputs) > 1 else 'chemistry'
+    if any(x in self.isFluid for x in inputs):
+      return 'crafting-with-fluid'
+    if len(inputs) == 1 and self.tierOf[inputs[0]] == 0:
+      return 'smelting'
+    return 'advanced-crafting' if self.tierOf[name] > 4 else 'crafting'
+
+  def _variant(self, name: str, inputs: List[str],
+               byproducts: List[str]) -> dict:
+    # Cycles must make more than they consume to be solvable, so they
+    # consume one of each catalyst and make at least two of the product
+    rng = self.random
+    catalysts = self.catalysts.get(name, ())
+    variant = {
+      'enabled': False,
+      'energy_required': rng.choice(TIMES),
+      'ingredients': [self._spec(x, 1 if x in catalysts else self._amount(x))
+                      for x in inputs]
+    }
+    if byproducts or name in self.isFluid:
+      amount = self._amount(name)
+      results = [self._spec(name, max(amount, 2) if catalysts else amount,
+                            long=True)]
+      for x in byproducts:
+        extra = {}
+        if rng.random() < 0.3:
+          extra['probability'] = rng.choice((0.1, 0.25, 0.5))
+        results.append(self._spec(x, self._amount(x), long=True, **extra))
+      variant['results'] = results
+      if byproducts:
+        variant['main_product'] = name
+    else:
+      variant['result'] = name
+      count = rng.choice((2, 5) if catalysts else (1, 1, 1, 2, 5))
+      if count > 1:
+        variant['result_count'] = count
+    return variant
+
+  def recipe(self, name: str) -> dict:
+    """Return the recipe prototype making a product."""
+    inputs = self._ingredients(name)
+    byproducts = self._byproducts(name)
+    table = {'type': 'recipe', 'name': name,
+             'category': self._category(name, inputs, [name, *byproducts])}
+    variant = self._variant(name, inputs, byproducts)
+    if self.random.random() < self.spec.expensive:
+      expensive = copy.deepcopy(variant)
+      expensive['energy_required'] *= 2
+      catalysts = self.catalysts.get(name, ())
+      for spec in expensive['ingredients']:
+        if isinstance(spec, list):
+          if spec[0] not in catalysts:
+            spec[1] *= 2
+        elif spec['name'] not in catalysts:
+          spec['amount'] *= 2
+      table['normal'] = variant
+      table['expensive'] = expensive
+    else:
+      table.update(variant)
+    return table
+
+  def groups(self) -> List[dict]:
+    tables = [
+      {'type': 'item-group', 'name': 'intermediate-products', 'order': 'c'},
+      {'type': 'item-group', 'name': 'fluids', 'order': 'e'},
+      {'type': 'item-subgroup', 'name': 'fluid', 'group': 'fluids',
+       'order': 'a'}
+    ]
+    for t in range(len(self.tiers)):
+      tables.append({'type': 'item-subgroup', 'name': f'tier-{t}',
+                     'group': 'intermediate-products', 'order': f'{t:03}'})
+    return tables
+
+  def item(self, name: str) -> dict:
+    """Return the item prototype of an Item."""
+    tier = self.tierOf[name]
+    table = {
+      'type': 'item', 'name': name,
+      'icon': f'__synthetic__/graphics/icons/{name}.png', 'icon_size': 64,
+      'subgroup': f'tier-{tier}', 'order': f'{tier:03}[{name}]',
+      'stack_size': self.random.choice((10, 50, 100, 200))
+    }
+    if name in FUEL_VALUES:
+      table['fuel_value'] = FUEL_VALUES[name]
+      table['fuel_category'] = 'chemical'
+    elif tier and self.random.random() < self.spec.fuels:
+      table['fuel_value'] = f'{self.random.choice((1, 2, 5, 12, 100))}MJ'
+      table['fuel_category'] = 'chemical'
+    return table
+
+  def fluid(self, name: str) -> dict:
+    """Return the fluid prototype of a Fluid."""
+    return {
+      'type': 'fluid', 'name': name, 'default_temperature': 15,
+      'max_temperature': 100, 'heat_capacity': '0.1KJ',
+      'base_color': {'r': 0.5, 'g': 0.5, 'b': 0.5},
+      'order': f'a[fluid]-{self.tierOf[name]:03}[{name}]'
+    }
+
+  def files(self) -> Iterator[tuple]:
+    """Yield the subdirectory, file name and prototypes of each file."""
+    yield 'item', 'item-groups.lua', self.groups()
+    yield from self._chunked('item', 'item', map(self.item, self.items))
+    yield from self._chunked('fluid', 'fluid', map(self.fluid, self.fluids))
+    products = [x for tier in self.tiers[1:] for x in tier]
+    yield from self._chunked('recipe', 'recipe', map(self.recipe, products))
+
+  def _chunked(self, subdir: str, stem: str, tables: Iterator[dict]):
+    tables = list(tables)
+    perFile = max(1, self.spec.perFile)
+    for i in range(0, len(tables), perFile):
+      yield subdir, f'{stem}-{i // perFile}.lua', tables[i:i + perFile]
+
+
+def generate(path: Path, spec: Spec=Spec()) -> Dict[str, int]:
+  """Write a synthetic prototype tree to path/prototypes.
+
+  An 'info.json' is written to path as well, so that prototype caching
+  works as for a game installation. Returns the number of prototypes
+  written, by kind.
+
+  Parameters
+  ----------
+  path: Path
+      The directory to write to; it is created if needed.
+
+  spec: Spec, optional
+      The shape of the tree. Defaults to a vanilla-sized one.
+  """
+  generator = _Generator(spec)
+  protoPath = path / 'prototypes'
+  counts = {'files': 0}
+  for subdir, name, tables in generator.files():
+    (protoPath / subdir).mkdir(parents=True, exist_ok=True)
+    (protoPath / subdir / name).write_text(_definitionFile(tables))
+    counts['files'] += 1
+    for table in tables:
+      kind = {'item-group': 'group', 'item-subgroup': 'group', 'fluid': 'fluid',
+              'recipe': 'recipe'}.get(table['type'], 'item')
+      counts[kind] = counts.get(kind, 0) + 1
+  (path / 'info.json').write_text(json.dumps(
+    {'name': 'synthetic', 'version': '1.0.0', 'spec': vars(spec)}) + '\n')
+  return counts
+
+if __name__ == '__main__':
+  if len(sys.argv) < 2:
+    sys.exit(__doc__.strip())
+  scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+  seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+  counts = generate(Path(sys.argv[1]), Spec(seed=seed).scaled(scale))
+  print(', '.join(f'{n} {kind}' for kind, n in counts.items()))
@@ -0,0 +1,171 @@
+"""cache.py
+
+A bounded cache of computed results, such as query answers, evicting the
+least recently used entries and, optionally, entries older than a time to
+live. Counts hits, misses and evictions.
+
+Keys are any hashable values. For results that depend on Producers, build
+keys with producerKey, which identifies a Producer by what determines its
+results rather than by object identity: the same machine with the same
+modules in any order, or an equal copy, gets the same key, and changing its
+modules or Beacons changes the key.
+
+Example
+-------
+>>> results = ResultCache(maxSize=1024, ttl=60)
+>>> key = ('rates', recipeName, producerKey(machine), count)
+>>> answer = results.get(key)
+>>> if answer is None:
+...   answer = results.put(key, compute())
+"""
+
+from collections import Counter, OrderedDict
+import time
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+from factoratio.producer import Beacon, Module, Producer
+
+# Results kept before the least recently used are dropped
+CACHE_SIZE = 1024
+
+
+def loadout(modules: Iterable[Optional[Module]]) -> Tuple[tuple, ...]:
+  """Return Modules as a multiset: sorted (name, tier, count) tuples, empty
+  slots left out, so that the order of module slots does not matter."""
+  counts = Counter((m.name, m.tier) for m in modules if m is not None)
+  return tuple(sorted((name, tier, n) for (name, tier), n in counts.items()))
+
+def beaconKey(beacon: Beacon) -> tuple:
+  """Return a hashable key identifying a Beacon and its Modules."""
+  return beacon.name, beacon.efficiency, loadout(beacon.modules)
+
+def producerKey(producer: Producer) -> tuple:
+  """Return a hashable key identifying a Producer with its modules and the
+  Beacons affecting it, each as a multiset.
+
+  Producers are identified by class and name; Producers loaded from the
+  same Prototypes with equal names are the same machine.
+  """
+  beacons = Counter()
+  for beacon, count in producer.beacons:
+    beacons[beaconKey(beacon)] += count
+  return (type(producer).__name__, producer.name, loadout(producer.modules),
+          tuple(sorted(beacons.items())))
+
+
+class ResultCache():
+  """A least recently used cache with an optional time to live.
+
+  Cached values are returned as stored, not copied; callers must not change
+  them.
+
+  Attributes
+  ----------
+  maxSize: int
+      The number of entries kept; zero turns caching off.
+
+  ttl: float
+      Seconds an entry stays valid after it is stored, or None for no limit.
+
+  hits, misses: int
+      The lookups that found a valid entry, and those that did not.
+
+  evictions, expirations, invalidations: int
+      The entries dropped to make room, the entries dropped for being older
+      than ttl, and the times the whole cache was cleared.
+  """
+
+  def __init__(self, maxSize: int=CACHE_SIZE, ttl: float=None,
+               clock: Callable[[], float]=time.monotonic):
+    """
+    Parameters
+    ----------
+    maxSize: int, optional
+        The number of entries to keep. Defaults to CACHE_SIZE.
+
+    ttl: float, optional
+        Seconds each entry stays valid. Defaults to no limit.
+
+    clock: Callable, optional
+        The time source ttl is measured with. Defaults to time.monotonic.
+    """
+    if maxSize < 0:
+      raise ValueError(f'Cache size must not be negative, got {maxSize}')
+    if ttl is not None and ttl <= 0:
+      raise ValueError(f'Time to live must be positive, got {ttl}')
+    self.maxSize = maxSize
+    self.ttl = ttl
+    self.hits = self.misses = 0
+    self.evictions = self.expirations = self.invalidations = 0
+    self._clock = clock
+    # key -> (value, expiry time or None), least recently used first
+    self._entries = OrderedDict()
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {len(self._entries)}/{self.maxSize} '
+            f'entries, {self.hits} hits, {self.misses} misses>')
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def get(self, key: Hashable, default=None):
+    """Return the value stored under a key, or default if there is none or
+    it expired. Counts as a hit or a miss."""
+    entry = self._entries.get(key)
+    if entry is not None:
+      value, expiry = entry
+      if expiry is None or self._clock() < expiry:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+      del self._entries[key]
+      self.expirations += 1
+    self.misses += 1
+    return default
+
+  def put(self, key: Hashable, value):
+    """Store a value under a key, dropping the least recently used entries
+    beyond maxSize. Returns the value."""
+    if self.maxSize == 0:
+      return value
+    entries = self._entries
+    expiry = None
+    if self.ttl is not None:
+      now = self._clock()
+      expiry = now + self.ttl
+      # Entries are stored with the same ttl, so the least recently used are
+      # usually the oldest too; drop those that expired while here
+      while entries:
+        oldest = next(iter(entries))
+        if entries[oldest][1] is None or entries[oldest][1] > now:
+          break
+        del entries[oldest]
+        self.expirations += 1
+    entries[key] = value, expiry
+    entries.move_to_end(key)
+    while len(entries) > self.maxSize:
+      entries.popitem(last=False)
+      self.evictions += 1
+    return value
+
+  def clear(self):
+    """Drop every entry, e.g. when what the values were computed from
+    changed. Counts as an invalidation; statistics are kept."""
+    self._entries.clear()
+    self.invalidations += 1
+
+  def stats(self) -> dict:
+    """Return the size, settings and counters of the cache, as a
+    JSON-compatible dict."""
+    lookups = self.hits + self.misses
+    return {
+      'size': len(self._entries),
+      'maxSize': self.maxSize,
+      'ttl': self.ttl,
+      'hits': self.hits,
+      'misses': self.misses,
+      'hitRate': self.hits / lookups if lookups else 0.0,
+      'evictions': self.evictions,
+      'expirations': self.expirations,
+      'invalidations': self.invalidations
+    }
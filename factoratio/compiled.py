@@ -0,0 +1,280 @@
+"""compiled.py
+
+A compact, read-only form of Prototypes for number crunching: every product
+and Recipe gets a dense integer ID, and Recipe inputs and outputs are stored
+in flat NumPy arrays rather than as Ingredient objects.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('factoratio')
+
+
+def _csr(rows: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+  """Pack lists of integers into an index pointer and a flat array."""
+  ptr = np.zeros(len(rows) + 1, dtype=np.intp)
+  np.cumsum([len(row) for row in rows], out=ptr[1:])
+  flat = np.fromiter((x for row in rows for x in row), dtype=np.intp,
+                     count=int(ptr[-1]))
+  return ptr, flat
+
+
+class CompiledPrototypes():
+  """An array-backed snapshot of the Recipes of a Prototypes object.
+
+  Products and Recipes are numbered from zero, products in the order of
+  Prototypes.products and Recipes in the order of Prototypes.recipes. The
+  inputs and outputs of Recipe r are the entries inputPtr[r] to
+  inputPtr[r + 1] and outputPtr[r] to outputPtr[r + 1] of the respective
+  arrays, as in a CSR sparse matrix. The reverse indexes are stored the same
+  way, in the same order as Prototypes.recipesProducing and
+  recipesConsuming.
+
+  The snapshot does not follow later changes to the Prototypes; see
+  Prototypes.compiled, which rebuilds it when needed.
+
+  Attributes
+  ----------
+  products, recipes, categories: list of str
+      The names of the products, Recipes and crafting categories, by ID.
+
+  productIndex, recipeIndex, categoryIndex: dict of str: int
+      The ID of each name.
+
+  expensive: bool
+      Whether the Expensive Mode variants of Recipes were compiled.
+
+  time: numpy.ndarray of float
+      The crafting time of each Recipe.
+
+  category: numpy.ndarray of int
+      The crafting category ID of each Recipe.
+
+  inputPtr, inputIds, inputAmounts: numpy.ndarray
+      The input product IDs and amounts of each Recipe.
+
+  outputPtr, outputIds, outputAmounts, outputProbabilities: numpy.ndarray
+      The output product IDs, amounts and probabilities of each Recipe.
+
+  producingPtr, producingIds, consumingPtr, consumingIds: numpy.ndarray
+      The IDs of the Recipes making and using each product.
+  """
+
+  def __init__(self, prototypes, expensive: bool=False):
+    """
+    Parameters
+    ----------
+    prototypes: factoratio.prototype.Prototypes
+        The Prototypes to compile.
+
+    expensive: bool, optional
+        Whether to compile the Expensive Mode variants of Recipes. Defaults to
+        False.
+    """
+    self.expensive = expensive
+    self.products = list(prototypes.products)
+    self.productIndex = {name: i for i, name in enumerate(self.products)}
+    self.recipes = list(prototypes.recipes)
+    self.recipeIndex = {name: i for i, name in enumerate(self.recipes)}
+    self.categories = []
+    self.categoryIndex = {}
+
+    productIndex = self.productIndex
+    nRecipes = len(self.recipes)
+    time = np.empty(nRecipes)
+    category = np.empty(nRecipes, dtype=np.intp)
+    inputs, outputs = [], []
+    inputAmounts, outputAmounts, outputProbabilities = [], [], []
+    producing = [[] for _ in self.products]
+    consuming = [[] for _ in self.products]
+    for r, recipe in enumerate(prototypes.recipes.values()):
+      if expensive:
+        recipe = recipe.expensive() or recipe
+      time[r] = recipe.time
+      c = self.categoryIndex.get(recipe.category)
+      if c is None:
+        c = self.categoryIndex[recipe.category] = len(self.categories)
+        self.categories.append(recipe.category)
+      category[r] = c
+      ids = []
+      for x in recipe.input:
+        ids.append(productIndex[x.what.name])
+        inputAmounts.append(x.count)
+      inputs.append(ids)
+      for i in dict.fromkeys(ids):
+        consuming[i].append(r)
+      ids = []
+      for x in recipe.output:
+        ids.append(productIndex[x.what.name])
+        outputAmounts.append(x.count)
+        outputProbabilities.append(x.probability)
+      outputs.append(ids)
+      for i in dict.fromkeys(ids):
+        producing[i].append(r)
+
+    self.time = time
+    self.category = category
+    self.inputPtr, self.inputIds = _csr(inputs)
+    self.inputAmounts = np.array(inputAmounts, dtype=float)
+    self.outputPtr, self.outputIds = _csr(outputs)
+    self.outputAmounts = np.array(outputAmounts, dtype=float)
+    self.outputProbabilities = np.array(outputProbabilities, dtype=float)
+    self.producingPtr, self.producingIds = _csr(producing)
+    self.consumingPtr, self.consumingIds = _csr(consuming)
+    logger.debug(f'Compiled {self!r}')
+
+  # The array attributes, in the order they are laid out elsewhere, e.g. in
+  # a snapshot
+  ARRAYS = ('time', 'category', 'inputPtr', 'inputIds', 'inputAmounts',
+            'outputPtr', 'outputIds', 'outputAmounts', 'outputProbabilities',
+            'producingPtr', 'producingIds', 'consumingPtr', 'consumingIds')
+
+  @classmethod
+  def fromArrays(cls, products: List[str], recipes: List[str],
+                 categories: List[str], arrays: Dict[str, np.ndarray],
+                 expensive: bool=False) -> 'CompiledPrototypes':
+    """Assemble a compiled form from existing arrays, without copying them.
+
+    Parameters
+    ----------
+    products, recipes, categories: list of str
+        The names of the products, Recipes and crafting categories, by ID.
+
+    arrays: dict of str: numpy.ndarray
+        An array for each name in ARRAYS, laid out as the attribute of that
+        name.
+
+    expensive: bool, optional
+        Whether the arrays hold the Expensive Mode variants of Recipes.
+        Defaults to False.
+    """
+    compiled = cls.__new__(cls)
+    compiled.expensive = expensive
+    compiled.products = products
+    compiled.productIndex = {name: i for i, name in enumerate(products)}
+    compiled.recipes = recipes
+    compiled.recipeIndex = {name: i for i, name in enumerate(recipes)}
+    compiled.categories = categories
+    compiled.categoryIndex = {name: i for i, name in enumerate(categories)}
+    for name in cls.ARRAYS:
+      setattr(compiled, name, arrays[name])
+    return compiled
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {len(self.products)} products, '
+            f'{len(self.recipes)} Recipes, {len(self.inputIds)} inputs, '
+            f'{len(self.outputIds)} outputs>')
+
+  def inputs(self, recipe: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the product IDs and amounts of the inputs of a Recipe.
+
+    Parameters
+    ----------
+    recipe: int
+        The ID of the Recipe.
+    """
+    start, end = self.inputPtr[recipe], self.inputPtr[recipe + 1]
+    return self.inputIds[start:end], self.inputAmounts[start:end]
+
+  def outputs(self, recipe: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the product IDs and expected amounts of the outputs of a Recipe.
+
+    Expected amounts have the output probabilities folded in.
+
+    Parameters
+    ----------
+    recipe: int
+        The ID of the Recipe.
+    """
+    start, end = self.outputPtr[recipe], self.outputPtr[recipe + 1]
+    return (self.outputIds[start:end], self.outputAmounts[start:end]
+            * self.outputProbabilities[start:end])
+
+  def made(self, recipe: int, product: int) -> float:
+    """Return the expected amount of a product a Recipe makes per craft.
+
+    Parameters
+    ----------
+    recipe: int
+        The ID of the Recipe.
+
+    product: int
+        The ID of the product.
+    """
+    ids, amounts = self.outputs(recipe)
+    return float(amounts[ids == product].sum())
+
+  def producing(self, product: int) -> np.ndarray:
+    """Return the IDs of the Recipes that have a product as output.
+
+    Parameters
+    ----------
+    product: int
+        The ID of the product.
+    """
+    return self.producingIds[self.producingPtr[product]
+                             :self.producingPtr[product + 1]]
+
+  def consuming(self, product: int) -> np.ndarray:
+    """Return the IDs of the Recipes that have a product as input.
+
+    Parameters
+    ----------
+    product: int
+        The ID of the product.
+    """
+    return self.consumingIds[self.consumingPtr[product]
+                             :self.consumingPtr[product + 1]]
+
+  def coo(self) -> Dict[str, np.ndarray]:
+    """Return the products x Recipes matrix of expected amounts per craft.
+
+    Returns a dict of arrays in coordinate format: 'rows' (product IDs),
+    'cols' (Recipe IDs), 'values' (negative for inputs) and 'isOutput'.
+    """
+    inputRecipes = np.repeat(np.arange(len(self.recipes)),
+                             np.diff(self.inputPtr))
+    outputRecipes = np.repeat(np.arange(len(self.recipes)),
+                              np.diff(self.outputPtr))
+    return {
+      'rows': np.concatenate((self.inputIds, self.outputIds)),
+      'cols': np.concatenate((inputRecipes, outputRecipes)),
+      'values': np.concatenate((-self.inputAmounts, self.outputAmounts
+                                * self.outputProbabilities)),
+      'isOutput': np.concatenate((np.zeros(len(self.inputIds), dtype=bool),
+                                  np.ones(len(self.outputIds), dtype=bool)))
+    }
+
+  def rates(self, recipe: int, producer, counts=1, effects=None) -> dict:
+    """Calculate all rates of a Recipe for many counts and module loadouts.
+
+    The compiled counterpart of Producer.batchRates, with identical results,
+    except that 'consumed' and 'produced' are (ids, rates) tuples: the
+    product IDs of the Recipe inputs or outputs, and an array of rates with
+    one column per ID following the combination axes.
+
+    Parameters
+    ----------
+    recipe: int
+        The ID of the Recipe.
+
+    producer: factoratio.producer.Producer
+        The Producer crafting the Recipe.
+
+    counts, effects: array_like, optional
+        See Producer.batchRates.
+    """
+    rateDict, crafts, productivity = producer._batch(self.time[recipe], counts,
+                                                     effects)
+    crafts = crafts[..., np.newaxis]
+    start, end = self.inputPtr[recipe], self.inputPtr[recipe + 1]
+    rateDict['consumed'] = (self.inputIds[start:end],
+                            crafts * self.inputAmounts[start:end])
+    start, end = self.outputPtr[recipe], self.outputPtr[recipe + 1]
+    rateDict['produced'] = (self.outputIds[start:end],
+                            crafts * self.outputAmounts[start:end]
+                            * productivity[..., np.newaxis])
+    return rateDict
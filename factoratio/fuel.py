@@ -3,7 +3,7 @@ from typing import Union
 
 from factoratio.util import Joule, Watt
 
-@dataclass
+@dataclass(slots=True)
 class Fuel():
   """Class representing a fuel source.
 
@@ -0,0 +1,297 @@
+"""instrument.py
+
+Timing spans for the phases of slow operations, such as loading prototypes,
+with counters of the work done in each phase.
+
+Spans are only recorded while a Profile is active or a callback is
+registered; otherwise span() hands out a shared no-op span and costs next to
+nothing. Recording is not thread-safe, but spans recorded in worker
+processes can be shipped back as dicts and attached; see attach.
+
+Example
+-------
+>>> with instrument.profile('startup') as startup:
+...   prototypes = prototype.initialize(protoPath)
+>>> print(startup.format())
+>>> startup.dump(Path('startup.json'))
+"""
+
+import contextlib
+from datetime import datetime, timezone
+import json
+import logging
+from pathlib import Path
+import time
+from typing import (Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+logger = logging.getLogger('factoratio')
+
+Number = Union[int, float]
+
+
+class Span():
+  """A timed phase of work.
+
+  Attributes
+  ----------
+  name: str
+      The name of the phase.
+
+  start: float
+      When the phase started, as a time.perf_counter value.
+
+  duration: float
+      How long the phase took, in seconds.
+
+  counters: dict of str: int or float
+      Amounts of work done in the phase, e.g. files read.
+
+  children: list of Span
+      The phases nested in this one, in the order they finished.
+  """
+
+  __slots__ = ('name', 'start', 'duration', 'counters', 'children')
+
+  def __init__(self, name: str, start: float=0.0, duration: float=0.0,
+               counters: Dict[str, Number]=None, children: List['Span']=None):
+    self.name = name
+    self.start = start
+    self.duration = duration
+    self.counters = counters if counters is not None else {}
+    self.children = children if children is not None else []
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {self.name!r} '
+            f'{self.duration * 1e3:.2f}ms {self.counters}>')
+
+  def count(self, counter: str, n: Number=1):
+    """Add n to a counter."""
+    self.counters[counter] = self.counters.get(counter, 0) + n
+
+  def walk(self, depth: int=0) -> Iterator[Tuple[int, 'Span']]:
+    """Yield this span and all nested ones, with their nesting depth."""
+    yield depth, self
+    for child in self.children:
+      yield from child.walk(depth + 1)
+
+  def toDict(self, origin: float=None) -> dict:
+    """Convert the span and its children to JSON-compatible dicts.
+
+    Parameters
+    ----------
+    origin: float, optional
+        A time.perf_counter value that start times are given relative to.
+        Defaults to the start of this span.
+    """
+    if origin is None:
+      origin = self.start
+    return {
+      'name': self.name,
+      'start': self.start - origin,
+      'duration': self.duration,
+      'counters': dict(self.counters),
+      'children': [child.toDict(origin) for child in self.children]
+    }
+
+  @classmethod
+  def fromDict(cls, data: dict, origin: float=0.0) -> 'Span':
+    """Rebuild a span from the result of toDict with the same origin."""
+    return cls(data['name'], origin + data['start'], data['duration'],
+               dict(data['counters']),
+               [cls.fromDict(child, origin) for child in data['children']])
+
+
+class _NullSpan(Span):
+  """The span handed out while nothing is recording; it ignores counts."""
+
+  __slots__ = ()
+
+  def __bool__(self) -> bool:
+    return False
+
+  def count(self, counter: str, n: Number=1):
+    pass
+
+NULL_SPAN = _NullSpan('null')
+
+
+class Profile():
+  """The spans recorded while the profile was active; see profile.
+
+  Attributes
+  ----------
+  root: Span
+      A span covering the whole time the profile was active, with the
+      outermost recorded spans as its children.
+
+  created: datetime
+      When the profile became active.
+  """
+
+  def __init__(self, name: str='profile'):
+    self.root = Span(name, time.perf_counter())
+    self.created = datetime.now(timezone.utc)
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {self.root.name!r} '
+            f'{len(self.root.children)} spans>')
+
+  @property
+  def spans(self) -> List[Span]:
+    """The outermost recorded spans."""
+    return self.root.children
+
+  def find(self, name: str) -> List[Span]:
+    """Return every recorded span with the given name."""
+    return [span for _, span in self.root.walk() if span.name == name]
+
+  def totals(self) -> Dict[str, dict]:
+    """Sum the durations and counters of the recorded spans by name."""
+    totals = {}
+    for depth, span in self.root.walk():
+      if depth:
+        total = totals.setdefault(span.name, {'calls': 0, 'duration': 0.0,
+                                              'counters': {}})
+        total['calls'] += 1
+        total['duration'] += span.duration
+        for counter, n in span.counters.items():
+          total['counters'][counter] = total['counters'].get(counter, 0) + n
+    return totals
+
+  def toDict(self) -> dict:
+    """Convert the profile to a JSON-compatible dict."""
+    data = self.root.toDict()
+    data['created'] = self.created.isoformat(timespec='seconds')
+    return data
+
+  def dump(self, path: Path, indent: int=2):
+    """Write the profile to a JSON file; see toDict."""
+    with path.open('w', encoding='utf-8') as f:
+      json.dump(self.toDict(), f, indent=indent)
+      f.write('\n')
+
+  def format(self) -> str:
+    """Return the spans as an indented table of durations and counters."""
+    lines = []
+    for depth, span in self.root.walk():
+      counters = ', '.join(f'{name}={n:g}' for name, n in span.counters.items())
+      lines.append(f"{'  ' * depth + span.name:<40} "
+                   f'{span.duration * 1e3:>10.2f}ms  {counters}'.rstrip())
+    return '\n'.join(lines)
+
+
+class _State():
+  """What is currently recording; see span and profile."""
+
+  def __init__(self):
+    self.profile: Optional[Profile] = None
+    self.stack: List[Span] = []
+    self.callbacks: List[Callable[[Span, Tuple[str, ...]], None]] = []
+
+_state = _State()
+
+
+def enabled() -> bool:
+  """Return whether spans are currently being recorded.
+
+  Useful to skip computing counters that nothing would see.
+  """
+  return _state.profile is not None or bool(_state.callbacks)
+
+def addCallback(callback: Callable[[Span, Tuple[str, ...]], None]):
+  """Call a function with every span as it finishes, until removed.
+
+  The function is given the span and the names of the spans enclosing it,
+  outermost first. Registering a callback turns recording on, with or
+  without an active Profile.
+  """
+  _state.callbacks.append(callback)
+
+def removeCallback(callback: Callable[[Span, Tuple[str, ...]], None]):
+  """Stop calling a function registered with addCallback."""
+  _state.callbacks.remove(callback)
+
+@contextlib.contextmanager
+def span(name: str, **counters: Number) -> Iterator[Span]:
+  """Time the enclosed block as a span, nested in any enclosing one.
+
+  Yields the Span, to add counters to, or NULL_SPAN when nothing is
+  recording; NULL_SPAN is falsy and ignores counts.
+
+  Parameters
+  ----------
+  name: str
+      The name of the phase.
+
+  counters: int or float
+      Initial counter values.
+  """
+  state = _state
+  if state.profile is None and not state.callbacks:
+    yield NULL_SPAN
+    return
+  current = Span(name, time.perf_counter(), counters=counters)
+  state.stack.append(current)
+  try:
+    yield current
+  finally:
+    current.duration = time.perf_counter() - current.start
+    state.stack.pop()
+    _finish(current)
+
+def _finish(finished: Span):
+  """Attach a finished span to its parent and notify callbacks."""
+  state = _state
+  if state.stack:
+    state.stack[-1].children.append(finished)
+  elif state.profile is not None:
+    state.profile.root.children.append(finished)
+  if state.callbacks:
+    parents = tuple(x.name for x in state.stack)
+    for callback in list(state.callbacks):
+      try:
+        callback(finished, parents)
+      except Exception:
+        logger.exception(f'Instrumentation callback {callback!r} failed')
+
+def attach(spans: Iterable[dict], origin: float=0.0):
+  """Record spans converted with Span.toDict, e.g. in a worker process.
+
+  The spans are nested in the currently open span, if any, as if they had
+  just finished. Nothing happens when nothing is recording.
+
+  Parameters
+  ----------
+  spans: Iterable of dict
+      The converted spans.
+
+  origin: float, optional
+      The origin the spans were converted with. Defaults to zero, i.e.
+      absolute time.perf_counter values, which are comparable between
+      processes on the same machine.
+  """
+  if enabled():
+    for data in spans:
+      _finish(Span.fromDict(data, origin))
+
+@contextlib.contextmanager
+def profile(name: str='profile') -> Iterator[Profile]:
+  """Record all spans in the enclosed block into a new Profile.
+
+  Profiles may be nested; spans go to the innermost one only.
+
+  Parameters
+  ----------
+  name: str, optional
+      The name of the root span of the profile.
+  """
+  state = _state
+  outer = state.profile, state.stack
+  state.profile, state.stack = Profile(name), []
+  try:
+    yield state.profile
+  finally:
+    root = state.profile.root
+    root.duration = time.perf_counter() - root.start
+    state.profile, state.stack = outer
@@ -1,5 +1,6 @@
 from collections import abc
 from dataclasses import dataclass
+import sys
 from typing import List, Union
 
 from factoratio.util import Joule
@@ -78,13 +79,16 @@ class ItemGroup(abc.MutableMapping):
     return len(self._children)
 
   def __bool__(self):
-    return self._children.__bool__()
+    return bool(self._children)
 
 
-@dataclass
+@dataclass(slots=True)
 class Item():
   """Class representing an arbitrary game item.
 
+  Items are held in large numbers, so they have no attribute dict, and their
+  names and types are interned.
+
   Attributes
   ----------
   name: str
@@ -107,14 +111,20 @@ class Item():
   order: str
   # icon = ... # TODO: Will be relevent when the GUI code is started
 
+  def __post_init__(self):
+    self.name = sys.intern(self.name)
+    self.type = sys.intern(self.type)
+
   def __str__(self):
     return f'{self.name}'
 
 
-@dataclass
+@dataclass(slots=True)
 class Fluid():
   """Class representing an arbitrary game fluid.
 
+  Like Items, Fluids have no attribute dict and their names are interned.
+
   Attributes
   ----------
   name: str
@@ -142,6 +152,7 @@ class Fluid():
   # icon: ... # TODO
 
   def __post_init__(self):
+    self.name = sys.intern(self.name)
     if isinstance(self.heat_capacity, str):
       self.heat_capacity = Joule(self.heat_capacity)
     else:
@@ -151,7 +162,7 @@ class Fluid():
     return f'{self.name}'
 
 
-@dataclass
+@dataclass(slots=True)
 class Ingredient():
   """Class representing a crafting ingredient.
 
@@ -198,23 +209,32 @@ class Recipe():
 
   input_, output: List of Ingredients
       List of Ingredients for Recipe input and output.
+
+  category: str
+      The crafting category of the Recipe, which determines the Producers
+      able to craft it. Defaults to 'crafting'.
   """
 
+  __slots__ = ('time', 'input', 'output', 'category', '_expensive',
+               '_isExpensive')
+
   def __init__(self, time: float, input_: List[Ingredient],
-               output: List[Ingredient]):
+               output: List[Ingredient], category: str='crafting'):
     self.time = time
     self.input = input_
     self.output = output
+    self.category = sys.intern(category)
     self._expensive = None
     self._isExpensive = False
 
   def __repr__(self):
     return (f'{self.__class__.__name__}({self.time!r}, {self.input!r}, '
-            f'{self.output!r})')
+            f'{self.output!r}, {self.category!r})')
 
   @classmethod
   def miningRecipe(cls, time: float, item: Item, input_: List[Ingredient]=None,
-                   output: List[Ingredient]=None):
+                   output: List[Ingredient]=None,
+                   category: str='basic-solid'):
     """Alternative constructor for mining drill Recipes.
 
     Typically a mining drill produces whatever resource it is placed on, and
@@ -238,12 +258,16 @@ class Recipe():
     output: List of Ingredients, optional
         The products that the drill extracts. Defaults to the item parameter
         with a quantity of one.
+
+    category: str, optional
+        The resource category of the resource being mined. Defaults to
+        'basic-solid'.
     """
     if input_ is None:
       input_ = []
     if output is None:
       output = [Ingredient(item, 1)]
-    return cls(input_, output, time)
+    return cls(time, input_, output, category)
 
   def expensive(self) -> 'Recipe':
     """Returns the Expensive Mode variant of this Recipe."""
@@ -301,14 +325,16 @@ class PumpjackRecipe(Recipe):
       The time for the Recipe to complete. Modified by a Producer's crafting
       speed.
 
-  output: Ingredient
-      The Fluid returned by this Recipe.
+  output: List of Ingredients
+      The Fluid returned by this Recipe, as its only output.
 
   baseAmt: float
       The base amount of the output Fluid per cycle. This is multiplied by the
       field's yield to get the final output amount per cycle.
   """
 
+  __slots__ = ('baseAmt',)
+
   def __init__(self, time: float, output: Ingredient, baseAmt: float):
-    super().__init__(time, [], output)
+    super().__init__(time, [], [output], 'basic-fluid')
     self.baseAmt = baseAmt
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""matrix.py
+
+Linear-algebra solving of production chains, for Recipes with several
+products whose outputs feed several chains at once, such as oil processing.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from factoratio.compiled import CompiledPrototypes
+from factoratio.solver import EPSILON, Solver
+
+try:
+  from scipy.sparse import csc_matrix
+  from scipy.sparse.linalg import spsolve
+except ImportError:
+  spsolve = None
+
+logger = logging.getLogger('factoratio')
+
+# Systems at least this large are solved as sparse matrices, if SciPy is
+# available.
+SPARSE_THRESHOLD = 200
+
+
+class RecipeMatrix():
+  """A sparse items x recipes coefficient matrix, in coordinate format.
+
+  Each entry is the amount of an Item or Fluid a Recipe produces (positive)
+  or consumes (negative) per craft, with Ingredient probability folded in.
+  Productivity is not included, since it depends on the Producer; outputs
+  are flagged so it can be applied when solving.
+
+  Rows and columns are the product and Recipe IDs of a CompiledPrototypes.
+
+  Attributes
+  ----------
+  compiled: factoratio.compiled.CompiledPrototypes
+      The compiled Prototypes the matrix was built from.
+
+  items, recipes: list of str
+      The names of the rows and columns of the matrix.
+
+  itemIndex, recipeIndex: dict of str: int
+      The row and column of each Item and Recipe name.
+
+  rows, cols: numpy.ndarray of int
+      The row and column of each entry.
+
+  values: numpy.ndarray of float
+      The value of each entry.
+
+  isOutput: numpy.ndarray of bool
+      Whether each entry is a Recipe output.
+  """
+
+  def __init__(self, compiled: CompiledPrototypes):
+    """
+    Parameters
+    ----------
+    compiled: factoratio.compiled.CompiledPrototypes
+        The compiled Prototypes whose Recipes make up the matrix.
+    """
+    self.compiled = compiled
+    self.items, self.itemIndex = compiled.products, compiled.productIndex
+    self.recipes, self.recipeIndex = compiled.recipes, compiled.recipeIndex
+    coo = compiled.coo()
+    self.rows, self.cols = coo['rows'], coo['cols']
+    self.values, self.isOutput = coo['values'], coo['isOutput']
+
+  @property
+  def shape(self) -> Tuple[int, int]:
+    return len(self.items), len(self.recipes)
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {self.shape[0]}x{self.shape[1]}, '
+            f'{len(self.values)} entries>')
+
+
+@dataclass
+class Plan():
+  """A balanced production plan for a set of targets.
+
+  Attributes
+  ----------
+  targets: dict of str: float
+      The target rates, in units per second.
+
+  crafts: dict of str: float
+      The rate each Recipe is crafted at, in crafts per second.
+
+  machines: dict of str: float
+      The number of Producers needed for each Recipe.
+
+  raw: dict of str: float
+      The rate at which each raw resource is drawn.
+
+  surplus: dict of str: float
+      The rate at which products are made beyond what the targets and the
+      plan itself consume.
+
+  primary: dict of str: str
+      The product each Recipe was solved for, by Recipe name.
+  """
+
+  targets: Dict[str, float]
+  crafts: Dict[str, float]
+  machines: Dict[str, float]
+  raw: Dict[str, float]
+  surplus: Dict[str, float]
+  primary: Dict[str, str]
+
+
+class MatrixSolver(Solver):
+  """Solves production plans as a system of linear equations.
+
+  Every product in a plan that isn't a raw resource is assigned a Recipe
+  responsible for it, its "primary" Recipe, and crafting rates are solved
+  for so that each such product is made exactly as fast as it is consumed
+  or targeted. Products made by a Recipe assigned to something else are
+  byproducts; any excess of them is reported as surplus.
+
+  Assignments are then corrected until the plan is feasible:
+
+    * A Recipe solved to run backwards has its product covered by
+      byproducts already, and is dropped. Only the one running backwards
+      the most is dropped at a time, since the others may be doing so
+      because of it, and the last Recipe left for a product is never ruled
+      out for good.
+    * A byproduct consumed faster than it is made is assigned a Recipe of
+      its own, or takes over a Recipe assigned to another product, which in
+      turn looks for another.
+
+  Only the Recipes a plan needs are put in the system, so its size depends on
+  the plan rather than on the size of the Prototypes. Recipe choices,
+  Producers and raw resources are as for Solver.
+  """
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self._matrix = None
+
+  def clear(self):
+    super().clear()
+    self._matrix = None
+
+  def matrix(self) -> RecipeMatrix:
+    """Return the coefficient matrix of every Recipe in the Prototypes."""
+    compiled = self.compiled
+    if self._matrix is None or self._matrix.compiled is not compiled:
+      self._matrix = RecipeMatrix(compiled)
+      logger.debug(f'Built recipe matrix: {self._matrix!r}')
+    return self._matrix
+
+  def _producing(self, itemName: str) -> List[str]:
+    """Return the names of the Recipes making a product."""
+    compiled = self.compiled
+    return [compiled.recipes[r] for r in
+            compiled.producing(compiled.productIndex[itemName]).tolist()]
+
+  def _candidates(self, itemName: str, used: Dict[str, str],
+                  excluded: set) -> List[str]:
+    """Return the Recipes that may be assigned to a product, best first."""
+    candidates = self._producing(itemName)
+    first = self.recipeFor(itemName)[0]
+    if first is not None:
+      candidates.remove(first)
+      candidates.insert(0, first)
+    return [name for name in candidates
+            if name not in used and (itemName, name) not in excluded]
+
+  def balance(self, targets: Dict[str, float],
+              maxIterations: int=None) -> Plan:
+    """Balance a production plan for a set of target rates.
+
+    Parameters
+    ----------
+    targets: dict of str: float
+        The target rate of each product, in units per second.
+
+    maxIterations: int, optional
+        The maximum number of times the assignments are corrected. Defaults
+        to a bound that always suffices.
+
+    Raises
+    ------
+    ValueError
+        If the plan cannot be balanced, e.g. because of a singular system or
+        a product that cannot be made fast enough.
+    """
+    matrix = self.matrix()
+    compiled = matrix.compiled
+    itemIndex = matrix.itemIndex
+    target = np.zeros(matrix.shape[0])
+    for name, rate in targets.items():
+      i = itemIndex.get(name)
+      if i is None or not (len(compiled.producing(i))
+                           or len(compiled.consuming(i))):
+        raise ValueError(f"No Recipe makes or uses '{name}'")
+      target[i] = rate
+
+    primary = {} # Product -> Recipe
+    used = {} # Recipe -> product
+    excluded = set() # Assignments given up on
+    queue = deque(targets)
+    if maxIterations is None:
+      maxIterations = 2 * len(matrix.values) + 1
+
+    for _ in range(maxIterations):
+      # Assign Recipes to every product the current Recipes need
+      while queue:
+        name = queue.popleft()
+        if name in primary or name in self.raw:
+          continue
+        candidates = self._candidates(name, used, excluded)
+        if candidates:
+          primary[name] = candidates[0]
+          used[candidates[0]] = name
+          ids = compiled.inputs(compiled.recipeIndex[candidates[0]])[0]
+          queue.extend(matrix.items[i] for i in ids.tolist())
+
+      products = list(primary)
+      recipes = [primary[name] for name in products]
+      x, net = self._solve(matrix, products, recipes, target)
+
+      # Only the Recipe running backwards the most is dropped at a time;
+      # others may only do so because of it
+      i = int(np.argmin(x)) if len(x) else 0
+      if len(x) and x[i] < -EPSILON:
+        name, recipe = products[i], recipes[i]
+        logger.debug(f"Dropping Recipe '{recipe}': '{name}' is covered by "
+                     f"byproducts")
+        del primary[name], used[recipe]
+        # The last Recipe left for a product stays available, in case it
+        # turns out to be needed after all
+        if self._candidates(name, used, excluded | {(name, recipe)}):
+          excluded.add((name, recipe))
+        continue
+
+      short = [matrix.items[i] for i in np.flatnonzero(net < target - EPSILON)]
+      short = [name for name in short if name not in self.raw
+               and name not in primary and self._producing(name)]
+      if not short:
+        break
+      for name in short:
+        if self._candidates(name, used, excluded):
+          queue.append(name)
+          continue
+        # Take over a Recipe assigned to another product
+        for recipe in self._producing(name):
+          other = used.get(recipe)
+          if other is not None and (name, recipe) not in excluded:
+            logger.debug(f"Reassigning Recipe '{recipe}' from '{other}' "
+                         f"to '{name}'")
+            excluded.add((other, recipe))
+            del primary[other]
+            primary[name] = recipe
+            used[recipe] = name
+            queue.append(other)
+            break
+        else:
+          raise ValueError(f"Cannot make enough '{name}'")
+    else:
+      raise ValueError('Plan did not converge in '
+                       f'{maxIterations} iterations')
+
+    crafts, machines = {}, {}
+    for name, rate in zip(recipes, x):
+      if rate > EPSILON:
+        crafts[name] = rate = float(rate)
+        recipe = self._recipe(name)
+        machines[name] = (rate * self.producerFor(recipe)
+                          .craft(recipe)['duration'])
+    raw, surplus = {}, {}
+    for i in np.flatnonzero(np.abs(net - target) > EPSILON):
+      name = matrix.items[i]
+      if net[i] < target[i]:
+        raw[name] = float(target[i] - net[i])
+      else:
+        surplus[name] = float(net[i] - target[i])
+    return Plan(dict(targets), crafts, machines, raw, surplus,
+                {name: used[name] for name in crafts})
+
+  def _solve(self, matrix: RecipeMatrix, products: List[str],
+             recipes: List[str],
+             target: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Solve for the crafting rates of Recipes, one per product.
+
+    Returns the crafting rate of each Recipe and the resulting net rate of
+    every item in the matrix.
+    """
+    nItems, nRecipes = matrix.shape
+    n = len(recipes)
+    col = np.full(nRecipes, -1, dtype=np.intp)
+    recipeIndices = np.array([matrix.recipeIndex[name] for name in recipes],
+                             dtype=np.intp)
+    itemIndices = np.array([matrix.itemIndex[name] for name in products],
+                           dtype=np.intp)
+    col[recipeIndices] = np.arange(n)
+    row = np.full(nItems, -1, dtype=np.intp)
+    row[itemIndices] = np.arange(n)
+
+    productivity = np.ones(nRecipes)
+    productivity[recipeIndices] = [
+      self.producerFor(self._recipe(name)).productivityMultiplier()
+      for name in recipes]
+    scale = np.where(matrix.isOutput, productivity[matrix.cols], 1.0)
+    values = matrix.values * scale
+
+    entries = col[matrix.cols] >= 0
+    rows, cols = row[matrix.rows[entries]], col[matrix.cols[entries]]
+    square = rows >= 0
+    rows, cols = rows[square], cols[square]
+    b = target[itemIndices]
+    try:
+      if spsolve is not None and n >= SPARSE_THRESHOLD:
+        a = csc_matrix((values[entries][square], (rows, cols)), shape=(n, n))
+        x = np.atleast_1d(spsolve(a, b))
+        if not np.all(np.isfinite(x)):
+          raise np.linalg.LinAlgError('Singular matrix')
+      else:
+        a = np.zeros((n, n))
+        np.add.at(a, (rows, cols), values[entries][square])
+        x = np.linalg.solve(a, b) if n else np.zeros(0)
+    except np.linalg.LinAlgError:
+      raise ValueError('Recipes do not form a solvable system: '
+                       + ', '.join(recipes))
+
+    rates = np.zeros(nRecipes)
+    rates[col >= 0] = x[col[col >= 0]]
+    net = np.bincount(matrix.rows[entries],
+                      weights=values[entries] * rates[matrix.cols[entries]],
+                      minlength=nItems)
+    return x, net
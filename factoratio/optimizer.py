@@ -0,0 +1,257 @@
+"""optimizer.py
+
+Searches module loadouts for Producers: which Modules to put in a
+Producer's slots to craft a Recipe with the fewest machines, the least energy,
+the least pollution, or a weighted mix of those.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import itertools
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from factoratio.item import Recipe
+from factoratio.producer import Effects, Module, Producer, baseModules
+from factoratio.producer import effectsArray
+
+logger = logging.getLogger('factoratio')
+
+# The metrics a loadout is scored on, in the order of Loadout.metrics
+METRICS = ('machines', 'energy', 'pollution')
+
+
+@dataclass
+class Loadout():
+  """A module loadout for a Producer crafting a Recipe at some rate.
+
+  Attributes
+  ----------
+  modules: tuple of Module
+      The Modules in the Producer's slots, None for empty slots. Slot order
+      is irrelevant, so Modules are grouped together.
+
+  effects: factoratio.producer.Effects
+      The combined multipliers of the Modules.
+
+  machines: float
+      The number of Producers needed.
+
+  energy: float
+      The power drawn by all of the Producers, in Watts.
+
+  pollution: float
+      The pollution produced by all of the Producers, per minute.
+
+  score: float
+      The value of the objective; lower is better.
+  """
+
+  modules: Tuple[Optional[Module], ...]
+  effects: Effects
+  machines: float
+  energy: float
+  pollution: float
+  score: float
+
+  @property
+  def metrics(self) -> Tuple[float, float, float]:
+    return self.machines, self.energy, self.pollution
+
+
+def loadouts(producer: Producer, modules: Iterable[Module]=None,
+             allowProductivity: bool=True) -> List[Tuple[Optional[Module], ...]]:
+  """Return every distinct module loadout for a Producer.
+
+  Loadouts are multisets of Modules, since slot order does not matter, with
+  any number of slots left empty.
+
+  Parameters
+  ----------
+  producer: factoratio.producer.Producer
+      The Producer to fill.
+
+  modules: Iterable of Module, optional
+      The Modules to choose from. Defaults to every Module in the
+      baseModules dict of factoratio.producer.
+
+  allowProductivity: bool, optional
+      Whether Modules with a productivity bonus may be used; in Factorio,
+      they are limited to intermediate products. Defaults to True.
+  """
+  if modules is None:
+    modules = baseModules.values()
+  candidates = [m for m in modules if allowProductivity or not m.productivity]
+  # None sorts last, so empty slots end up at the end of the loadout
+  return list(itertools.combinations_with_replacement(
+    candidates + [None], producer.maxSlots))
+
+def paretoFront(metrics: np.ndarray) -> np.ndarray:
+  """Return the indices of the rows of metrics that no other row dominates.
+
+  A row dominates another if it is no worse in every metric and better in at
+  least one; lower is better. Of identical rows, only the first is kept.
+
+  Parameters
+  ----------
+  metrics: numpy.ndarray
+      One row per candidate, one column per metric.
+  """
+  _, first = np.unique(metrics, axis=0, return_index=True)
+  candidates = np.sort(first)
+  rows = metrics[candidates]
+  keep = np.ones(len(rows), dtype=bool)
+  for i, row in enumerate(rows):
+    if keep[i]:
+      # Everything this row dominates
+      dominated = np.all(row <= rows, axis=1) & np.any(row < rows, axis=1)
+      keep &= ~dominated
+  return candidates[keep]
+
+def _weights(objective: Union[str, Dict[str, float]]) -> np.ndarray:
+  if isinstance(objective, str):
+    objective = {objective: 1.0}
+  unknown = set(objective) - set(METRICS)
+  if unknown:
+    raise ValueError(f'Unknown objective metrics: {", ".join(unknown)}; '
+                     f'expected any of {", ".join(METRICS)}')
+  return np.array([objective.get(name, 0.0) for name in METRICS])
+
+def optimize(recipe: Recipe, producer: Producer, itemName: str,
+             rate: float=1.0,
+             objective: Union[str, Dict[str, float]]='machines',
+             modules: Iterable[Module]=None,
+             allowProductivity: bool=True) -> List[Loadout]:
+  """Find the best module loadouts for a Producer crafting a Recipe.
+
+  Every distinct loadout is scored at once, from the multipliers of its
+  Modules. Returns the Pareto-optimal loadouts, i.e. those not beaten in
+  every metric by another, best first. The best loadout for any weighting of
+  the metrics is among them.
+
+  Parameters
+  ----------
+  recipe: Recipe
+      The Recipe being crafted.
+
+  producer: factoratio.producer.Producer
+      The Producer crafting it. Its current modules are ignored, but its
+      Beacons apply to every loadout.
+
+  itemName: str
+      The product of the Recipe being targeted.
+
+  rate: float, optional
+      The target production rate, in units per second. Defaults to one.
+
+  objective: str or dict of str: float, optional
+      The metric to minimize, one of METRICS, or a weight for each metric to
+      minimize the weighted sum. Metrics are in machines, Watts and
+      pollution per minute respectively. Defaults to 'machines'.
+
+  modules: Iterable of Module, optional
+      The Modules to choose from. Defaults to every Module in the
+      baseModules dict of factoratio.producer.
+
+  allowProductivity: bool, optional
+      Whether Modules with a productivity bonus may be used. Defaults to
+      True.
+  """
+  weights = _weights(objective)
+  amount = sum(x.count * x.probability for x in recipe.output
+               if x.what.name == itemName)
+  if not amount:
+    raise ValueError(f"Recipe does not produce '{itemName}'")
+  candidates = loadouts(producer, modules, allowProductivity)
+  effects = effectsArray(candidates, producer.beacons)
+  speed, energy, productivity, pollution = effects.T
+
+  # Same as Producer.productionRateInverse and rates, for every loadout,
+  # with products counted by their expected amount per craft
+  duration = recipe.time / (producer.craftSpeed * speed)
+  machines = rate * duration / (amount * productivity)
+  metrics = np.column_stack((
+    machines,
+    machines * (float(producer.drain) + float(producer.energyUsage) * energy),
+    machines * producer.pollution * pollution * energy
+  ))
+
+  front = paretoFront(metrics)
+  scores = metrics[front] @ weights
+  order = front[np.argsort(scores, kind='stable')]
+  return [Loadout(candidates[i], Effects(*effects[i]), *map(float, metrics[i]),
+                  float(metrics[i] @ weights))
+          for i in order]
+
+def _optimize(args: tuple) -> List[Loadout]:
+  """Worker function for optimizeMany."""
+  return optimize(*args)
+
+def optimizeMany(tasks: Iterable[Tuple[Recipe, Producer, str, float]],
+                 objective: Union[str, Dict[str, float]]='machines',
+                 modules: Iterable[Module]=None,
+                 allowProductivity: bool=True, parallel: bool=True,
+                 workers: int=None) -> List[List[Loadout]]:
+  """Run optimize for many Recipes, e.g. every step of a factory.
+
+  Returns the result of optimize for each task, in order.
+
+  Parameters
+  ----------
+  tasks: Iterable of (Recipe, Producer, str, float) tuples
+      The Recipe, Producer, targeted product and rate of each optimization.
+
+  objective, modules, allowProductivity:
+      See optimize; shared by all tasks.
+
+  parallel: bool, optional
+      Whether to spread the tasks over a pool of worker processes. Defaults
+      to True.
+
+  workers: int, optional
+      The maximum number of worker processes. Defaults to the number of CPUs.
+      Tasks are run serially if this ends up being one.
+  """
+  modules = list(baseModules.values() if modules is None else modules)
+  args = [(recipe, producer, itemName, rate, objective, modules,
+           allowProductivity)
+          for recipe, producer, itemName, rate in tasks]
+  workers = min(workers or os.cpu_count() or 1, len(args))
+  if parallel and workers > 1:
+    # Tasks are cheap to run but not to send, so send them in a few batches
+    # per worker
+    chunksize = max(1, len(args) // (workers * 4))
+    with ProcessPoolExecutor(workers) as pool:
+      return list(pool.map(_optimize, args, chunksize=chunksize))
+  return [_optimize(x) for x in args]
+
+def optimizeChain(solver, chain, **kwargs) -> Dict[str, List[Loadout]]:
+  """Run optimize for every Recipe in a solved production chain.
+
+  Returns the result of optimize for each Recipe, by Recipe name. Recipes
+  shared by a Recipe cycle are optimized for the product they were chosen
+  for.
+
+  Parameters
+  ----------
+  solver: factoratio.solver.Solver
+      The Solver that solved the chain.
+
+  chain: factoratio.solver.Chain
+      The solved chain.
+
+  kwargs:
+      Passed on to optimizeMany.
+  """
+  tasks = {}
+  for name, step in chain.steps.items():
+    if step.recipe is not None and step.recipe not in tasks:
+      recipe = solver.recipeFor(name)[1]
+      tasks[step.recipe] = (recipe, step.producer, name, chain.flows[name])
+  results = optimizeMany(tasks.values(), **kwargs)
+  logger.debug(f"Optimized {len(tasks)} Recipes in the chain of "
+               f"'{chain.item}'")
+  return dict(zip(tasks, results))
@@ -1,6 +1,10 @@
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
 from factoratio.fuel import Burner, Fuel
-from factoratio.item import Ingredient, Recipe
-from factoratio.util import Joule, Watt
+from factoratio.item import Ingredient, PumpjackRecipe, Recipe
+from factoratio.util import Joule, Watt, WattArray
 
 class Module():
   """A module for a Producer.
@@ -36,6 +40,8 @@ class Module():
       produced.
   """
 
+  __slots__ = ('name', 'tier', 'energy', 'speed', 'productivity', 'pollution')
+
   def __init__(self, name: str, tier: int, energy: float, speed: float,
                productivity: float, pollution: float):
     self.name = name
@@ -54,7 +60,205 @@ class Module():
       return f'Tier {self.tier} {self.name} Module'
 
 
-class Producer():
+# The lowest value of each Effects multiplier.
+MINIMUM_EFFECTS = {'speed': 0.2, 'energy': 0.2, 'productivity': 1.0,
+                   'pollution': 0.2}
+
+class Effects(NamedTuple):
+  """The combined multipliers of a Producer's modules.
+
+  Each multiplier is one plus the sum of the corresponding Module modifiers.
+  As in Factorio, speed, energy and pollution cannot drop below 20%, and
+  productivity cannot drop below 100%.
+  """
+
+  speed: float = 1.0
+  energy: float = 1.0
+  productivity: float = 1.0
+  pollution: float = 1.0
+
+  @classmethod
+  def of(cls, modules: Iterable[Optional[Module]],
+         beacons: Iterable[Tuple['Beacon', int]]=()) -> 'Effects':
+    """Return the combined multipliers of the given Modules and Beacons.
+
+    Empty slots, i.e. anything that is not a Module, are skipped.
+
+    Parameters
+    ----------
+    modules: Iterable of Module
+        The Modules in a Producer's own slots.
+
+    beacons: Iterable of (Beacon, int) tuples, optional
+        The Beacons affecting the Producer, and how many of each.
+    """
+    multipliers = [1.0] * len(cls._fields)
+    for m in modules:
+      if isinstance(m, Module):
+        for i, category in enumerate(cls._fields):
+          multipliers[i] += getattr(m, category)
+    for beacon, count in beacons:
+      for i, modifier in enumerate(beacon.transmitted):
+        multipliers[i] += modifier * count
+    # XXX: Hack around 1.1 + 0.1 and similar
+    return cls(*(max(round(x, 6), MINIMUM_EFFECTS[category])
+                 for x, category in zip(multipliers, cls._fields)))
+
+
+def effectsArray(loadouts: Iterable[Sequence[Optional[Module]]],
+                 beacons: Iterable[Tuple['Beacon', int]]=()) -> np.ndarray:
+  """Return the combined multipliers of many module loadouts as an array.
+
+  Each row holds the Effects of one loadout, in Effects field order, for use
+  with Producer.batchRates. Identical loadouts are only combined once.
+
+  Parameters
+  ----------
+  loadouts: Iterable of sequences of Module
+      The Modules of each loadout; None for empty slots.
+
+  beacons: Iterable of (Beacon, int) tuples, optional
+      The Beacons affecting every loadout, and how many of each.
+  """
+  beacons = tuple(beacons)
+  combined = {}
+  rows = []
+  for loadout in loadouts:
+    key = tuple(loadout)
+    effects = combined.get(key)
+    if effects is None:
+      effects = combined[key] = Effects.of(key, beacons)
+    rows.append(effects)
+  return np.array(rows, dtype=float).reshape(-1, len(Effects._fields))
+
+
+def energyArray(producers: Sequence['Producer'], counts) -> WattArray:
+  """Return the power drawn by groups of Producers, in one vector operation.
+
+  Each group draws its Producers' drain plus their energy usage, scaled by
+  their current effects, times the number of Producers in it.
+
+  Parameters
+  ----------
+  producers: Sequence of Producer
+      The Producer of each group.
+
+  counts: array_like
+      The number of Producers in each group; may be fractional.
+  """
+  drain = WattArray([p.drain for p in producers])
+  usage = WattArray([p.energyUsage for p in producers])
+  multipliers = np.array([p.effects.energy for p in producers], dtype=float)
+  return (drain + usage * multipliers) * np.asarray(counts, dtype=float)
+
+
+class Modular():
+  """A mixin representing an entity with module slots.
+
+  The mixed class must implement name and maxSlots attributes.
+
+  Attributes
+  ----------
+  modules: tuple of Module
+      The Modules in each of the entity's module slots, None for empty
+      slots. Assign to it or use setModule to change them; Modules are
+      treated as values, so a Module changed in place is only picked up once
+      it is assigned again.
+
+  version: int
+      Incremented whenever anything affecting the entity's effects changes,
+      so that values derived from them can be cached.
+  """
+
+  version = 0
+
+  @property
+  def modules(self) -> Tuple[Optional[Module], ...]:
+    return self._modules
+
+  @modules.setter
+  def modules(self, modules: Iterable[Optional[Module]]):
+    modules = tuple(modules)
+    if len(modules) > self.maxSlots:
+      raise ValueError(f'{self.name} has only {self.maxSlots} module slots, '
+                       f'got {len(modules)} modules')
+    self._modules = modules + (None,) * (self.maxSlots - len(modules))
+    self.version += 1
+
+  def setModule(self, slot: int, module: Optional[Module]):
+    """Put a Module in a module slot, or empty it with None.
+
+    Parameters
+    ----------
+    slot: int
+        The index of the module slot.
+
+    module: Module
+        The Module to insert, or None.
+    """
+    if not 0 <= slot < self.maxSlots:
+      raise IndexError(f'{self.name} has no module slot {slot}')
+    modules = list(self._modules)
+    modules[slot] = module
+    self.modules = modules
+
+
+class Beacon(Modular):
+  """A class representing a beacon.
+
+  Beacons transmit the effects of their modules to every Producer in range,
+  at reduced efficiency.
+
+  Attributes
+  ----------
+  name: str
+      The name of this Beacon. Can be anything, but is typically the in-game
+      name.
+
+  maxSlots: int
+      The total number of module slots this Beacon supports.
+
+  efficiency: float
+      The fraction of its modules' effects the Beacon transmits.
+
+  energyUsage: factoratio.util.Watt
+      The amount of energy constantly consumed by this Beacon.
+
+  transmitted: tuple of float
+      The modifiers the Beacon adds to each Effects multiplier of a Producer
+      in range, computed when the modules change.
+  """
+
+  def __init__(self, name: str, maxSlots: int, efficiency: float,
+               energyUsage: Watt):
+    self.name = name
+    self.maxSlots = maxSlots
+    self.efficiency = efficiency
+    self.energyUsage = energyUsage
+    self.modules = [None] * self.maxSlots
+    self._transmitted = None
+
+  def __repr__(self):
+    return (f'{self.__class__.__name__}({self.name!r}, {self.maxSlots!r}, '
+            f'{self.efficiency!r}, {self.energyUsage!r})')
+
+  def __str__(self):
+    return self.name
+
+  @property
+  def transmitted(self) -> Tuple[float, ...]:
+    if self._transmitted is None or self._transmitted[0] != self.version:
+      modifiers = [0.0] * len(Effects._fields)
+      for m in self._modules:
+        if isinstance(m, Module):
+          for i, category in enumerate(Effects._fields):
+            modifiers[i] += getattr(m, category)
+      self._transmitted = self.version, tuple(
+        x * self.efficiency for x in modifiers)
+    return self._transmitted[1]
+
+
+class Producer(Modular):
   """Base class for entities that produce an Item as output.
 
   Attributes
@@ -81,14 +285,33 @@ class Producer():
 
   pollution: float
       The amount of pollution produced per minute while operating.
+
+  categories: frozenset of str
+      The crafting categories of the Recipes this Producer can craft, e.g.
+      'smelting'. Empty if unknown.
+
+  modules: tuple of Module
+      The Modules in each of the Producer's module slots; see Modular.
+
+  beacons: tuple of (Beacon, int) tuples
+      The Beacons affecting this Producer, and how many of each. Assign to it
+      or use setBeacon to change them.
+
+  effects: Effects
+      The combined multipliers of the current modules and Beacons, computed
+      once whenever either changes.
   """
 
   def __init__(self, name: str, craftSpeed: float, maxSlots: int,
-               energyUsage: Watt, drain: Watt, pollution: float):
+               energyUsage: Watt, drain: Watt, pollution: float,
+               categories: Iterable[str]=()):
     self.name = name
     self.craftSpeed = craftSpeed
     self.maxSlots = maxSlots
+    self.categories = frozenset(categories)
     self.modules = [None] * self.maxSlots
+    self.beacons = ()
+    self._effects = None
     self.energyUsage = energyUsage
     self.drain = drain
     self.pollution = pollution
@@ -101,29 +324,60 @@ class Producer():
   def __str__(self):
     return self.name
 
-  def _getMultiplier(self, category: str) -> float:
-    """Return the multiplier of the given category from module effects."""
-    multiplier = 1.0
-    for m in self.modules:
-      if isinstance(m, Module):
-        multiplier += getattr(m, category)
-    return round(multiplier, 6) # XXX: Hack around 1.1 + 0.1 and similar
+  @property
+  def beacons(self) -> Tuple[Tuple[Beacon, int], ...]:
+    return self._beacons
+
+  @beacons.setter
+  def beacons(self, beacons: Iterable[Tuple[Beacon, int]]):
+    beacons = tuple((beacon, count) for beacon, count in beacons if count)
+    for beacon, count in beacons:
+      if count < 0:
+        raise ValueError(f'Negative count of {beacon.name}: {count}')
+    self._beacons = beacons
+    self.version += 1
+
+  def setBeacon(self, beacon: Beacon, count: int):
+    """Set how many of a Beacon affect this Producer.
+
+    Parameters
+    ----------
+    beacon: Beacon
+        The Beacon.
+
+    count: int
+        The number of them in range; zero removes the Beacon.
+    """
+    beacons = dict(self._beacons)
+    beacons[beacon] = count
+    self.beacons = beacons.items()
+
+  @property
+  def effects(self) -> Effects:
+    # Beacons shared between Producers can change without this Producer
+    # knowing, so their versions are part of the cache key
+    key = self.version
+    if self._beacons:
+      key = (key,) + tuple(beacon.version for beacon, _ in self._beacons)
+    if self._effects is None or self._effects[0] != key:
+      self._effects = key, Effects.of(self._modules, self._beacons)
+    return self._effects[1]
 
   def speedMultiplier(self) -> float:
     """Return the Producer's crafting speed multiplier."""
-    return self._getMultiplier('speed')
+    return self.effects.speed
 
   def energyMultiplier(self) -> float:
     """Return the Producer's energy usage multiplier."""
-    return self._getMultiplier('energy')
+    return self.effects.energy
 
   def productivityMultiplier(self) -> float:
     """Return the Producer's added productivity multiplier."""
-    return self._getMultiplier('productivity')
+    return self.effects.productivity
 
   def pollutionMultiplier(self) -> float:
     """Return the Producer's pollution multiplier."""
-    return self._getMultiplier('pollution')
+    return self.effects.pollution
 
   def effectivePollutionMultiplier(self) -> float:
     """Return the Producer's effective pollution multiplier.
@@ -131,7 +385,8 @@ class Producer():
     The effective pollution multiplier is the product of the pollution and
     energy multipliers.
     """
-    return self.pollutionMultiplier() * self.energyMultiplier()
+    effects = self.effects
+    return effects.pollution * effects.energy
 
   def craft(self, recipe: Recipe) -> dict:
     """Crafts the given input Recipe with the Producer's current stats.
@@ -144,12 +399,13 @@ class Producer():
     recipe: Recipe
         The Recipe to craft.
     """
-    craftTime = recipe.time / (self.craftSpeed * self.speedMultiplier())
-    energyMult = self.energyMultiplier()
-    energyConsumed = Joule(
-      (self.drain + self.energyUsage * energyMult).value) * craftTime
+    effects = self.effects
+    craftTime = recipe.time / (self.craftSpeed * effects.speed)
+    energyMult = effects.energy
+    energyConsumed = Joule((float(self.drain) + float(self.energyUsage)
+                            * energyMult) * craftTime)
     # NOTE: Pollution stat is per minute
-    pollutionCreated = (self.pollution * self.pollutionMultiplier() *
+    pollutionCreated = (self.pollution * effects.pollution *
                        energyMult * (craftTime / 60))
 
     return {'duration': craftTime, 'output': recipe.output,
@@ -161,6 +417,9 @@ class Producer():
                      count: int=1) -> float:
     """Return the rate that an Item is produced, in items per second.
 
+    A product returned with some probability counts by its expected amount
+    per craft.
+
     Parameters
     ----------
     recipe: Recipe
@@ -174,8 +433,8 @@ class Producer():
         acts as a multiplier. Defaults to one.
     """
     ingredient = recipe.getOutputByName(itemName)
-    return (count * ingredient.count * self.productivityMultiplier()
-            / self.craft(recipe)['duration'])
+    return (count * ingredient.count * ingredient.probability
+            * self.productivityMultiplier() / self.craft(recipe)['duration'])
 
   def productionRateInverse(self, recipe: Recipe, itemName: str,
                             ips: float=1.0) -> float:
@@ -194,7 +453,8 @@ class Producer():
     """
     ingredient = recipe.getOutputByName(itemName)
     return (ips * self.craft(recipe)['duration'] /
-            (ingredient.count * self.productivityMultiplier()))
+            (ingredient.count * ingredient.probability
+             * self.productivityMultiplier()))
 
   def consumptionRate(self, recipe: Recipe, itemName: str,
                       count: int=1) -> float:
@@ -240,7 +500,8 @@ class Producer():
     energy consumption, pollution generated, individual items consumed and
     produced, and the count of Producers used.
 
-    Rates are given as units per second.
+    Rates are given as units per second. Products returned with some
+    probability count by their expected amount, as in productionRate.
 
     Parameters
     ----------
@@ -253,22 +514,84 @@ class Producer():
     """
     craftResult = self.craft(recipe)
     duration = craftResult['duration']
-    consumed, produced = [], []
-    for ingredient in recipe.input:
-      name = ingredient.what.name
-      consumed.append((ingredient, self.consumptionRate(recipe, name, count)))
-    for ingredient in recipe.output:
-      name = ingredient.what.name
-      produced.append((ingredient, self.productionRate(recipe, name, count)))
+    # Same as consumptionRate and productionRate, without crafting again for
+    # every ingredient
+    crafts = count / duration
+    productivity = self.effects.productivity
+    consumed = [(ingredient, crafts * ingredient.count)
+                for ingredient in recipe.input]
+    produced = [(ingredient, crafts * ingredient.count * ingredient.probability
+                 * productivity)
+                for ingredient in recipe.output]
 
     return {
       'producers': count,
       'consumed': consumed,
       'produced': produced,
-      'energy': Watt(craftResult['energy'].value) / duration * count,
+      'energy': Watt(craftResult['energy'].value / duration * count),
       'pollution': craftResult['pollution'] / duration * count
     }
 
+  def batchRates(self, recipe: Recipe, counts=1, effects=None) -> dict:
+    """Calculate all rates for many counts and module loadouts at once.
+
+    The batched counterpart of rates: returns a dict with the same keys, but
+    every rate is a NumPy array with one element per combination, and energy
+    is given as plain Watts instead of a Watt. Results are identical to
+    calling rates for each combination.
+
+    Counts and effects are broadcast against each other, so e.g. a single
+    count can be combined with many loadouts.
+
+    Parameters
+    ----------
+    recipe: Recipe
+        The Recipe to base the rates on.
+
+    counts: array_like, optional
+        The number of identical Producers concurrently crafting this Recipe,
+        for each combination. Defaults to one.
+
+    effects: array_like, optional
+        The module multipliers for each combination, in Effects field order
+        along the last axis; see effectsArray. Defaults to this Producer's
+        current effects.
+    """
+    rateDict, crafts, productivity = self._batch(recipe.time, counts, effects)
+    rateDict['consumed'] = [(ingredient, crafts * ingredient.count)
+                            for ingredient in recipe.input]
+    rateDict['produced'] = [(ingredient, crafts * ingredient.count
+                             * ingredient.probability * productivity)
+                            for ingredient in recipe.output]
+    return rateDict
+
+  def _batch(self, time: float, counts, effects) -> Tuple[dict, np.ndarray,
+                                                          np.ndarray]:
+    """The part of batchRates that does not depend on Recipe ingredients.
+
+    Returns the rate dict without 'consumed' and 'produced', along with the
+    crafts per second and productivity multiplier of each combination.
+    """
+    counts = np.asarray(counts, dtype=float)
+    effects = np.asarray(self.effects if effects is None else effects,
+                         dtype=float)
+    counts, speed, energyMult, productivity, pollutionMult = \
+      np.broadcast_arrays(counts, *np.moveaxis(effects, -1, 0))
+
+    # Same operations, in the same order, as craft and rates
+    duration = time / (self.craftSpeed * speed)
+    energyConsumed = (float(self.drain) + float(self.energyUsage)
+                      * energyMult) * duration
+    pollutionCreated = (self.pollution * pollutionMult * energyMult
+                        * (duration / 60))
+    crafts = counts / duration
+    rateDict = {
+      'producers': counts,
+      'energy': energyConsumed / duration * counts,
+      'pollution': pollutionCreated / duration * counts
+    }
+    return rateDict, crafts, productivity
+
 
 class BurnerProducer(Producer, Burner):
   """Class representing a burner producer.
@@ -298,6 +621,17 @@ class BurnerProducer(Producer, Burner):
     rateDict['fuel'] = rateDict['energy'].value / fuel.energy.value
     return rateDict
 
+  def batchRates(self, recipe: Recipe, fuel: Fuel, counts=1,
+                 effects=None) -> dict:
+    """Calculate all rates for many counts and module loadouts at once.
+
+    Extended from the Producer base class to include the amount of Fuel
+    burned. See Producer.batchRates.
+    """
+    rateDict = super().batchRates(recipe, counts, effects)
+    rateDict['fuel'] = rateDict['energy'] / fuel.energy.value
+    return rateDict
+
   def productsPerFuel(self, recipe: Recipe, itemName: str, fuel: Fuel,
                       count: int=1) -> float:
     """The number of Items produced per unit of Fuel burned.
@@ -445,7 +779,7 @@ class MiningDrill(Producer):
                          'contains more than one product.')
     return super().consumptionRateInverse(recipe, itemName, ips)
 
-  def rates(self, recipe: Recipe, count: int=1) -> dict:
+  def rates(self, recipe: Recipe, *args, **kwargs) -> dict:
     """Calculate all rates for this Producer.
 
     Generates a report of every rate associated with this Producer, including
@@ -465,8 +799,21 @@ class MiningDrill(Producer):
     count: int, optional
         The number of identical Producers concurrently crafting this Recipe;
         acts as a multiplier. Defaults to one.
+
+    Burner mining drills take the Fuel being burned before count; see
+    BurnerProducer.rates.
     """
-    rateDict = super().rates(recipe, count)
+    rateDict = super().rates(recipe, *args, **kwargs)
+    if not rateDict['consumed']:
+      rateDict['consumed'] = rateDict['produced']
+    return rateDict
+
+  def batchRates(self, recipe: Recipe, *args, **kwargs) -> dict:
+    """Calculate all rates for many counts and module loadouts at once.
+
+    See Producer.batchRates and rates.
+    """
+    rateDict = super().batchRates(recipe, *args, **kwargs)
     if not rateDict['consumed']:
       rateDict['consumed'] = rateDict['produced']
     return rateDict
@@ -572,7 +919,8 @@ class Pumpjack(Producer):
     """
     return ypm * self.craft(recipe)['duration'] * 300 / 60
 
-  def rates(self, recipe: PumpjackRecipe, count: int=1) -> dict:
+  def rates(self, recipe: PumpjackRecipe, currentYield: int,
+            count: int=1) -> dict:
     """Calculate all rates for this Pumpjack.
 
     Generates a report of every rate associated with this Pumpjack, including
@@ -587,12 +935,38 @@ class Pumpjack(Producer):
     recipe: Recipe
         The Recipe to base the rates on, usually from Recipe.miningRecipe.
 
+    currentYield: int
+        The current yield of the field that this Pumpjack is placed on. Given
+        as an integer percentage, e.g. 250 for 250%.
+
     count: int, optional
         The number of identical Producers concurrently crafting this Recipe;
         acts as a multiplier. Defaults to one.
     """
     rateDict = super().rates(recipe, count)
+    rateDict['produced'] = [
+      (recipe.output[0], self.productionRate(recipe, currentYield, count))]
     rateDict['cycles'] = self.fieldCycleConsumptionRate(recipe, count)
+    return rateDict
+
+  def batchRates(self, recipe: PumpjackRecipe, currentYield: int, counts=1,
+                 effects=None) -> dict:
+    """Calculate all rates for many counts and module loadouts at once.
+
+    See Producer.batchRates and rates.
+    """
+    rateDict = super().batchRates(recipe, counts, effects)
+    effects = np.asarray(self.effects if effects is None else effects,
+                         dtype=float)
+    speed, productivity = effects[..., 0], effects[..., 2]
+    # Same operations, in the same order, as productionRate
+    duration = recipe.time / (self.craftSpeed * speed)
+    rateDict['produced'] = [
+      (recipe.output[0], min(currentYield / recipe.baseAmt, 100)
+       * productivity * rateDict['producers'] / duration)]
+    rateDict['cycles'] = (self.craftSpeed * speed / recipe.time
+                          * rateDict['producers'])
+    return rateDict
 
   def fieldCycleConsumptionRate(self, recipe: PumpjackRecipe,
                                 count: int=1) -> float:
@@ -613,17 +987,40 @@ class Pumpjack(Producer):
     return self.craftSpeed * self.speedMultiplier() / recipe.time * count
 
 
+# Crafting categories of the base Producers, as in vanilla
+_CRAFTING = ('crafting', 'basic-crafting', 'advanced-crafting')
+_CRAFTING_FLUID = _CRAFTING + ('crafting-with-fluid',)
+
 base = {
-  'Assembler1': Producer('Assembling machine', 0.5, 0, Watt('75k'), Watt('2.5k'), 4),
-  'Assembler2': Producer('Assembling machine 2', 0.75, 2, Watt('150k'), Watt('5k'), 3),
-  'Assembler3': Producer('Assembling machine 3', 1.25, 4, Watt('375k'), Watt('12.5k'), 2),
-  'BurnDrill': BurnerMiningDrill('Burner mining drill', 0.25, 0, Watt('150k'), 0, 12),
-  'ElecDrill': MiningDrill('Electric mining drill', 0.5, 3, Watt('90k'), 0, 10),
-  'StoneFurance': BurnerProducer('Stone furnace', 1, 0, Watt('90k'), 0, 2),
-  'SteelFurance': BurnerProducer('Steel furnace', 2, 0, Watt('90k'), 0, 4),
-  'ElecFurance': Producer('Electric furnace', 2, 2, Watt('180k'), Watt('6k'), 1),
-  'ChemPlant': Producer('Chemical plant', 1, 3, Watt('210k'), Watt('7k'), 4),
-  'Pumpjack': Pumpjack('Pumpjack', 1, 2, Watt('90k'), 0, 10)
+  'Assembler1': Producer('Assembling machine', 0.5, 0, Watt('75k'), Watt('2.5k'), 4, _CRAFTING),
+  'Assembler2': Producer('Assembling machine 2', 0.75, 2, Watt('150k'), Watt('5k'), 3, _CRAFTING_FLUID),
+  'Assembler3': Producer('Assembling machine 3', 1.25, 4, Watt('375k'), Watt('12.5k'), 2, _CRAFTING_FLUID),
+  'BurnDrill': BurnerMiningDrill('Burner mining drill', 0.25, 0, Watt('150k'), 0, 12, ('basic-solid',)),
+  'ElecDrill': MiningDrill('Electric mining drill', 0.5, 3, Watt('90k'), 0, 10, ('basic-solid',)),
+  'StoneFurance': BurnerProducer('Stone furnace', 1, 0, Watt('90k'), 0, 2, ('smelting',)),
+  'SteelFurance': BurnerProducer('Steel furnace', 2, 0, Watt('90k'), 0, 4, ('smelting',)),
+  'ElecFurance': Producer('Electric furnace', 2, 2, Watt('180k'), Watt('6k'), 1, ('smelting',)),
+  'ChemPlant': Producer('Chemical plant', 1, 3, Watt('210k'), Watt('7k'), 4, ('chemistry',)),
+  'OilRefinery': Producer('Oil refinery', 1, 3, Watt('420k'), Watt('14k'), 6, ('oil-processing',)),
+  'Centrifuge': Producer('Centrifuge', 1, 2, Watt('350k'), Watt('11.6k'), 4, ('centrifuging',)),
+  'RocketSilo': Producer('Rocket silo', 1, 4, Watt('4M'), 0, 0, ('rocket-building',)),
+  'Pumpjack': Pumpjack('Pumpjack', 1, 2, Watt('90k'), 0, 10, ('basic-fluid',))
+}
+
+baseModules = {
+  'Speed1': Module('Speed', 1, 0.5, 0.2, 0, 0),
+  'Speed2': Module('Speed', 2, 0.6, 0.3, 0, 0),
+  'Speed3': Module('Speed', 3, 0.7, 0.5, 0, 0),
+  'Productivity1': Module('Productivity', 1, 0.4, -0.05, 0.04, 0.05),
+  'Productivity2': Module('Productivity', 2, 0.6, -0.1, 0.06, 0.07),
+  'Productivity3': Module('Productivity', 3, 0.8, -0.15, 0.1, 0.1),
+  'Efficiency1': Module('Efficiency', 1, -0.3, 0, 0, 0),
+  'Efficiency2': Module('Efficiency', 2, -0.4, 0, 0, 0),
+  'Efficiency3': Module('Efficiency', 3, -0.5, 0, 0, 0)
+}
+
+baseBeacons = {
+  'Beacon': Beacon('Beacon', 2, 0.5, Watt('480k'))
 }
 
 # TODO: Find a place for these prototype functions
@@ -1,18 +1,100 @@
 import collections
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
 from dataclasses import dataclass, field
 import functools
+import hashlib
+import itertools
+import json
 import logging
+import os
 from pathlib import Path
-import re
-from typing import Dict
+import pickle
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from lupa import LuaError, LuaRuntime
 
+from factoratio.compiled import CompiledPrototypes
 from factoratio.fuel import Fuel
+import factoratio.instrument as instrument
 import factoratio.item as item
+from factoratio.producer import (Beacon, BurnerMiningDrill, BurnerProducer,
+                                 MiningDrill, Producer, Pumpjack)
+import factoratio.util as util
+from factoratio.util import Watt
 
 logger = logging.getLogger('factoratio')
 
+# Prototype subdirectories read by initialize(), in load order
+SUBDIRS = ('item', 'fluid', 'recipe', 'entity')
+
+# Prototype attributes used when building objects, per subdirectory; see
+# ProtoReader.luaData
+FIELDS = {
+  'item': ('type', 'name', 'flags', 'group', 'subgroup', 'order',
+           'fuel_value'),
+  'fluid': ('type', 'name', 'default_temperature', 'max_temperature',
+            'heat_capacity', 'order'),
+  'recipe': ('type', 'name', 'category', 'normal', 'expensive', 'ingredients',
+             'result', 'result_count', 'results', 'energy_required'),
+  'entity': ('type', 'name', 'crafting_speed', 'crafting_categories',
+             'mining_speed', 'resource_categories', 'energy_usage',
+             'energy_consumption', 'energy_source', 'module_specification',
+             'distribution_effectivity')
+}
+
+# Maps prototype table types to the kind of object built from them; any other
+# type found in the 'item' subdirectory is an Item
+_KINDS = {'item-group': 'group', 'item-subgroup': 'subgroup', 'fluid': 'fluid',
+          'recipe': 'recipe'}
+
+# Entity prototype types that Producers and Beacons are built from; other
+# entities, such as chests and belts, are ignored
+ENTITY_TYPES = ('assembling-machine', 'furnace', 'rocket-silo', 'mining-drill',
+                'beacon', 'boiler')
+_KINDS.update(dict.fromkeys(ENTITY_TYPES, 'entity'))
+
+# Marks a line containing a `require` expression; see preprocess
+_REQUIRE = b'= require('
+
+# Preprocessed definition files by content hash; see preprocess
+PREPROCESS_CACHE_SIZE = 1024
+_preprocessed: Dict[str, str] = {}
+
+# Bump whenever the pickled layout of Prototypes or its members changes so
+# that caches written by older versions are discarded.
+CACHE_VERSION = 9
+CACHE_NAME = 'prototypes.cache'
+
+@dataclass
+class SourceFile():
+  """A prototype definition file as of the last time it was read.
+
+  Attributes
+  ----------
+  subdir: str
+      The prototype subdirectory the file belongs to, e.g. 'item'.
+
+  size: int
+      The size of the file in bytes.
+
+  mtime: int
+      The modification time of the file, in nanoseconds.
+
+  digest: str
+      A hash of the file's contents.
+
+  tables: List of dict
+      The prototype tables defined by the file; see ProtoReader.luaData.
+  """
+
+  subdir: str
+  size: int
+  mtime: int
+  digest: str
+  tables: List[dict] = field(default_factory=list, repr=False)
+
+
 @dataclass
 class Prototypes():
   items: Dict[str, item.Item] = field(default_factory=dict)
@@ -22,10 +104,399 @@ class Prototypes():
   groups: Dict[str, item.ItemGroup] = field(default_factory=dict)
   subgroups: Dict[str, item.ItemGroup] = field(default_factory=dict)
   recipes: Dict[str, item.Recipe] = field(default_factory=dict)
+  producers: Dict[str, Producer] = field(default_factory=dict)
+  beacons: Dict[str, Beacon] = field(default_factory=dict)
+  path: Optional[Path] = field(default=None, repr=False)
+  sources: Dict[str, SourceFile] = field(default_factory=dict, repr=False)
+  # Incremented whenever Recipes or Producers are added, removed or
+  # reloaded, so that results computed from the Prototypes can be cached
+  generation: int = field(default=0, init=False, repr=False, compare=False)
+  # The state of the Lua modules definition files may require, when they were
+  # read; see libraryDigest
+  _libraries: str = field(default='', init=False, repr=False, compare=False)
+  # (kind, name) -> (source, table) for every prototype read, including
+  # hidden Items and pruned Groups; see ProtoReader.define
+  _definitions: Dict[Tuple[str, str], Tuple[str, dict]] = field(
+    init=False, default_factory=dict, repr=False)
+  # Reverse Recipe indexes, for normal (False) and Expensive Mode (True):
+  # product name -> names of the Recipes that make or use it. Dicts are used
+  # as insertion-ordered sets.
+  _producing: Dict[bool, Dict[str, Dict[str, None]]] = field(
+    init=False, default_factory=lambda: {False: {}, True: {}}, repr=False)
+  _consuming: Dict[bool, Dict[str, Dict[str, None]]] = field(
+    init=False, default_factory=lambda: {False: {}, True: {}}, repr=False)
+  # Product name -> names of Recipes skipped because it was unknown
+  _missing: Dict[str, Set[str]] = field(
+    init=False, default_factory=dict, repr=False)
+  # Recipe cycles by mode, computed on demand; see cycles
+  _cycles: Dict[bool, Dict[str, FrozenSet[str]]] = field(
+    init=False, default_factory=dict, repr=False)
+  # Compiled forms by mode, built on demand; see compiled
+  _compiled: Dict[bool, CompiledPrototypes] = field(
+    init=False, default_factory=dict, repr=False)
+  # Crafting category -> names of the Producers that can craft it
+  _crafting: Dict[str, Dict[str, None]] = field(
+    init=False, default_factory=dict, repr=False)
 
   def __post_init__(self):
     self.products = collections.ChainMap(self.items, self.fluids)
 
+  def sourceOf(self, kind: str, name: str) -> Optional[Path]:
+    """Return the definition file of a prototype, or None if unknown.
+
+    Parameters
+    ----------
+    kind: str
+        The kind of prototype: 'group', 'subgroup', 'item', 'fluid',
+        'recipe', or 'entity'.
+
+    name: str
+        The name of the prototype.
+    """
+    definition = self._definitions.get((kind, name))
+    if definition is None or self.path is None:
+      return None
+    return self.path / definition[0]
+
+  @staticmethod
+  def _variants(recipe: item.Recipe):
+    """Yield the normal and Expensive Mode variant of a Recipe with the
+    index key for each; a Recipe without an expensive variant is used as is
+    in Expensive Mode."""
+    yield False, recipe
+    yield True, recipe.expensive() or recipe
+
+  def addRecipe(self, name: str, recipe: item.Recipe):
+    """Add a Recipe under the given name, replacing any existing one.
+
+    Keeps the reverse Recipe indexes up to date; see recipesProducing and
+    recipesConsuming.
+    """
+    self.removeRecipe(name)
+    self.recipes[name] = recipe
+    self.generation += 1
+    self._cycles.clear()
+    self._compiled.clear()
+    for expensive, variant in self._variants(recipe):
+      for ingredient in variant.output:
+        self._producing[expensive].setdefault(
+          ingredient.what.name, {})[name] = None
+      for ingredient in variant.input:
+        self._consuming[expensive].setdefault(
+          ingredient.what.name, {})[name] = None
+
+  def removeRecipe(self, name: str) -> Optional[item.Recipe]:
+    """Remove and return the named Recipe, or None if there is none."""
+    recipe = self.recipes.pop(name, None)
+    if recipe is not None:
+      self.generation += 1
+      self._cycles.clear()
+      self._compiled.clear()
+      for expensive, variant in self._variants(recipe):
+        for index, ingredients in ((self._producing, variant.output),
+                                   (self._consuming, variant.input)):
+          for ingredient in ingredients:
+            names = index[expensive].get(ingredient.what.name)
+            if names is not None:
+              names.pop(name, None)
+              if not names:
+                del index[expensive][ingredient.what.name]
+    return recipe
+
+  def recipesProducing(self, name: str,
+                       expensive: bool=False) -> Dict[str, item.Recipe]:
+    """Return the Recipes that have the named Item or Fluid as output.
+
+    Returns a dict mapping Recipe names to Recipes; in Expensive Mode, the
+    Expensive Mode variant of each Recipe that has one.
+
+    Parameters
+    ----------
+    name: str
+        The name of the product.
+
+    expensive: bool, optional
+        Whether to look at the Expensive Mode variants of Recipes. Defaults to
+        False.
+    """
+    return self._lookup(self._producing, name, expensive)
+
+  def recipesConsuming(self, name: str,
+                       expensive: bool=False) -> Dict[str, item.Recipe]:
+    """Return the Recipes that have the named Item or Fluid as input.
+
+    See recipesProducing.
+    """
+    return self._lookup(self._consuming, name, expensive)
+
+  def _lookup(self, index, name, expensive):
+    result = {}
+    for recipeName in index[expensive].get(name, ()):
+      recipe = self.recipes[recipeName]
+      result[recipeName] = (recipe.expensive() or recipe) if expensive \
+                           else recipe
+    return result
+
+  def cycles(self, expensive: bool=False) -> Dict[str, FrozenSet[str]]:
+    """Return the products that take part in Recipe cycles.
+
+    Returns a dict mapping each such product to every product in its cycle.
+    Cycles are the strongly connected components of the graph from each
+    product to the ingredients of the Recipes making it, e.g.
+    uranium-235 and uranium-238 through Kovarex enrichment. Products that
+    are an ingredient of their own Recipe form a cycle by themselves.
+
+    Computed once and kept until the Recipes change.
+
+    Parameters
+    ----------
+    expensive: bool, optional
+        Whether to look at the Expensive Mode variants of Recipes. Defaults to
+        False.
+    """
+    cycles = self._cycles.get(expensive)
+    if cycles is None:
+      def ingredients(name):
+        for recipe in self._lookup(self._producing, name, expensive).values():
+          for ingredient in recipe.input:
+            yield ingredient.what.name
+      cycles = {}
+      for component in util.stronglyConnected(self._producing[expensive],
+                                              ingredients):
+        if len(component) > 1 or component[0] in ingredients(component[0]):
+          members = frozenset(component)
+          cycles.update(dict.fromkeys(members, members))
+      self._cycles[expensive] = cycles
+      logger.debug(f'Found {len(set(cycles.values()))} Recipe cycles')
+    return cycles
+
+  def addProducer(self, name: str, producer: Producer):
+    """Add a Producer under the given name, replacing any existing one.
+
+    Keeps the crafting category index up to date; see producersFor.
+    """
+    self.removeProducer(name)
+    self.producers[name] = producer
+    self.generation += 1
+    for category in producer.categories:
+      self._crafting.setdefault(category, {})[name] = None
+
+  def removeProducer(self, name: str) -> Optional[Producer]:
+    """Remove and return the named Producer, or None if there is none."""
+    producer = self.producers.pop(name, None)
+    if producer is not None:
+      self.generation += 1
+      for category in producer.categories:
+        names = self._crafting.get(category)
+        if names is not None:
+          names.pop(name, None)
+          if not names:
+            del self._crafting[category]
+    return producer
+
+  def producersFor(self, category: str) -> Dict[str, Producer]:
+    """Return the Producers that can craft Recipes of a crafting category.
+
+    Returns a dict mapping Producer names to Producers, in load order.
+
+    Parameters
+    ----------
+    category: str
+        The crafting category, e.g. 'smelting'; see Recipe.category. Mining
+        drills are indexed by resource category, e.g. 'basic-solid'.
+    """
+    return {name: self.producers[name]
+            for name in self._crafting.get(category, ())}
+
+  @property
+  def categories(self) -> List[str]:
+    """The crafting categories that some Producer can craft."""
+    return list(self._crafting)
+
+  def compiled(self, expensive: bool=False) -> CompiledPrototypes:
+    """Return the array-backed form of the Recipes, with integer IDs.
+
+    Built once and kept until the Recipes or products change.
+
+    Parameters
+    ----------
+    expensive: bool, optional
+        Whether to compile the Expensive Mode variants of Recipes. Defaults to
+        False.
+    """
+    compiled = self._compiled.get(expensive)
+    if compiled is None:
+      compiled = self._compiled[expensive] = CompiledPrototypes(self,
+                                                                expensive)
+    return compiled
+
+  def _dependents(self, name: str) -> Set[str]:
+    """Return the names of all Recipes that make or use the named product,
+    in either mode."""
+    names = set()
+    for index in (self._producing, self._consuming):
+      for expensive in (False, True):
+        names.update(index[expensive].get(name, ()))
+    return names
+
+  def reload(self) -> List[str]:
+    """Re-read the definition files that changed since they were last read.
+
+    Only files that were added, removed, or whose contents changed are
+    executed again, or every file if a Lua module they may require changed;
+    see libraryFiles. The prototypes they define are patched in place. Items
+    and Fluids that are redefined keep their identity, so references to them
+    stay valid, and Recipes that depend on removed or added products are
+    relinked.
+
+    Returns a list of the changed files, relative to the prototype path.
+    """
+    if self.path is None:
+      raise ValueError('Prototypes were not loaded from a prototype path')
+
+    # A changed library may change what any definition file defines
+    libraries = libraryDigest(self.path)
+    everything = libraries != self._libraries
+    changed = {subdir: [] for subdir in SUBDIRS}
+    present = set()
+    for subdir in SUBDIRS:
+      for path in sorted(self.path.glob(f'{subdir}/*.lua')):
+        rel = path.relative_to(self.path).as_posix()
+        present.add(rel)
+        source = self.sources.get(rel)
+        if source is not None and not everything:
+          stat = path.stat()
+          if (source.size, source.mtime) == (stat.st_size, stat.st_mtime_ns):
+            continue
+          if source.digest == _digest(path.read_bytes()):
+            # Touched, but not modified
+            source.size, source.mtime = stat.st_size, stat.st_mtime_ns
+            continue
+        changed[subdir].append(path)
+    removed = [rel for rel in self.sources if rel not in present]
+    if not removed and not any(changed.values()):
+      self._libraries = libraries
+      return []
+
+    with instrument.span('reload') as span:
+      reader = ProtoReader(self.path, self)
+      new = {}
+      for subdir, paths in changed.items():
+        if paths:
+          reader.loadPrototypes(subdir, paths)
+          new.update(reader.sourceFiles(FIELDS[subdir]))
+      logger.info(f'Reloading {len(new)} changed and {len(removed)} removed '
+                  'prototype definition files')
+      with instrument.span('update'):
+        reader.update(new, removed)
+      self._libraries = libraries
+      self.generation += 1
+      span.count('changed', len(new))
+      span.count('removed', len(removed))
+    return [*new, *removed]
+
+
+# Lua side of ProtoReader.luaData. Serializes the prototype array of the
+# 'data' table to a JSON string in a single call, so that reading prototypes
+# does not cross the Lua/Python boundary once per attribute. Tables whose keys
+# are exactly 1..n become JSON arrays (empty tables included); all others
+# become objects. Functions and other non-data values are dropped. If 'fields'
+# is given, only those top-level keys of each prototype are exported.
+_EXPORT_LUA = r'''
+function(data, fields)
+  local buf, n = {}, 0
+  local find, format, gsub = string.find, string.format, string.gsub
+  local type, pairs, next, tostring = type, pairs, next, tostring
+  local mathtype = math.type or function() return nil end
+  local huge = math.huge
+
+  local function escape(c)
+    return format('\\u%04x', c:byte())
+  end
+
+  local function serialize(value, depth)
+    local t = type(value)
+    if t == 'string' then
+      if find(value, '[%c"\\]') then value = gsub(value, '[%c"\\]', escape) end
+      buf[n + 1] = '"'; buf[n + 2] = value; buf[n + 3] = '"'
+      n = n + 3
+    elseif t == 'number' then
+      n = n + 1
+      if mathtype(value) == 'integer' then buf[n] = tostring(value)
+      elseif value ~= value then buf[n] = 'NaN'
+      elseif value == huge then buf[n] = 'Infinity'
+      elseif value == -huge then buf[n] = '-Infinity'
+      else buf[n] = format('%.17g', value) end
+    elseif t == 'boolean' then
+      n = n + 1; buf[n] = value and 'true' or 'false'
+    elseif t == 'table' and depth < 64 then
+      local len, isArray = #value, true
+      if len == 0 then
+        isArray = next(value) == nil
+      else
+        for k in pairs(value) do
+          if type(k) ~= 'number' or k < 1 or k > len or k % 1 ~= 0 then
+            isArray = false
+            break
+          end
+        end
+      end
+      depth = depth + 1
+      if isArray then
+        n = n + 1; buf[n] = '['
+        for i = 1, len do
+          if i > 1 then n = n + 1; buf[n] = ',' end
+          serialize(value[i], depth)
+        end
+        n = n + 1; buf[n] = ']'
+      else
+        local sep = ''
+        n = n + 1; buf[n] = '{'
+        for k, v in pairs(value) do
+          local vt = type(v)
+          if vt ~= 'function' and vt ~= 'userdata' and vt ~= 'thread' then
+            local key = type(k) == 'string' and k or tostring(k)
+            if find(key, '[%c"\\]') then key = gsub(key, '[%c"\\]', escape) end
+            buf[n + 1] = sep; buf[n + 2] = '"'; buf[n + 3] = key
+            buf[n + 4] = '":'
+            n = n + 4
+            sep = ','
+            serialize(v, depth)
+          end
+        end
+        n = n + 1; buf[n] = '}'
+      end
+    else
+      n = n + 1; buf[n] = 'null'
+    end
+  end
+
+  n = n + 1; buf[n] = '['
+  for i = 1, #data do
+    if i > 1 then n = n + 1; buf[n] = ',' end
+    if fields then
+      local prototype, sep = data[i], ''
+      n = n + 1; buf[n] = '{'
+      for j = 1, #fields do
+        local key = fields[j]
+        local v = prototype[key]
+        if v ~= nil then
+          buf[n + 1] = sep; buf[n + 2] = '"'; buf[n + 3] = key
+          buf[n + 4] = '":'
+          n = n + 4
+          sep = ','
+          serialize(v, 1)
+        end
+      end
+      n = n + 1; buf[n] = '}'
+    else
+      serialize(data[i], 0)
+    end
+  end
+  n = n + 1; buf[n] = ']'
+  return table.concat(buf)
+end
+'''
 
 class ProtoReader():
   """Internal class used to pull in prototype definitions from game data.
@@ -35,268 +506,1022 @@ class ProtoReader():
 
   def __init__(self, path: Path, prototypes: Prototypes):
     self.path = path
-    self.lua = LuaRuntime()
     self.prototypes = prototypes
 
-    self.lua.execute(
-      f"package.path = package.path .. ';{self.path.parent.as_posix()}/?.lua'")
-    self.lua.execute('''data = {
-      extend = function(self, otherdata)
-        if type(otherdata) ~= 'table' or #otherdata == 0 then
-          error('Invalid prototype array in ' .. python.eval('prototype'))
-        end
-        for key, block in pairs(otherdata) do
-          table.insert(self, block)
+    with instrument.span('luaRuntime'):
+      self.lua = LuaRuntime()
+      # Definition files require modules of their own mod as well as the
+      # libraries of the core mod, e.g. 'circuit-connector-sprites'
+      modPath, lualib = libraryPaths(self.path)
+      self.lua.execute(
+        f"package.path = package.path .. ';{modPath.as_posix()}/?.lua"
+        f";{lualib.as_posix()}/?.lua'")
+      try:
+        # Factorio makes 'util' a global before loading any mod
+        self.lua.execute("util = require('util')")
+      except LuaError as err:
+        logger.debug(f"Could not preload 'util' from '{lualib}': {err}")
+      self.lua.execute('''data = {
+        extend = function(self, otherdata)
+          if type(otherdata) ~= 'table' or #otherdata == 0 then
+            error('Invalid prototype array in ' .. python.eval('prototype'))
+          end
+          for key, block in pairs(otherdata) do
+            table.insert(self, block)
+          end
         end
-      end
-    }''')
+      }''')
+      self._export = self.lua.eval(_EXPORT_LUA)
 
-  def loadPrototypes(self, subdir: str) -> 'LuaTable':
+  def loadPrototypes(self, subdir: str, files: Iterable[Path]=None):
     """Read and execute the prototype definitions in the given subdirectory.
 
     Populates the 'data' table within the Lua runtime, ready to be iterated.
+    An entity definition file that fails to execute is logged and skipped,
+    along with any prototypes it defined before failing, so that one bad
+    file cannot stop Items and Recipes from loading; errors in other files
+    are raised.
+
+    Parameters
+    ----------
+    subdir: str
+        The subdirectory of the prototype path to read.
+
+    files: Iterable of Path, optional
+        Only execute these definition files. Defaults to every '.lua' file in
+        subdir, in sorted order.
     """
-    self.lua.execute("data = {extend = data['extend']}")
-    for prototype in self.path.glob(f'{subdir}/*.lua'):
-      code = ''
-      with prototype.open() as p:
-        for line in p:
-          # Some prototype definitions (e.g. 'gun.lua') contain a `require`
-          # expression as a value. They typically call methods only available
-          # during Factorio's runtime, so we just ignore them.
-          if not re.search(r'= require\(', line):
-            code += line
-      try:
-        self.lua.execute(code)
-      except LuaError:
-        logger.error(f"Lua error while executing '{prototype}'")
-        raise
+    with instrument.span(f'loadPrototypes[{subdir}]') as span:
+      self.lua.execute("data = {extend = data['extend']}")
+      if files is None:
+        files = sorted(self.path.glob(f'{subdir}/*.lua'))
+      self.subdir = subdir
+      self.loaded = []
+      loadedTables = 0
+      for prototype in files:
+        stat = prototype.stat()
+        digest, code = preprocess(prototype.read_bytes())
+        try:
+          self.lua.execute(code)
+        except LuaError as err:
+          if subdir != 'entity':
+            logger.error(f"Lua error while executing '{prototype}'")
+            raise
+          logger.error(f"Skipping '{prototype}' after a Lua error: {err}")
+          self.lua.execute(f'for i = #data, {loadedTables + 1}, -1 do '
+                           'data[i] = nil end')
+          continue
+        nTables = self.lua.eval('#data')
+        self.loaded.append((prototype, stat, digest, nTables - loadedTables))
+        loadedTables = nTables
+      span.count('files', len(self.loaded))
+      span.count('bytes', sum(x[1].st_size for x in self.loaded))
+      span.count('tables', loadedTables)
 
-  def luaData(self):
-    """Generate an iterator for the Lua 'data' table.
+  def luaData(self, fields: Iterable[str]=None) -> List[dict]:
+    """Export the Lua 'data' table to native Python objects.
 
-    Returns each child table; excludes the 'extend' method.
+    Returns a list with each prototype definition converted to a dict; the
+    'extend' method is excluded. Nested Lua arrays become lists and all other
+    nested tables become dicts. The whole table is converted in one call into
+    the Lua runtime.
+
+    Parameters
+    ----------
+    fields: Iterable of str, optional
+        If given, only these top-level keys of each prototype definition are
+        exported, which saves converting graphics definitions and other data
+        that Factoratio has no use for. Defaults to exporting everything.
     """
-    data = self.lua.globals().data
-    tables = filter(lambda x: x[0] != 'extend', data.items())
-    for table in (x[1] for x in tables):
-      yield table
+    with instrument.span('luaData') as span:
+      if fields is not None:
+        fields = self.lua.table_from(list(fields))
+      tables = json.loads(self._export(self.lua.globals().data, fields))
+      span.count('tables', len(tables))
+    return tables
+
+  def sourceFiles(self, fields: Iterable[str]=None) -> Dict[str, SourceFile]:
+    """Export the Lua 'data' table split up by definition file.
+
+    Returns a dict mapping the path of each file executed by the last call to
+    loadPrototypes, relative to the prototype path, to a SourceFile holding
+    the prototype tables it defined.
+
+    Parameters
+    ----------
+    fields: Iterable of str, optional
+        See luaData.
+    """
+    tables = iter(self.luaData(fields))
+    return {
+      path.relative_to(self.path).as_posix(): SourceFile(
+        self.subdir, stat.st_size, stat.st_mtime_ns, digest,
+        list(itertools.islice(tables, nTables)))
+      for path, stat, digest, nTables in self.loaded
+    }
 
   def _make(type_):
     """Internal decorator for implementing make* methods."""
     def decorator__make(func):
       @functools.wraps(func)
       def wrapper__make(self, table, *args, **kwargs):
-        if type_ is None or type_ == table.type:
+        if type_ is None or type_ == table['type']:
           obj = func(self, table, *args, **kwargs)
           return obj
         else:
-          raise ValueError(f"Table type must be '{type_}'; got '{table.type}'")
+          raise ValueError(
+            f"Table type must be '{type_}'; got '{table['type']}'")
       return wrapper__make
     return decorator__make
 
+  @staticmethod
+  def _ingredient(spec) -> tuple:
+    """Normalize an ingredient or result specification.
+
+    Prototypes give these either in short form, e.g. {"iron-plate", 2}, or in
+    long form, e.g. {type="fluid", name="water", amount=50}. Returns a tuple
+    of name, amount, and probability; missing values are None.
+    """
+    if isinstance(spec, list):
+      return spec[0], spec[1] if len(spec) > 1 else None, None
+    return spec['name'], spec.get('amount'), spec.get('probability')
+
   @_make('item-group')
-  def makeGroup(self, table: 'LuaTable') -> item.ItemGroup:
+  def makeGroup(self, table: dict) -> item.ItemGroup:
     """Create an ItemGroup object from a group prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing a group prototype definition.
     """
-    if table.name in self.prototypes.groups:
-      group = self.prototypes.groups[table.name]
+    name = table['name']
+    if name in self.prototypes.groups:
+      group = self.prototypes.groups[name]
       # Fill in 'order' attribute that was deferred in makeSubGroup
-      group.order = table.order
+      group.order = table.get('order')
     else:
-      group = item.ItemGroup(table.name, table.order)
+      group = item.ItemGroup(name, table.get('order'))
     return group
 
   @_make('item-subgroup')
-  def makeSubGroup(self, table: 'LuaTable') -> item.ItemGroup:
+  def makeSubGroup(self, table: dict) -> item.ItemGroup:
     """Create an ItemGroup object from a subgroup prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing a subgroup prototype definition.
     """
-    if table.group in self.prototypes.groups:
-      parent = self.prototypes.groups[table.group]
+    groupName = table['group']
+    if groupName in self.prototypes.groups:
+      parent = self.prototypes.groups[groupName]
     else:
       # Defer setting 'order' until this group is found later
-      parent = item.ItemGroup(table.group, None)
+      parent = item.ItemGroup(groupName, None)
       self.prototypes.groups[parent.name] = parent
 
-    if table.name in self.prototypes.subgroups:
-      subgroup = self.prototypes.subgroups[table.name]
+    name = table['name']
+    if name in self.prototypes.subgroups:
+      subgroup = self.prototypes.subgroups[name]
       # Fill in 'parent' and 'order' that was deferred in makeItem
       subgroup.parent = parent
-      subgroup.order = table.order
+      subgroup.order = table.get('order')
     else:
-      subgroup = item.ItemGroup(table.name, table.order, parent)
+      subgroup = item.ItemGroup(name, table.get('order'), parent)
     parent[subgroup.name] = subgroup
     return subgroup
 
   @_make(None)
-  def makeItem(self, table: 'LuaTable') -> item.Item:
+  def makeItem(self, table: dict) -> item.Item:
     """Create an Item object from an item prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing an item prototype definition.
     """
-    if table.subgroup in self.prototypes.subgroups:
-      subgroup = self.prototypes.subgroups[table.subgroup]
+    subgroupName = table.get('subgroup')
+    if subgroupName in self.prototypes.subgroups:
+      subgroup = self.prototypes.subgroups[subgroupName]
     else:
       # Defer setting 'parent' and 'order' until this subgroup is found later
-      subgroup = item.ItemGroup(table.subgroup, None, None)
+      subgroup = item.ItemGroup(subgroupName, None, None)
       self.prototypes.subgroups[subgroup.name] = subgroup
-    newItem = item.Item(table.name, table.type, subgroup, table.order)
+    newItem = item.Item(table['name'], table['type'], subgroup,
+                        table.get('order'))
     subgroup[newItem.name] = newItem
     return newItem
 
   @_make('fluid')
-  def makeFluid(self, table: 'LuaTable') -> item.Fluid:
+  def makeFluid(self, table: dict) -> item.Fluid:
     """Create a Fluid object from a fluid prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing a fluid prototype definition.
     """
     return item.Fluid(
-      table.name, table.default_temperature, table.max_temperature,
-      table.heat_capacity, table.order
+      table['name'], table.get('default_temperature'),
+      table.get('max_temperature'), table.get('heat_capacity'),
+      table.get('order')
     )
 
   @_make(None)
-  def makeFuel(self, table: 'LuaTable') -> Fuel:
+  def makeFuel(self, table: dict) -> Fuel:
     """Create a Fuel object from an item prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing an item prototype definition with fuel attributes.
     """
-    return Fuel(table.name, table.fuel_value)
+    return Fuel(table['name'], table['fuel_value'])
 
   @_make('recipe')
-  def makeRecipe(self, table: 'LuaTable', expensive: bool=False) -> item.Recipe:
+  def makeRecipe(self, table: dict, expensive: bool=False) -> item.Recipe:
     """Create a Recipe object from a recipe prototype definition.
 
     Parameters
     ----------
-    table: LuaTable
+    table: dict
         A table containing a recipe prototype definition.
 
     expensive: bool, optional
         Whether or not the expensive variant should be used to create the
         Recipe. Defaults to False.
     """
-    name = table.name
-    table = table.expensive if expensive else (table.normal or table)
+    category = table.get('category', 'crafting')
+    table = table['expensive'] if expensive else (table.get('normal') or table)
     products = self.prototypes.products
-    input_ = [
-      item.Ingredient(products[x[1] or x.name], x[2] or x.amount)
-      for x in table.ingredients.values()
-    ]
+    input_ = []
+    for spec in table['ingredients']:
+      name, amount, _ = self._ingredient(spec)
+      input_.append(item.Ingredient(products[name], amount))
     if 'result' in table:
-      output = [item.Ingredient(products[table.result], table.result_count)]
+      output = [item.Ingredient(products[table['result']],
+                                table.get('result_count'))]
     elif 'results' in table:
-      output = [
-        item.Ingredient(products[x.name], x.amount, x.probability)
-        for x in table.results.values()
-      ]
-    return item.Recipe(table.energy_required or 0.5, input_, output)
+      output = []
+      for spec in table['results']:
+        name, amount, probability = self._ingredient(spec)
+        output.append(item.Ingredient(products[name], amount, probability))
+    return item.Recipe(table.get('energy_required') or 0.5, input_, output,
+                       category)
+
+  @staticmethod
+  def _subtable(table: dict, key: str) -> dict:
+    """Return a nested table of a prototype, or an empty dict if it is
+    missing or empty; empty Lua tables are exported as lists."""
+    value = table.get(key)
+    return value if isinstance(value, dict) else {}
+
+  @_make(None)
+  def makeProducer(self, table: dict) -> Producer:
+    """Create a Producer object from an entity prototype definition.
 
+    Crafting machines, furnaces and rocket silos become Producers, mining
+    drills become MiningDrills, or Pumpjacks if they extract fluids, and
+    boilers become Producers without any crafting category. Entities that
+    burn fuel become the burner variant.
 
-def initialize(protoPath: Path) -> Prototypes:
-  """Load item, fluid, group, and recipe prototypes.
+    Parameters
+    ----------
+    table: dict
+        A table containing an entity prototype definition of one of
+        ENTITY_TYPES, other than 'beacon'.
+    """
+    source = self._subtable(table, 'energy_source')
+    burner = source.get('type') == 'burner'
+    if table['type'] == 'mining-drill':
+      categories = table.get('resource_categories') or ()
+      speed = table.get('mining_speed', 1)
+      if 'basic-fluid' in categories:
+        cls = Pumpjack
+      else:
+        cls = BurnerMiningDrill if burner else MiningDrill
+    else:
+      categories = table.get('crafting_categories') or ()
+      speed = table.get('crafting_speed', 1)
+      cls = BurnerProducer if burner else Producer
+    energyUsage = Watt(table.get('energy_usage')
+                       or table.get('energy_consumption') or 0)
+    if source.get('type') != 'electric':
+      drain = Watt(0)
+    elif 'drain' in source:
+      drain = Watt(source['drain'])
+    elif table['type'] in ('assembling-machine', 'furnace', 'rocket-silo'):
+      # Electric crafting machines drain a thirtieth of their usage unless
+      # specified
+      drain = energyUsage / 30
+    else:
+      drain = Watt(0)
+    return cls(
+      table['name'], speed,
+      self._subtable(table, 'module_specification').get('module_slots', 0),
+      energyUsage, drain, source.get('emissions_per_minute', 0), categories
+    )
+
+  @_make('beacon')
+  def makeBeacon(self, table: dict) -> Beacon:
+    """Create a Beacon object from a beacon prototype definition.
+
+    Parameters
+    ----------
+    table: dict
+        A table containing a beacon prototype definition.
+    """
+    return Beacon(
+      table['name'],
+      self._subtable(table, 'module_specification').get('module_slots', 0),
+      table.get('distribution_effectivity', 1), Watt(table['energy_usage'])
+    )
+
+  def define(self, table: dict, source: str) -> str:
+    """Record a prototype table as the definition of its prototype.
+
+    Returns the kind of the prototype; see Prototypes.sourceOf.
+
+    Parameters
+    ----------
+    table: dict
+        A prototype definition.
+
+    source: str
+        The path of the file defining the table, relative to the prototype
+        path.
+    """
+    kind = _KINDS.get(table['type'], 'item')
+    self.prototypes._definitions[kind, table['name']] = (source, table)
+    return kind
+
+  @staticmethod
+  def _updateInPlace(old, new):
+    """Copy the fields of the dataclass instance new onto old; return old."""
+    for f in dataclasses.fields(old):
+      setattr(old, f.name, getattr(new, f.name))
+    return old
+
+  def addItems(self, tables: Iterable[dict], source: str,
+               stale: Dict[str, item.Item]=None):
+    """Add Groups, Subgroups, Items, and Fuels from item prototype tables.
+
+    Hidden Items are skipped.
+
+    Parameters
+    ----------
+    tables: Iterable of dict
+        Item, group, and subgroup prototype definitions.
+
+    source: str
+        The path of the file defining the tables, relative to the prototype
+        path.
+
+    stale: dict, optional
+        Items being redefined, by name. Rather than replaced, these are
+        updated in place and removed from the dict.
+    """
+    prototypes = self.prototypes
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for table in tables:
+      name = table['name']
+      kind = self.define(table, source)
+      if 'hidden' in table.get('flags', ()):
+        if debug:
+          logger.debug(f"Skipping hidden Item '{name}'")
+        continue
+      if kind == 'group':
+        if debug:
+          logger.debug(f"Adding Group '{name}'")
+        prototypes.groups[name] = self.makeGroup(table)
+      elif kind == 'subgroup':
+        if debug:
+          logger.debug(f"Adding Subgroup '{name}'")
+        prototypes.subgroups[name] = self.makeSubGroup(table)
+      else:
+        if debug:
+          logger.debug(f"Adding Item '{name}'")
+        newItem = self.makeItem(table)
+        if stale and name in stale:
+          newItem = self._updateInPlace(stale.pop(name), newItem)
+          newItem.subgroup[name] = newItem
+        prototypes.items[name] = newItem
+        if table.get('fuel_value'):
+          prototypes.fuels[name] = self.makeFuel(table)
+        else:
+          prototypes.fuels.pop(name, None)
+
+  def addFluids(self, tables: Iterable[dict], source: str,
+                stale: Dict[str, item.Fluid]=None):
+    """Add Fluids from fluid prototype tables.
+
+    Parameters
+    ----------
+    tables: Iterable of dict
+        Fluid prototype definitions.
+
+    source: str
+        The path of the file defining the tables, relative to the prototype
+        path.
+
+    stale: dict, optional
+        Fluids being redefined, by name. Rather than replaced, these are
+        updated in place and removed from the dict.
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for table in tables:
+      name = table['name']
+      self.define(table, source)
+      if debug:
+        logger.debug(f"Adding Fluid '{name}'")
+      fluid = self.makeFluid(table)
+      if stale and name in stale:
+        fluid = self._updateInPlace(stale.pop(name), fluid)
+      self.prototypes.fluids[name] = fluid
+
+  def addRecipes(self, tables: Iterable[dict], source: str) -> int:
+    """Add Recipes, including Expensive Mode variants, from recipe tables.
+
+    Recipes that refer to unknown products, such as those for hidden Items,
+    are skipped. Returns the number of Expensive Mode variants added.
+
+    Parameters
+    ----------
+    tables: Iterable of dict
+        Recipe prototype definitions.
+
+    source: str
+        The path of the file defining the tables, relative to the prototype
+        path.
+    """
+    nExp = 0
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for table in tables:
+      name = table['name']
+      self.define(table, source)
+      try:
+        recipe = self.makeRecipe(table, expensive=False)
+        if table.get('expensive'):
+          recipe.addExpensiveMode(self.makeRecipe(table, expensive=True))
+      except KeyError as err:
+        # Remember the Recipe so that it can be added if the product appears
+        # on reload
+        if debug:
+          logger.debug(f"Skipping Recipe '{name}' with unknown product {err}")
+        self.prototypes._missing.setdefault(err.args[0], set()).add(name)
+        continue
+      if recipe.expensive():
+        nExp += 1
+      self.prototypes.addRecipe(name, recipe)
+    return nExp
+
+  def addEntities(self, tables: Iterable[dict], source: str) -> int:
+    """Add Producers and Beacons from entity prototype tables.
+
+    Entities of types other than ENTITY_TYPES are skipped. Returns the number
+    of Producers and Beacons added.
+
+    Parameters
+    ----------
+    tables: Iterable of dict
+        Entity prototype definitions.
+
+    source: str
+        The path of the file defining the tables, relative to the prototype
+        path.
+    """
+    added = 0
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for table in tables:
+      if table['type'] not in ENTITY_TYPES:
+        continue
+      name = table['name']
+      self.define(table, source)
+      if table['type'] == 'beacon':
+        if debug:
+          logger.debug(f"Adding Beacon '{name}'")
+        self.prototypes.beacons[name] = self.makeBeacon(table)
+      else:
+        if debug:
+          logger.debug(f"Adding Producer '{name}'")
+        self.prototypes.addProducer(name, self.makeProducer(table))
+      added += 1
+    return added
+
+  def addSpecialRecipes(self):
+    """Add the Recipes for resources, which have no recipe prototype."""
+    items, fluids = self.prototypes.items, self.prototypes.fluids
+    for ore in ('copper-ore', 'iron-ore', 'stone', 'coal'):
+      if ore in items:
+        self.prototypes.addRecipe(ore, item.Recipe.miningRecipe(1, items[ore]))
+    if 'uranium-ore' in items and 'sulfuric-acid' in fluids:
+      self.prototypes.addRecipe('uranium-ore', item.Recipe.miningRecipe(
+        2, items['uranium-ore'], [item.Ingredient(fluids['sulfuric-acid'], 1)]))
+    if 'crude-oil' in fluids:
+      self.prototypes.addRecipe('crude-oil', item.PumpjackRecipe(
+        1, item.Ingredient(fluids['crude-oil']), 10))
+
+  def pruneGroups(self, subgroupNames: Iterable[str]=None,
+                  groupNames: Iterable[str]=None):
+    """Remove Groups and Subgroups that ended up empty, e.g. due to hidden
+    Items.
+
+    Parameters
+    ----------
+    subgroupNames, groupNames: Iterable of str, optional
+        Only consider these Subgroups and Groups. Defaults to all of them.
+        Parents of removed Subgroups are always considered.
+    """
+    groups, subgroups = self.prototypes.groups, self.prototypes.subgroups
+    # A copy is necessary since we're removing things
+    subgroupNames = list(subgroups if subgroupNames is None else subgroupNames)
+    groupNames = set(groups if groupNames is None else groupNames)
+    for name in subgroupNames:
+      subgroup = subgroups.get(name)
+      if subgroup is not None and not len(subgroup):
+        logger.debug(f"Removing empty Subgroup '{subgroup}'")
+        if subgroup.parent is not None:
+          subgroup.parent.pop(name, None)
+          groupNames.add(subgroup.parent.name)
+        del subgroups[name]
+    for name in groupNames:
+      group = groups.get(name)
+      if group is not None and not len(group):
+        logger.debug(f"Removing empty Group '{group}'")
+        del groups[name]
+
+  def update(self, new: Dict[str, SourceFile], removed: Iterable[str]):
+    """Patch the prototypes with changed definition files.
+
+    Everything defined by the previous versions of the new and removed files
+    is removed, then the prototype tables of the new files are added.
+    Group and Subgroup definitions are reapplied where needed, and Recipes
+    depending on products that were added or removed are rebuilt. See
+    Prototypes.reload.
+
+    Parameters
+    ----------
+    new: dict
+        SourceFiles that were added or changed, keyed by their path relative
+        to the prototype path; see sourceFiles.
+
+    removed: Iterable of str
+        Paths of definition files that no longer exist, relative to the
+        prototype path.
+    """
+    prototypes = self.prototypes
+    definitions = prototypes._definitions
+    groups, subgroups = prototypes.groups, prototypes.subgroups
+    prototypes._compiled.clear()
+    old = {
+      rel: prototypes.sources.pop(rel)
+      for rel in itertools.chain(new, removed) if rel in prototypes.sources
+    }
+    prototypes.sources.update(new)
+
+    # Detach everything that the previous versions of the files defined
+    staleItems, staleFluids = {}, {}
+    subgroupNames, groupNames = set(), set()
+    for rel, source in old.items():
+      for table in source.tables:
+        kind, name = _KINDS.get(table['type'], 'item'), table['name']
+        if definitions.get((kind, name), (None,))[0] != rel:
+          continue # Defined again by another file since
+        del definitions[kind, name]
+        if kind == 'item' and name in prototypes.items:
+          staleItems[name] = oldItem = prototypes.items.pop(name)
+          prototypes.fuels.pop(name, None)
+          oldItem.subgroup.pop(name, None)
+          subgroupNames.add(oldItem.subgroup.name)
+        elif kind == 'subgroup' and name in subgroups:
+          subgroup = subgroups[name]
+          if subgroup.parent is not None:
+            subgroup.parent.pop(name, None)
+            groupNames.add(subgroup.parent.name)
+          subgroup.parent = subgroup.order = None
+          subgroupNames.add(name)
+        elif kind == 'group' and name in groups:
+          groups[name].order = None
+          groupNames.add(name)
+        elif kind == 'fluid' and name in prototypes.fluids:
+          staleFluids[name] = prototypes.fluids.pop(name)
+        elif kind == 'recipe':
+          prototypes.removeRecipe(name)
+        elif kind == 'entity':
+          prototypes.removeProducer(name)
+          prototypes.beacons.pop(name, None)
+
+    # Add the new definitions
+    redefined = set(staleItems) | set(staleFluids)
+    added = set()
+    for subdir in SUBDIRS:
+      for rel, source in new.items():
+        if source.subdir != subdir:
+          continue
+        if subdir == 'item':
+          self.addItems(source.tables, rel, staleItems)
+          for table in source.tables:
+            kind = _KINDS.get(table['type'], 'item')
+            if kind == 'group':
+              groupNames.add(table['name'])
+            elif kind == 'subgroup':
+              subgroupNames.add(table['name'])
+              groupNames.add(table['group'])
+            elif table['name'] in prototypes.items:
+              subgroupNames.add(prototypes.items[table['name']].subgroup.name)
+              added.add(table['name'])
+        elif subdir == 'fluid':
+          self.addFluids(source.tables, rel, staleFluids)
+          added.update(table['name'] for table in source.tables)
+        elif subdir == 'entity':
+          self.addEntities(source.tables, rel)
+        else:
+          self.addRecipes(source.tables, rel)
+
+    # Reapply Subgroup and Group definitions that are missing, e.g. those
+    # that were pruned before but have Items again
+    for name in subgroupNames:
+      subgroup = subgroups.get(name)
+      definition = definitions.get(('subgroup', name))
+      if subgroup is not None and subgroup.parent is None and definition:
+        subgroups[name] = self.makeSubGroup(definition[1])
+        groupNames.add(subgroups[name].parent.name)
+    for name in groupNames:
+      group = groups.get(name)
+      definition = definitions.get(('group', name))
+      if group is not None and group.order is None and definition:
+        groups[name] = self.makeGroup(definition[1])
+    self.pruneGroups(subgroupNames, groupNames)
+
+    # Relink Recipes that depend on products that were added or removed,
+    # including those previously skipped for lack of a product
+    changedProducts = (added - redefined) | set(staleItems) | set(staleFluids)
+    affected = set()
+    for name in changedProducts:
+      affected.update(prototypes._dependents(name))
+      affected.update(prototypes._missing.pop(name, ()))
+    for name in sorted(affected):
+      definition = definitions.get(('recipe', name))
+      prototypes.removeRecipe(name)
+      if definition is not None:
+        self.addRecipes([definition[1]], definition[0])
+    self.addSpecialRecipes()
+
+
+def _digest(data: bytes) -> str:
+  """Returns a hash of the contents of a definition file."""
+  return hashlib.sha1(data).hexdigest()
+
+def _stripRequires(data: bytes) -> bytes:
+  """Remove every line of data that contains a `require` expression."""
+  pos = data.find(_REQUIRE)
+  if pos < 0:
+    return data
+  parts, start = [], 0
+  while pos >= 0:
+    newline = data.rfind(b'\n', start, pos)
+    parts.append(data[start:start if newline < 0 else newline + 1])
+    end = data.find(b'\n', pos)
+    start = len(data) if end < 0 else end + 1
+    pos = data.find(_REQUIRE, start)
+  parts.append(data[start:])
+  return b''.join(parts)
+
+def preprocess(data: bytes) -> Tuple[str, str]:
+  """Prepare the contents of a definition file for execution.
+
+  Some prototype definitions (e.g. 'gun.lua') contain a `require` expression
+  as a value. They typically call methods only available during Factorio's
+  runtime, so every line containing one is removed, in a single pass over
+  the whole file buffer. Results are cached by content hash.
+
+  Returns a tuple of the hash of data and the Lua code to execute.
+
+  Parameters
+  ----------
+  data: bytes
+      The raw contents of a definition file.
+  """
+  digest = _digest(data)
+  code = _preprocessed.get(digest)
+  if code is None:
+    code = _stripRequires(data).decode('utf-8')
+    if len(_preprocessed) >= PREPROCESS_CACHE_SIZE:
+      # Evict the oldest entry; dicts keep insertion order
+      del _preprocessed[next(iter(_preprocessed))]
+    _preprocessed[digest] = code
+  return digest, code
+
+def getCachePath() -> Path:
+  """Returns the path of the on-disk prototype cache."""
+  return util.getConfigPath(Path(CACHE_NAME))
+
+def libraryPaths(protoPath: Path) -> Tuple[Path, Path]:
+  """Return the directories that the definition files at protoPath require
+  Lua modules from: that of their mod, and the core mod's 'lualib'."""
+  return protoPath.parent, protoPath.parent.parent / 'core' / 'lualib'
+
+def libraryFiles(protoPath: Path) -> List[Path]:
+  """Return the Lua modules that the definition files at protoPath may
+  require, besides definition files; see libraryPaths.
+
+  Of the mod directory, only the top level and the 'prototypes' directory
+  are searched, so that this stays cheap enough to poll.
+  """
+  modPath, lualib = libraryPaths(protoPath)
+  definitions = {protoPath / subdir for subdir in SUBDIRS}
+  return sorted([
+    *modPath.glob('*.lua'),
+    *(path for path in protoPath.rglob('*.lua')
+      if path.parent not in definitions),
+    *lualib.rglob('*.lua')
+  ])
+
+def libraryDigest(protoPath: Path) -> str:
+  """Return a hash of the path, size, and modification time of every Lua
+  module that the definition files at protoPath may require; see
+  libraryFiles."""
+  digest = hashlib.sha256()
+  for path in libraryFiles(protoPath):
+    stat = path.stat()
+    digest.update(f'{path.as_posix()}\0{stat.st_size}\0'
+                  f'{stat.st_mtime_ns}\n'.encode())
+  return digest.hexdigest()
+
+def fingerprint(protoPath: Path) -> str:
+  """Compute a fingerprint of the prototype definitions at protoPath.
+
+  The fingerprint covers the path, size, and modification time of every
+  definition file that initialize() reads and of every Lua module they may
+  require, see libraryDigest, along with the game version found in the
+  adjacent 'info.json' and CACHE_VERSION. Any change to the game
+  installation thus yields a different fingerprint.
+
+  Parameters
+  ----------
+  protoPath: Path
+    The path to Factorio's 'prototypes' directory.
+  """
+  digest = hashlib.sha256(f'{CACHE_VERSION}\n'.encode())
+  try:
+    with (protoPath.parent / 'info.json').open(encoding='utf-8') as f:
+      version = json.load(f).get('version', '')
+  except (OSError, ValueError, AttributeError):
+    version = ''
+  digest.update(f'{version}\n'.encode())
+  for subdir in SUBDIRS:
+    for path in sorted(protoPath.glob(f'{subdir}/*.lua')):
+      stat = path.stat()
+      digest.update(f'{path.relative_to(protoPath).as_posix()}\0'
+                    f'{stat.st_size}\0{stat.st_mtime_ns}\n'.encode())
+  digest.update(f'{libraryDigest(protoPath)}\n'.encode())
+  return digest.hexdigest()
+
+def readCache(cachePath: Path, expected: str) -> Optional[Prototypes]:
+  """Load a Prototypes snapshot from the cache at cachePath.
+
+  Returns None if the cache does not exist, was written for a different
+  fingerprint, or cannot be read for any reason.
+
+  Parameters
+  ----------
+  cachePath: Path
+    The path to the cache file.
+
+  expected: str
+    The fingerprint of the current prototype definitions; see fingerprint().
+  """
+  try:
+    with cachePath.open('rb') as f:
+      # The header is pickled separately so that a stale cache can be
+      # rejected without unpickling the whole snapshot.
+      version, cached = pickle.load(f)
+      if version != CACHE_VERSION or cached != expected:
+        logger.debug(f"Prototype cache at '{cachePath}' is stale")
+        return None
+      prototypes = pickle.load(f)
+  except FileNotFoundError:
+    return None
+  except Exception as err:
+    logger.debug(f"Ignoring unreadable prototype cache at '{cachePath}': "
+                 f'{err!r}')
+    return None
+  if not isinstance(prototypes, Prototypes):
+    return None
+  return prototypes
+
+def writeCache(cachePath: Path, digest: str, prototypes: Prototypes):
+  """Write a Prototypes snapshot to the cache at cachePath.
+
+  The cache is written to a temporary file first and then moved into place,
+  so an interrupted write never leaves a partial cache behind. Failure to
+  write the cache is logged, but is otherwise not an error.
+
+  Parameters
+  ----------
+  cachePath: Path
+    The path to the cache file.
+
+  digest: str
+    The fingerprint of the prototype definitions the snapshot was read from.
+
+  prototypes: Prototypes
+    The Prototypes object to cache.
+  """
+  tmpPath = cachePath.with_name(f'{cachePath.name}.{os.getpid()}.tmp')
+  try:
+    cachePath.parent.mkdir(parents=True, exist_ok=True)
+    with tmpPath.open('wb') as f:
+      pickle.dump((CACHE_VERSION, digest), f, pickle.HIGHEST_PROTOCOL)
+      pickle.dump(prototypes, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpPath, cachePath)
+  except Exception as err:
+    logger.warning(f"Could not write prototype cache to '{cachePath}': {err}")
+    try:
+      tmpPath.unlink()
+    except OSError:
+      pass
+
+def _readFiles(protoPath: Path, subdir: str, files: List[Path],
+               profiled: bool=False) -> Tuple[Dict[str, SourceFile],
+                                              List[dict]]:
+  """Execute the given definition files in a fresh Lua runtime.
+
+  Returns the SourceFiles read, and if profiled, the instrumentation spans
+  recorded meanwhile, converted with Span.toDict. This is the unit of work
+  handed to worker processes by readTables, and done in turn when reading
+  serially.
+  """
+  if not profiled:
+    reader = ProtoReader(protoPath, Prototypes())
+    reader.loadPrototypes(subdir, files)
+    return reader.sourceFiles(FIELDS[subdir]), []
+  with instrument.profile() as profile, instrument.span('readFiles'):
+    reader = ProtoReader(protoPath, Prototypes())
+    reader.loadPrototypes(subdir, files)
+    sources = reader.sourceFiles(FIELDS[subdir])
+  return sources, [span.toDict(0.0) for span in profile.spans]
+
+def readTables(protoPath: Path, parallel: bool=True,
+               workers: int=None) -> Dict[str, SourceFile]:
+  """Execute the prototype definitions of every subdirectory in SUBDIRS.
+
+  Returns a dict mapping the path of each definition file, relative to
+  protoPath, to a SourceFile holding the prototype tables it defines. Files
+  are ordered as in SUBDIRS, then by name.
+
+  The files of each subdirectory are executed in order in a Lua runtime of
+  their own, as definition files may use globals, such as helper functions,
+  defined by the files before them. The result thus does not depend on
+  whether the files were read in parallel.
+
+  Parameters
+  ----------
+  protoPath: Path
+    The path to Factorio's 'prototypes' directory.
+
+  parallel: bool, optional
+    Whether to execute the subdirectories in a pool of worker processes
+    rather than one after another. Defaults to True.
+
+  workers: int, optional
+    The maximum number of worker processes. Defaults to the number of CPUs.
+    Files are read serially if this ends up being one.
+  """
+  with instrument.span('readTables') as span:
+    # One task per subdirectory; map() yields the results in submission
+    # order, so merging is deterministic.
+    tasks = [(subdir, sorted(protoPath.glob(f'{subdir}/*.lua')))
+             for subdir in SUBDIRS]
+    tasks = [task for task in tasks if task[1]]
+    sources = {}
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if parallel and workers > 1:
+      span.count('workers', workers)
+      with ProcessPoolExecutor(workers) as pool:
+        for result, spans in pool.map(_readFiles, itertools.repeat(protoPath),
+                                      *zip(*tasks),
+                                      itertools.repeat(bool(span))):
+          sources.update(result)
+          instrument.attach(spans)
+    else:
+      span.count('workers', 1)
+      for subdir, files in tasks:
+        sources.update(_readFiles(protoPath, subdir, files)[0])
+    span.count('files', len(sources))
+  return sources
+
+def initialize(protoPath: Path, useCache: bool=True,
+               parallel: bool=True) -> Prototypes:
+  """Load item, fluid, group, recipe, and entity prototypes.
 
   Returns a Prototypes object with all relevant prototypes loaded from the
   definition files located at protoPath.
 
+  Unless disabled, a snapshot of the result is kept in the prototype cache
+  (see getCachePath) and reused for as long as the fingerprint of protoPath
+  does not change, skipping Lua entirely.
+
   Parameters
   ----------
   protoPath: Path
     The path to Factorio's 'prototypes' directory.
+
+  useCache: bool, optional
+    Whether to read from and write to the prototype cache. Defaults to True.
+
+  parallel: bool, optional
+    Whether to execute the Lua definitions in a pool of worker processes; see
+    readTables. Turning this off can make debugging easier. Defaults to True.
   """
   if not protoPath.exists():
     logger.critical(f"Could not find item prototypes at '{protoPath}'; "
       'cannot continue. Ensure that the path to the Factorio installation is '
       'correct and that it is properly installed.')
 
-  result = Prototypes()
-  items = result.items
-  fluids = result.fluids
-  fuels = result.fuels
-  products = result.products
-  groups = result.groups
-  subgroups = result.subgroups
-  recipes = result.recipes
+  with instrument.span('initialize'):
+    if useCache:
+      with instrument.span('readCache') as span:
+        cachePath = getCachePath()
+        current = fingerprint(protoPath)
+        result = readCache(cachePath, current)
+        span.count('hits', result is not None)
+      if result is not None:
+        logger.info(f'Loaded {len(result.items)} Items, {len(result.fluids)} '
+                    f'Fluids, {len(result.recipes)} Recipes, and '
+                    f'{len(result.producers)} Producers from cache')
+        return result
+
+    result = _readPrototypes(protoPath, parallel)
+    if useCache:
+      with instrument.span('writeCache'):
+        writeCache(cachePath, current, result)
+  return result
+
+def _readPrototypes(protoPath: Path, parallel: bool) -> Prototypes:
+  """Read prototypes from their Lua definitions; see initialize()."""
+  result = Prototypes(path=protoPath)
+  result._libraries = libraryDigest(protoPath)
 
-  reader = ProtoReader(protoPath, result)
   logger.info(f"Reading prototypes from '{protoPath}' ...")
+  result.sources.update(readTables(protoPath, parallel))
+  reader = ProtoReader(protoPath, result)
+
+  def sources(subdir, span):
+    for rel, source in result.sources.items():
+      if source.subdir == subdir:
+        span.count('tables', len(source.tables))
+        yield rel, source.tables
 
   # Get Item, Group, and Subgroup prototype definitions
-  reader.loadPrototypes('item')
-  for table in reader.luaData():
-    if table.flags and 'hidden' in table.flags.values():
-      logger.debug(f"Skipping hidden Item '{table.name}'")
-      continue
-    if table.type == 'item-group':
-      logger.debug(f"Adding Group '{table.name}'")
-      groups[table.name] = reader.makeGroup(table)
-    elif table.type == 'item-subgroup':
-      logger.debug(f"Adding Subgroup '{table.name}'")
-      subgroups[table.name] = reader.makeSubGroup(table)
-    else:
-      logger.debug(f"Adding Item '{table.name}'")
-      items[table.name] = reader.makeItem(table)
-      if table.fuel_value:
-        fuels[table.name] = reader.makeFuel(table)
-
-  # Remove Groups and Subgroups that ended up being empty due to hidden Items
-  # A copy is necessary since we're removing things
-  for name, subgroup in dict(subgroups).items():
-    if not len(subgroup):
-      logger.debug(f"Removing empty Subgroup '{subgroup}'")
-      del groups[subgroup.parent.name][name]
-      del subgroups[name]
-  for name, group in dict(groups).items():
-    if not len(group):
-      logger.debug(f"Removing empty Group '{group}'")
-      del groups[name]
+  with instrument.span('addItems') as span:
+    for rel, tables in sources('item', span):
+      reader.addItems(tables, rel)
+    span.count('groups', len(result.groups))
+    span.count('subgroups', len(result.subgroups))
+    span.count('items', len(result.items))
+    span.count('fuels', len(result.fuels))
+  with instrument.span('pruneGroups') as span:
+    before = len(result.groups) + len(result.subgroups)
+    reader.pruneGroups()
+    span.count('removed', before - len(result.groups) - len(result.subgroups))
 
   # Get Fluid prototypes
-  reader.loadPrototypes('fluid')
-  for table in reader.luaData():
-    logger.debug(f"Adding Fluid '{table.name}'")
-    fluids[table.name] = reader.makeFluid(table)
+  with instrument.span('addFluids') as span:
+    for rel, tables in sources('fluid', span):
+      reader.addFluids(tables, rel)
+    span.count('fluids', len(result.fluids))
 
-  logger.info(f'Loaded {len(groups)} Groups, {len(subgroups)} Subgroups, '
-              f'{len(items)} Items, and {len(fluids)} Fluids')
+  logger.info(f'Loaded {len(result.groups)} Groups, '
+              f'{len(result.subgroups)} Subgroups, {len(result.items)} Items, '
+              f'and {len(result.fluids)} Fluids')
 
-  # Get Recipe prototypes
+  # Get Recipe prototypes, linking their Ingredients to the products
   nExp = 0
-  reader.loadPrototypes('recipe')
-  for table in reader.luaData():
-    # Skip recipes for hidden items
-    if table.name not in items: continue
-    recipe = reader.makeRecipe(table, expensive=False)
-    if table.expensive:
-      recipe.addExpensiveMode(reader.makeRecipe(table, expensive=True))
-      nExp += 1
-    recipes[table.name] = recipe
-
-  # Special cases
-  for ore in ('copper-ore', 'iron-ore', 'stone', 'coal'):
-    recipes[ore] = item.Recipe.miningRecipe(1, items[ore])
-  recipes['uranium-ore'] = item.Recipe.miningRecipe(2, items['uranium-ore'],
-    [item.Ingredient(fluids['sulfuric-acid'], 1)])
-  recipes['crude-oil'] = item.PumpjackRecipe(1, fluids['crude-oil'], 10)
-
-  logger.info(f'Loaded {len(recipes)} normal and {nExp} expensive Recipes')
+  with instrument.span('addRecipes') as span:
+    for rel, tables in sources('recipe', span):
+      nExp += reader.addRecipes(tables, rel)
+    reader.addSpecialRecipes()
+    span.count('recipes', len(result.recipes))
+    span.count('expensive', nExp)
+    if span:
+      span.count('ingredients', sum(
+        len(variant.input) + len(variant.output)
+        for recipe in result.recipes.values()
+        for variant in (recipe, recipe.expensive()) if variant is not None))
+
+  logger.info(f'Loaded {len(result.recipes)} normal and {nExp} expensive '
+              'Recipes')
+
+  # Get Producer and Beacon prototypes
+  with instrument.span('addEntities') as span:
+    for rel, tables in sources('entity', span):
+      reader.addEntities(tables, rel)
+    span.count('producers', len(result.producers))
+    span.count('beacons', len(result.beacons))
+
+  logger.info(f'Loaded {len(result.producers)} Producers and '
+              f'{len(result.beacons)} Beacons for '
+              f'{len(result.categories)} crafting categories')
   return result
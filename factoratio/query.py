@@ -0,0 +1,615 @@
+"""query.py
+
+Answers rate and planning queries about a set of Prototypes, posed as
+JSON-compatible dicts, one at a time or as a stream of JSON Lines; see
+main.py for the batch entry point.
+
+A query is an object with these keys, all but item optional:
+
+  id         Anything; echoed back in the answer.
+  type       'rates', the default, for the machines needed to make the item
+             with a single Recipe, or 'plan' for its whole production chain.
+  item       The name of the product.
+  rate       The target rate, in units per second. Defaults to one.
+  machines   For 'rates' queries, a number of machines to find the rate of,
+             instead of a rate to find the number of machines for.
+  recipe     The name of the Recipe making the item.
+  producer   The Producer crafting that Recipe: a key of producer.base, or
+             the name of a Producer loaded from the Prototypes.
+  modules    Keys of producer.baseModules, one per module slot.
+  beacons    A list of {"name", "count", "modules"} objects; name is a key
+             of producer.baseBeacons and defaults to 'Beacon'.
+  fuel       The name of the Fuel burned by burner Producers. Defaults to
+             DEFAULT_FUEL.
+  yield      The yield of the oil field, in percent, for Pumpjacks. Defaults
+             to DEFAULT_YIELD.
+  expensive  Whether to use Expensive Mode Recipes.
+
+Each answer is a dict holding the id and the results, or an 'error' message
+if the query could not be answered; a bad query never stops a batch.
+
+Results are cached, keyed by what they depend on once names and defaults are
+resolved: the item, Recipe, Producer with its modules and Beacons as
+multisets, or for plans the configuration of every Producer, fuel, rate or
+machine count, and mode. Queries that differ only in how they say the same
+thing, e.g. the order of modules, share an entry.
+
+Example
+-------
+>>> engine = QueryEngine(prototypes)
+>>> engine.answer({'item': 'electronic-circuit', 'rate': 10,
+...                'producer': 'Assembler3', 'modules': ['Speed3'] * 4})
+"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import copy
+import json
+import logging
+from pathlib import Path
+import queue
+import threading
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from factoratio import producer, snapshot
+from factoratio.cache import CACHE_SIZE, ResultCache, producerKey
+from factoratio.item import Recipe
+from factoratio.producer import BurnerProducer, Producer, Pumpjack
+from factoratio.prototype import Prototypes
+from factoratio.solver import Solver
+
+logger = logging.getLogger('factoratio')
+
+QUERY_TYPES = ('rates', 'plan')
+
+DEFAULT_FUEL = 'coal'
+DEFAULT_YIELD = 100
+
+# Distinct Producer configurations kept configured, and memoized in the
+# Solvers, before starting over; bounds memory for endless query streams
+MAX_CONFIGS = 256
+
+# Most queries handed to a worker process at once, and chunks in flight per
+# worker; queries already read are sent without waiting for a full chunk
+CHUNK_SIZE = 16
+CHUNKS_PER_WORKER = 2
+
+
+class QueryError(ValueError):
+  """Raised for a query that cannot be answered; see QueryEngine.answer."""
+  pass
+
+
+class QueryEngine():
+  """Answers queries against a set of Prototypes loaded once.
+
+  Producers configured by queries are copies, so queries never change the
+  Producers of producer.base or the Prototypes. Configurations and solved
+  Steps are memoized across queries, up to MAX_CONFIGS configurations, and
+  results are cached; see the module documentation. All of it is dropped
+  when the generation of the Prototypes changes.
+
+  Attributes
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes queries are answered from.
+
+  results: factoratio.cache.ResultCache
+      The cached results of 'rates' and 'plan' queries.
+  """
+
+  def __init__(self, prototypes: Prototypes, cacheSize: int=CACHE_SIZE,
+               ttl: float=None):
+    """
+    Parameters
+    ----------
+    prototypes: factoratio.prototype.Prototypes
+        The Prototypes to answer queries from.
+
+    cacheSize: int, optional
+        The number of results to cache; zero turns caching off. Defaults to
+        cache.CACHE_SIZE.
+
+    ttl: float, optional
+        Seconds a cached result stays valid. Defaults to no limit.
+    """
+    self.prototypes = prototypes
+    self.results = ResultCache(cacheSize, ttl)
+    self._solvers = {}
+    self._configs = {}
+    self._generation = prototypes.generation
+
+  def solver(self, expensive: bool=False,
+             preferred: Tuple[str, str]=None) -> Solver:
+    """Return the Solver for normal or Expensive Mode Recipes.
+
+    Parameters
+    ----------
+    expensive: bool, optional
+        Whether to use Expensive Mode Recipes. Defaults to False.
+
+    preferred: tuple of (str, str), optional
+        A product and the name of the Recipe to make it with. Such Solvers
+        are kept apart, so that preferring a Recipe does not clear what the
+        others memoized; they count towards MAX_CONFIGS.
+    """
+    key = expensive, preferred
+    solver = self._solvers.get(key)
+    if solver is None:
+      if preferred is not None and len(self._solvers) >= MAX_CONFIGS:
+        self._clearConfigs()
+      solver = self._solvers[key] = Solver(
+        self.prototypes, recipes=dict([preferred] if preferred else []),
+        expensive=expensive)
+    return solver
+
+  def clear(self):
+    """Forget all configured Producers, memoized solutions and cached
+    results.
+
+    Done automatically when the generation of the Prototypes changes, e.g.
+    on a reload.
+    """
+    self._clearConfigs()
+    self.results.clear()
+
+  def _clearConfigs(self):
+    self._configs.clear()
+    self._solvers = {key: solver for key, solver in self._solvers.items()
+                     if key[1] is None}
+    for solver in self._solvers.values():
+      solver.clear()
+
+  def _revalidate(self):
+    """Clear everything derived from the Prototypes if they changed."""
+    if self.prototypes.generation != self._generation:
+      self._generation = self.prototypes.generation
+      self.clear()
+
+  def answer(self, query: dict) -> dict:
+    """Answer a single query.
+
+    Returns the answer, or a dict with the query's id and an 'error' message
+    if it could not be answered.
+
+    Parameters
+    ----------
+    query: dict
+        The query; see the module documentation.
+    """
+    queryId = query.get('id') if isinstance(query, dict) else None
+    try:
+      if not isinstance(query, dict):
+        raise QueryError('Query must be a JSON object')
+      type_ = query.get('type', 'rates')
+      if type_ not in QUERY_TYPES:
+        raise QueryError(f"Unknown query type '{type_}', expected one of "
+                         f'{", ".join(QUERY_TYPES)}')
+      result = self.plan(query) if type_ == 'plan' else self.rates(query)
+    except KeyError as e:
+      return {'id': queryId, 'error': f'Unknown name {e.args[0]!r}'}
+    except (TypeError, ValueError) as e:
+      return {'id': queryId, 'error': str(e)}
+    except Exception as e:
+      # Whatever else goes wrong, a bad query never stops a batch
+      logger.exception(f'Answering query {queryId!r} failed')
+      return {'id': queryId, 'error': f'Internal error: {e!r}'}
+    return {'id': queryId, **result}
+
+  def answerLine(self, line: str) -> Optional[dict]:
+    """Answer a query given as a line of JSON.
+
+    Returns None for a blank line.
+    """
+    if not line.strip():
+      return None
+    try:
+      query = json.loads(line)
+    except ValueError as e:
+      return {'id': None, 'error': f'Invalid JSON: {e}'}
+    return self.answer(query)
+
+  def rates(self, query: dict) -> dict:
+    """Answer a 'rates' query: the number of Producers needed to make the
+    item at the target rate, and everything they consume and produce.
+
+    Given a number of machines instead of a rate, answers the other way
+    around: the rate those machines make the item at.
+    """
+    itemName, rate, expensive = self._target(query)
+    self._revalidate()
+    solver = self.solver(expensive)
+    recipeName, recipe = self._recipe(query, solver, itemName)
+    machine = self._producer(query, recipe, solver.producerFor(recipe))
+    fuel = self._fuel(query) if isinstance(machine, BurnerProducer) else None
+
+    currentYield = float(query.get('yield', DEFAULT_YIELD))
+    measure = currentYield if isinstance(machine, Pumpjack) else itemName
+    if 'machines' in query:
+      count = float(query['machines'])
+      if count <= 0:
+        raise QueryError(f'Machine count must be positive, got {count}')
+      target = 'machines', count
+    else:
+      target = 'rate', rate
+    key = ('rates', itemName, recipeName, producerKey(machine),
+           fuel.name if fuel is not None else None, measure, target,
+           expensive)
+    modules = [str(m) for m in machine.modules if m is not None]
+    cached = self.results.get(key)
+    if cached is not None:
+      # Modules are listed in the order this query gave them
+      if cached['modules'] != modules:
+        cached = {**cached, 'modules': modules}
+      return cached
+
+    if 'machines' in query:
+      rate = machine.productionRate(recipe, measure, count)
+    else:
+      count = machine.productionRateInverse(recipe, measure, rate)
+    if fuel is not None:
+      args = recipe, fuel, count
+    elif isinstance(machine, Pumpjack):
+      args = recipe, currentYield, count
+    else:
+      args = recipe, count
+    rateDict = machine.rates(*args)
+
+    result = {
+      'type': 'rates',
+      'item': itemName,
+      'rate': rate,
+      'recipe': recipeName,
+      'producer': machine.name,
+      'modules': modules,
+      'machines': count,
+      'consumed': _totals(rateDict['consumed']),
+      'produced': _totals(rateDict['produced']),
+      'energy': rateDict['energy'].value,
+      'pollution': rateDict['pollution']
+    }
+    if fuel is not None:
+      result['fuel'] = {query.get('fuel', DEFAULT_FUEL): rateDict['fuel']}
+    if 'cycles' in rateDict:
+      result['cycles'] = rateDict['cycles']
+    return self.results.put(key, result)
+
+  def plan(self, query: dict) -> dict:
+    """Answer a 'plan' query: the whole production chain of the item at the
+    target rate, down to raw resources.
+
+    A recipe given makes the item; a producer, modules or beacons given
+    craft every Recipe of the chain in the crafting category of that one.
+    The rest of the chain uses the Solver's defaults.
+    """
+    itemName, rate, expensive = self._target(query)
+    self._revalidate()
+    recipeName = query.get('recipe')
+    solver = self.solver(expensive, None if recipeName is None
+                         else (itemName, recipeName))
+    name, recipe = solver.recipeFor(itemName)
+    if recipe is None:
+      raise QueryError(f"'{itemName}' is a raw resource")
+    category = recipe.category
+    default = solver.producerFor(recipe)
+    solver.producers[category] = self._producer(query, recipe, default)
+    try:
+      # The chain depends on the Producers of every category, not just the
+      # one configured by the query
+      key = ('plan', itemName, name, solver.configuration(),
+             query.get('fuel', DEFAULT_FUEL), rate, expensive)
+      cached = self.results.get(key)
+      if cached is not None:
+        return cached
+      chain = solver.solve(itemName, rate)
+    finally:
+      solver.producers[category] = default
+
+    fuel = None
+    if any(isinstance(x, BurnerProducer) for x in chain.producers.values()):
+      fuel = self._fuel(query)
+    energy = chain.energy.value.tolist()
+    recipes = {}
+    for (name, count), watts in zip(chain.machines.items(), energy):
+      machine = chain.producers[name]
+      recipes[name] = {'producer': machine.name, 'machines': count,
+                       'energy': watts}
+      if fuel is not None and isinstance(machine, BurnerProducer):
+        recipes[name]['fuel'] = watts / fuel.energy.value
+    return self.results.put(key, {
+      'type': 'plan',
+      'item': itemName,
+      'rate': rate,
+      'recipes': recipes,
+      'flows': chain.flows,
+      'raw': chain.raw,
+      'byproducts': chain.byproducts,
+      'energy': sum(energy)
+    })
+
+  @staticmethod
+  def _target(query: dict) -> Tuple[str, float, bool]:
+    """Return the item, rate and mode of a query."""
+    itemName = query.get('item')
+    if not isinstance(itemName, str):
+      raise QueryError("Query has no 'item'")
+    rate = float(query.get('rate', 1.0))
+    if rate <= 0:
+      raise QueryError(f'Rate must be positive, got {rate}')
+    return itemName, rate, bool(query.get('expensive', False))
+
+  def _recipe(self, query: dict, solver: Solver,
+              itemName: str) -> Tuple[str, Recipe]:
+    """Return the name and Recipe making the item of a rates query.
+
+    Unlike in a plan, raw resources are made by their mining Recipes.
+    """
+    candidates = self.prototypes.recipesProducing(itemName, solver.expensive)
+    name = query.get('recipe')
+    if name is not None:
+      if name not in candidates:
+        raise QueryError(f"Recipe '{name}' does not produce '{itemName}'")
+      return name, candidates[name]
+    name, recipe = solver.recipeFor(itemName)
+    if recipe is not None:
+      return name, recipe
+    if not candidates:
+      raise QueryError(f"No Recipe produces '{itemName}'")
+    name = itemName if itemName in candidates else next(iter(candidates))
+    return name, candidates[name]
+
+  def _producer(self, query: dict, recipe: Recipe,
+                default: Producer) -> Producer:
+    """Return the Producer a query asks for to craft a Recipe, configured
+    with its modules and Beacons; the default if it configures nothing."""
+    name = query.get('producer')
+    modules = _names(query.get('modules'), "'modules'")
+    specs = query.get('beacons') or []
+    if (not isinstance(specs, list)
+        or not all(isinstance(spec, dict) for spec in specs)):
+      raise QueryError("'beacons' must be a list of objects")
+    beacons = tuple((spec.get('name', 'Beacon'), int(spec.get('count', 1)),
+                     _names(spec.get('modules'), 'Beacon modules'))
+                    for spec in specs)
+    if name is None and not modules and not beacons:
+      return default
+    if name is None:
+      base = default
+    elif name in producer.base:
+      base = producer.base[name]
+    else:
+      base = self.prototypes.producers[name]
+    if base.categories and recipe.category not in base.categories:
+      raise QueryError(f"'{base.name}' cannot craft '{recipe.category}' "
+                       'Recipes')
+    # Without a producer named, the one configured depends on the category
+    key = (default.name if name is None else name, recipe.category, modules,
+           beacons)
+    configured = self._configs.get(key)
+    if configured is not None:
+      return configured
+
+    configured = copy.copy(base)
+    if modules:
+      configured.modules = [producer.baseModules[m] for m in modules]
+    if beacons:
+      configured.beacons = [(self._beacon(beaconName, beaconModules), count)
+                            for beaconName, count, beaconModules in beacons]
+
+    if len(self._configs) >= MAX_CONFIGS:
+      self._clearConfigs()
+    self._configs[key] = configured
+    return configured
+
+  @staticmethod
+  def _beacon(name: str, modules: Tuple[str, ...]) -> producer.Beacon:
+    """Return a copy of a base Beacon holding the given Modules."""
+    beacon = copy.copy(producer.baseBeacons[name])
+    if modules:
+      beacon.modules = [producer.baseModules[m] for m in modules]
+    return beacon
+
+  def _fuel(self, query: dict):
+    """Return the Fuel burned by the burner Producers of a query."""
+    name = query.get('fuel', DEFAULT_FUEL)
+    try:
+      return self.prototypes.fuels[name]
+    except KeyError:
+      raise QueryError(f"'{name}' is not a Fuel") from None
+
+
+def _names(value, what: str) -> Tuple[str, ...]:
+  """Return a list of names from a query, e.g. its modules, as a tuple."""
+  if not value:
+    return ()
+  if (not isinstance(value, list)
+      or not all(isinstance(name, str) for name in value)):
+    raise QueryError(f'{what} must be a list of names')
+  return tuple(value)
+
+def _totals(rates: Iterable[tuple]) -> dict:
+  """Sum (Ingredient, rate) pairs from Producer.rates by product name."""
+  totals = {}
+  for ingredient, rate in rates:
+    name = ingredient.what.name
+    totals[name] = totals.get(name, 0) + rate
+  return totals
+
+def _number(value):
+  """Return a value as a float if it is one, for keys; else unchanged."""
+  try:
+    return float(value)
+  except (TypeError, ValueError):
+    return value
+
+def cacheKey(query: dict) -> str:
+  """Return a key for the answer to a query, as a canonical JSON string.
+
+  Normalizes queries the way QueryEngine keys its results, short of
+  resolving names: the id is left out, defaults are filled in, numbers are
+  compared as floats, and modules and Beacons are taken as multisets. So
+  queries sharing a key have the same answer, except for the order of their
+  modules; see reorderModules. A malformed query is keyed as given.
+  """
+  try:
+    type_ = query.get('type', 'rates')
+    key = {
+      'type': type_,
+      'item': query.get('item'),
+      'rate': _number(query.get('rate', 1.0)),
+      'recipe': query.get('recipe'),
+      'producer': query.get('producer'),
+      'modules': sorted(query.get('modules') or (), key=str),
+      'beacons': sorted(
+        ([spec.get('name', 'Beacon'), _number(spec.get('count', 1)),
+          sorted(spec.get('modules') or (), key=str)]
+         for spec in query.get('beacons') or ()), key=json.dumps),
+      'fuel': query.get('fuel', DEFAULT_FUEL),
+      'expensive': bool(query.get('expensive', False))
+    }
+    if type_ == 'rates':
+      key['yield'] = _number(query.get('yield', DEFAULT_YIELD))
+      if 'machines' in query:
+        # The rate is what is asked for
+        key['rate'] = None
+        key['machines'] = _number(query['machines'])
+  except (AttributeError, TypeError, ValueError):
+    key = {k: v for k, v in query.items() if k != 'id'}
+  return json.dumps(key, sort_keys=True)
+
+def reorderModules(answer: dict, query: dict) -> dict:
+  """Return an answer cached under the key of a query, see cacheKey, with
+  its modules listed in the order that query gave them."""
+  names = query.get('modules')
+  if 'modules' not in answer or not names:
+    return answer
+  modules = [str(producer.baseModules[m]) for m in names]
+  if answer['modules'] == modules:
+    return answer
+  return {**answer, 'modules': modules}
+
+
+# The QueryEngine of a worker process; see answerLines
+_worker: Optional[QueryEngine] = None
+
+def _initWorker(path: Path):
+  global _worker
+  _worker = QueryEngine(snapshot.load(path))
+
+def _answerChunk(lines: List[str]) -> List[Optional[dict]]:
+  return [_worker.answerLine(line) for line in lines]
+
+def answerLines(prototypes: Prototypes, lines: Iterable[str],
+                workers: int=1) -> Iterator[dict]:
+  """Answer queries given as lines of JSON, yielding answers in order.
+
+  Lines are read lazily and each answer is yielded as soon as it and every
+  one before it is ready, so memory use stays flat however many lines there
+  are. Blank lines are skipped. With workers, lines are read by a separate
+  thread and sent on as they arrive, so a pipeline gets its answers without
+  waiting for more input.
+
+  Parameters
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to answer queries from.
+
+  lines: Iterable of str
+      The queries, one JSON object per line, e.g. an open file.
+
+  workers: int, optional
+      The number of worker processes to spread queries across. Workers share
+      one read-only snapshot of the Prototypes, see snapshot.py, rather than
+      each unpickling its own copy. Defaults to one, i.e. answering in this
+      process.
+  """
+  if workers <= 1:
+    engine = QueryEngine(prototypes)
+    for line in lines:
+      answer = engine.answerLine(line)
+      if answer is not None:
+        yield answer
+    return
+
+  # Lines read, None once all are, and chunks as they are answered
+  events = queue.Queue()
+  # Lines read but not yet answered
+  slots = threading.Semaphore(workers * CHUNKS_PER_WORKER * CHUNK_SIZE)
+  failed = []
+
+  def feed():
+    try:
+      for line in lines:
+        slots.acquire()
+        events.put(line)
+    except Exception as e:
+      failed.append(e)
+    finally:
+      events.put(None)
+
+  pending = deque()
+  reading = True
+  with snapshot.temporary(prototypes) as path, \
+       ProcessPoolExecutor(workers, initializer=_initWorker,
+                           initargs=(path,)) as pool:
+    def submit(chunk):
+      future = pool.submit(_answerChunk, chunk)
+      pending.append(future)
+      future.add_done_callback(events.put)
+
+    threading.Thread(target=feed, daemon=True).start()
+    while reading or pending:
+      # Send every line read so far, then wait for more or for an answer
+      chunk = []
+      event = events.get()
+      while True:
+        if event is None:
+          reading = False
+        elif not isinstance(event, Future):
+          chunk.append(event)
+          if len(chunk) == CHUNK_SIZE:
+            submit(chunk)
+            chunk = []
+        if events.empty():
+          break
+        event = events.get_nowait()
+      if chunk:
+        submit(chunk)
+      while pending and pending[0].done():
+        for answer in pending.popleft().result():
+          slots.release()
+          if answer is not None:
+            yield answer
+  if failed:
+    raise failed[0]
+
+def run(prototypes: Prototypes, source: TextIO, sink: TextIO,
+        workers: int=1) -> int:
+  """Answer a stream of JSON Lines queries, writing JSON Lines answers.
+
+  Each answer is written and flushed as soon as it is ready. Returns the
+  number of queries that could not be answered.
+
+  Parameters
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to answer queries from.
+
+  source: TextIO
+      The queries, one JSON object per line.
+
+  sink: TextIO
+      Where to write the answers, one JSON object per line.
+
+  workers: int, optional
+      The number of worker processes; see answerLines.
+  """
+  answered = failed = 0
+  for answer in answerLines(prototypes, source, workers):
+    if 'error' in answer:
+      failed += 1
+    sink.write(json.dumps(answer) + '\n')
+    sink.flush()
+    answered += 1
+  logger.info(f'Answered {answered} queries, {failed} failed')
+  return failed
@@ -0,0 +1,518 @@
+"""server.py
+
+A long-lived calculation service: loads the Prototypes once and answers
+queries, see query.py, over a local socket, so that scripts and interactive
+tools do not pay the load cost on every run.
+
+Clients either speak JSON Lines, sending one query per line and receiving
+one answer per line in the same order, or HTTP/1.1 on the same socket:
+
+  POST /query    A query, or a list of them, as the JSON body.
+  GET  /status   The state of the service; see Server.status.
+  POST /reload   Reload changed prototype definitions right away.
+
+Over JSON Lines, {"type": "status"} and {"type": "reload"} do the same.
+
+Answers are cached by query, normalized as by query.cacheKey, so repeated
+questions are answered on the event loop without solving anything; other
+queries are sent to a pool of worker processes, which share a read-only
+snapshot of the Prototypes, see snapshot.py, and cache results by what they
+depend on, see query.py. The prototype directory is polled for changes.
+Changed definitions are reloaded into a copy of the Prototypes, which is
+swapped in once ready, while queries already in flight finish against the
+old one.
+
+Example
+-------
+$ python main.py --serve --port 8631 &
+$ echo '{"item": "electronic-circuit", "rate": 10}' | nc localhost 8631
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+from http import HTTPStatus
+import json
+import logging
+import multiprocessing
+from pathlib import Path
+import pickle
+import re
+import time
+from typing import List, Optional, Tuple
+
+from factoratio import prototype, snapshot
+from factoratio.cache import ResultCache
+from factoratio.prototype import Prototypes
+from factoratio.query import QueryEngine, cacheKey, reorderModules
+
+logger = logging.getLogger('factoratio')
+
+HOST = '127.0.0.1'
+PORT = 8631
+
+# Answers kept, by query, before the least recently used are dropped
+CACHE_SIZE = 4096
+
+# Seconds between checks of the prototype directory for changes
+WATCH_INTERVAL = 2.0
+
+# The longest query line or HTTP request body accepted, in bytes
+MAX_REQUEST = 1 << 20
+
+# Answers of one JSON Lines connection being computed at once
+MAX_PIPELINED = 64
+
+CONTROL_TYPES = ('status', 'reload')
+
+_REQUEST_LINE = re.compile(rb'^[A-Z]+ \S+ HTTP/1\.[01]\r?\n$')
+
+
+# The QueryEngine of a worker process
+_engine: Optional[QueryEngine] = None
+
+def _initWorker(path: Path, cacheSize: int, ttl: Optional[float]):
+  global _engine
+  _engine = QueryEngine(snapshot.load(path), cacheSize, ttl)
+
+def _answer(query: dict) -> dict:
+  return _engine.answer(query)
+
+def _writeSnapshot(prototypes: Prototypes) -> Tuple[contextlib.ExitStack,
+                                                    Path]:
+  """Write a snapshot of the Prototypes for worker processes to load.
+
+  Returns an ExitStack that removes the snapshot when closed, and its path.
+  """
+  files = contextlib.ExitStack()
+  return files, files.enter_context(snapshot.temporary(prototypes))
+
+def _copy(prototypes: Prototypes) -> Prototypes:
+  """Return a deep copy of the Prototypes, to reload into."""
+  return pickle.loads(pickle.dumps(prototypes, pickle.HIGHEST_PROTOCOL))
+
+def _reloaded(prototypes: Prototypes, snapshotted: bool) -> Tuple[
+    List[str], Optional[Tuple[contextlib.ExitStack, Path]]]:
+  """Reload changed definitions into a copy of the Prototypes, see _copy.
+
+  Returns the changed files, see Prototypes.reload, and, if snapshotted and
+  anything changed, a snapshot of the copy as returned by _writeSnapshot.
+  """
+  changed = prototypes.reload()
+  return changed, (_writeSnapshot(prototypes) if changed and snapshotted
+                   else None)
+
+
+class Server():
+  """Answers queries against Prototypes kept in memory; see the module
+  documentation.
+
+  Attributes
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes currently answered from. Replaced, never changed in
+      place, on a reload.
+
+  generation: int
+      Incremented whenever the Prototypes are replaced.
+
+  workers: int
+      The number of worker processes solving queries. Zero answers them on
+      the event loop, which only suits small prototype sets.
+
+  cacheSize: int
+      The number of answers kept, by this process and by each worker.
+
+  ttl: float
+      Seconds an answer is kept, or None for as long as the Prototypes are
+      not reloaded.
+
+  watch: float
+      Seconds between checks of the prototype directory for changes; zero
+      turns reloading on change off.
+
+  stats: dict of str: int
+      Counts of queries answered, answered from the cache, failed, and of
+      reloads.
+  """
+
+  def __init__(self, prototypes: Prototypes, workers: int=1,
+               cacheSize: int=CACHE_SIZE, watch: float=WATCH_INTERVAL,
+               ttl: float=None):
+    """
+    Parameters
+    ----------
+    prototypes: factoratio.prototype.Prototypes
+        The Prototypes to answer queries from.
+
+    workers: int, optional
+        The number of worker processes. Defaults to one.
+
+    cacheSize: int, optional
+        The number of answers to keep. Defaults to CACHE_SIZE.
+
+    watch: float, optional
+        Seconds between checks for changed definitions. Defaults to
+        WATCH_INTERVAL.
+
+    ttl: float, optional
+        Seconds to keep each answer. Defaults to no limit.
+    """
+    self.prototypes = prototypes
+    self.generation = 0
+    self.workers = workers
+    self.cacheSize = cacheSize
+    self.watch = watch
+    self.ttl = ttl
+    self.stats = {'queries': 0, 'hits': 0, 'errors': 0, 'reloads': 0}
+    self._started = time.monotonic()
+    self._cache = ResultCache(cacheSize, ttl)
+    self._engine = QueryEngine(prototypes, cacheSize, ttl)
+    self._pool = None
+    self._snapshot = None
+    self._snapshotPath = None
+    self._fingerprint = None
+    self._reloadLock = None
+
+  def _startPool(self, written: Tuple[contextlib.ExitStack, Path]=None
+                 ) -> Optional[ProcessPoolExecutor]:
+    """Start a worker pool for the current Prototypes, if using workers.
+
+    The workers load a snapshot of the Prototypes, which is removed once
+    the pool is retired; see _retirePool. Writing it takes a while on large
+    prototype sets, so during a reload it is written beforehand, off the
+    event loop, and passed as written, as returned by _writeSnapshot.
+    """
+    if self.workers < 1:
+      return None
+    if written is None:
+      written = _writeSnapshot(self.prototypes)
+    self._snapshot, self._snapshotPath = written
+    # Forked workers would inherit the sockets of open connections, keeping
+    # them open after they are closed here
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context(
+      'forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(self.workers, mp_context=context,
+                               initializer=_initWorker,
+                               initargs=(self._snapshotPath, self.cacheSize,
+                                         self.ttl))
+
+  def _restartPool(self, broken: ProcessPoolExecutor):
+    """Replace a worker pool that broke, e.g. because a worker died, with a
+    new one loading the same snapshot."""
+    if broken is not self._pool:
+      # Already replaced, or retired by a reload
+      return
+    logger.error('A worker process died; starting a new worker pool')
+    broken.shutdown(wait=False, cancel_futures=True)
+    self._pool = self._startPool((self._snapshot, self._snapshotPath))
+
+  @staticmethod
+  def _retirePool(pool: ProcessPoolExecutor, files: contextlib.ExitStack,
+                  cancel: bool=False):
+    """Wait for a worker pool to finish, then remove its snapshot."""
+    try:
+      pool.shutdown(cancel_futures=cancel)
+    finally:
+      files.close()
+
+  def status(self) -> dict:
+    """Return the state of the service, as a JSON-compatible dict."""
+    return {
+      'generation': self.generation,
+      'uptime': time.monotonic() - self._started,
+      'workers': self.workers,
+      'cached': len(self._cache),
+      **self.stats,
+      'cache': self._cache.stats(),
+      'items': len(self.prototypes.items),
+      'fluids': len(self.prototypes.fluids),
+      'recipes': len(self.prototypes.recipes),
+      'producers': len(self.prototypes.producers)
+    }
+
+  async def answer(self, query: dict) -> dict:
+    """Answer a query, from the cache if it was asked before.
+
+    Besides the queries of query.py, takes 'status' and 'reload' queries.
+    """
+    if isinstance(query, dict) and query.get('type') in CONTROL_TYPES:
+      queryId = query.get('id')
+      if query['type'] == 'status':
+        return {'id': queryId, **self.status()}
+      try:
+        return {'id': queryId, 'changed': await self.reload(force=True)}
+      except Exception as e:
+        logger.exception('Reloading prototypes failed')
+        return {'id': queryId, 'error': f'Reload failed: {e}'}
+
+    self.stats['queries'] += 1
+    if not isinstance(query, dict):
+      answer = self._engine.answer(query)
+      self.stats['errors'] += 1
+      return answer
+    key = cacheKey(query)
+    cached = self._cache.get(key)
+    if cached is not None:
+      self.stats['hits'] += 1
+      return {'id': query.get('id'), **reorderModules(cached, query)}
+
+    generation, pool = self.generation, self._pool
+    try:
+      if pool is None:
+        answer = self._engine.answer(query)
+      else:
+        loop = asyncio.get_running_loop()
+        answer = await loop.run_in_executor(pool, _answer, query)
+    except BrokenProcessPool:
+      self._restartPool(pool)
+      answer = {'id': query.get('id'),
+                'error': 'A worker process died while answering the query'}
+    except Exception as e:
+      # One failed query must not take the connection or its batch down
+      logger.exception('Answering a query failed')
+      answer = {'id': query.get('id'), 'error': f'Internal error: {e!r}'}
+    if 'error' in answer:
+      self.stats['errors'] += 1
+    elif generation == self.generation:
+      # Answers computed from replaced Prototypes are not kept
+      self._cache.put(key, {k: v for k, v in answer.items() if k != 'id'})
+    return answer
+
+  async def answerLine(self, line: bytes) -> dict:
+    """Answer a query given as a line of JSON."""
+    try:
+      query = json.loads(line)
+    except ValueError as e:
+      self.stats['queries'] += 1
+      self.stats['errors'] += 1
+      return {'id': None, 'error': f'Invalid JSON: {e}'}
+    return await self.answer(query)
+
+  async def reload(self, force: bool=False) -> List[str]:
+    """Reload the definition files that changed, and swap the result in.
+
+    Queries keep being answered from the old Prototypes until the new ones
+    are ready. Returns a list of the changed files, relative to the
+    prototype path.
+
+    Parameters
+    ----------
+    force: bool, optional
+        Whether to look at every file even if the fingerprint of the
+        prototype directory is unchanged. Defaults to False.
+    """
+    path = self.prototypes.path
+    if path is None:
+      raise ValueError('Prototypes were not loaded from a prototype path')
+    loop = asyncio.get_running_loop()
+    if self._reloadLock is None:
+      self._reloadLock = asyncio.Lock()
+    async with self._reloadLock:
+      digest = await loop.run_in_executor(None, prototype.fingerprint, path)
+      if digest == self._fingerprint and not force:
+        return []
+      # Recorded up front, so that a broken file is not retried until it
+      # changes again
+      self._fingerprint = digest
+      if self.workers > 0:
+        prototypes = await loop.run_in_executor(None, _copy, self.prototypes)
+      else:
+        # Queries answered on the event loop fill in the compiled form and
+        # cycles of the Prototypes, which must not change while pickled
+        prototypes = _copy(self.prototypes)
+      changed, written = await loop.run_in_executor(
+        None, _reloaded, prototypes, self.workers > 0)
+      if changed:
+        self._swap(prototypes, written)
+    return changed
+
+  def _swap(self, prototypes: Prototypes,
+            written: Tuple[contextlib.ExitStack, Path]=None):
+    """Answer from now on from new Prototypes, with workers loading the
+    snapshot of them written, if given; see _startPool."""
+    old, files = self._pool, self._snapshot
+    self.prototypes = prototypes
+    self._engine = QueryEngine(prototypes, self.cacheSize, self.ttl)
+    self._pool = self._startPool(written)
+    self._cache.clear()
+    self.generation += 1
+    self.stats['reloads'] += 1
+    if old is not None:
+      # Queries already sent to the old workers still get their answers
+      asyncio.get_running_loop().run_in_executor(None, self._retirePool, old,
+                                                 files)
+    logger.info(f'Now serving prototype generation {self.generation}')
+
+  async def _watch(self):
+    """Reload changed definitions every watch seconds."""
+    while True:
+      await asyncio.sleep(self.watch)
+      try:
+        await self.reload()
+      except Exception:
+        logger.exception('Reloading prototypes failed; still serving '
+                         f'generation {self.generation}')
+
+  async def _handle(self, reader: asyncio.StreamReader,
+                    writer: asyncio.StreamWriter):
+    """Serve one connection, in whichever protocol it speaks."""
+    try:
+      line = await reader.readline()
+      if _REQUEST_LINE.match(line):
+        await self._serveHTTP(line, reader, writer)
+      else:
+        await self._serveLines(line, reader, writer)
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError) as e:
+      logger.debug(f'Dropped connection: {e!r}')
+    finally:
+      writer.close()
+      with contextlib.suppress(ConnectionError):
+        await writer.wait_closed()
+
+  async def _serveLines(self, line: bytes, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+    """Answer JSON Lines queries, starting with the given line, until the
+    client closes its end. Queries are answered concurrently, up to
+    MAX_PIPELINED at once, but answers are sent in order."""
+    pending = asyncio.Queue(MAX_PIPELINED)
+
+    async def send():
+      try:
+        while True:
+          task = await pending.get()
+          if task is None:
+            return
+          writer.write(json.dumps(await task).encode() + b'\n')
+          await writer.drain()
+      finally:
+        # Unblock the reading side if the client went away
+        while not pending.empty():
+          task = pending.get_nowait()
+          if task is not None:
+            task.cancel()
+
+    sender = asyncio.create_task(send())
+    try:
+      while line and not sender.done():
+        if line.strip():
+          await pending.put(asyncio.ensure_future(self.answerLine(line)))
+        line = await reader.readline()
+    finally:
+      if not sender.done():
+        await pending.put(None)
+      await sender
+
+  async def _serveHTTP(self, line: bytes, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter):
+    """Answer HTTP requests, starting with the given request line, for as
+    long as the client keeps the connection alive."""
+    while line:
+      method, target, version = line.decode('latin-1').split()
+      headers = {}
+      while True:
+        header = await reader.readline()
+        if header in (b'\r\n', b'\n', b''):
+          break
+        name, _, value = header.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+      connection = headers.get('connection', '').lower()
+      keepAlive = (connection != 'close' if version == 'HTTP/1.1'
+                   else connection == 'keep-alive')
+
+      length = int(headers.get('content-length', 0))
+      if length > MAX_REQUEST:
+        status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {
+          'error': f'Request body over {MAX_REQUEST} bytes'}
+        keepAlive = False
+      else:
+        body = await reader.readexactly(length) if length else b''
+        status, payload = await self._route(method, target.split('?')[0],
+                                            body)
+
+      data = json.dumps(payload).encode()
+      writer.write(
+        f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(data)}\r\n'
+        f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n"
+        '\r\n'.encode('latin-1') + data)
+      await writer.drain()
+      if not keepAlive:
+        return
+      line = await reader.readline()
+
+  async def _route(self, method: str, path: str,
+                   body: bytes) -> Tuple[HTTPStatus, object]:
+    """Handle an HTTP request; return the response status and payload."""
+    routes = {'/query': 'POST', '/status': 'GET', '/reload': 'POST'}
+    if path not in routes:
+      return HTTPStatus.NOT_FOUND, {'error': f'No such endpoint: {path}'}
+    if method != routes[path]:
+      return HTTPStatus.METHOD_NOT_ALLOWED, {
+        'error': f'{path} takes {routes[path]} requests'}
+
+    if path == '/status':
+      return HTTPStatus.OK, self.status()
+    if path == '/reload':
+      try:
+        return HTTPStatus.OK, {'changed': await self.reload(force=True)}
+      except Exception as e:
+        logger.exception('Reloading prototypes failed')
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'Reload failed: {e}'}
+
+    try:
+      query = json.loads(body)
+    except ValueError as e:
+      return HTTPStatus.BAD_REQUEST, {'error': f'Invalid JSON: {e}'}
+    if isinstance(query, list):
+      return HTTPStatus.OK, list(await asyncio.gather(
+        *(self.answer(x) for x in query)))
+    return HTTPStatus.OK, await self.answer(query)
+
+  async def serve(self, host: str=HOST, port: int=PORT, path: Path=None,
+                  started: asyncio.Future=None):
+    """Serve queries until cancelled.
+
+    Parameters
+    ----------
+    host: str, optional
+        The address to listen on. Defaults to HOST, i.e. local connections
+        only.
+
+    port: int, optional
+        The TCP port to listen on. Defaults to PORT.
+
+    path: Path, optional
+        A Unix socket to listen on instead of a TCP port.
+
+    started: asyncio.Future, optional
+        Set to the listening address once the service accepts connections.
+    """
+    if path is not None:
+      server = await asyncio.start_unix_server(self._handle, path,
+                                               limit=MAX_REQUEST)
+      address = str(path)
+    else:
+      server = await asyncio.start_server(self._handle, host, port,
+                                          limit=MAX_REQUEST)
+      address = '{}:{}'.format(*server.sockets[0].getsockname()[:2])
+    self._pool = self._startPool()
+    watcher = None
+    if self.watch > 0 and self.prototypes.path is not None:
+      self._fingerprint = prototype.fingerprint(self.prototypes.path)
+      watcher = asyncio.create_task(self._watch())
+    logger.info(f'Serving queries on {address} with {self.workers} workers')
+    if started is not None:
+      started.set_result(address)
+    try:
+      async with server:
+        await server.serve_forever()
+    finally:
+      if watcher is not None:
+        watcher.cancel()
+      if self._pool is not None:
+        self._retirePool(self._pool, self._snapshot, cancel=True)
@@ -0,0 +1,621 @@
+"""snapshot.py
+
+A compact, read-only binary form of Prototypes, for sharing one copy between
+many worker processes.
+
+A snapshot is a single flat buffer: a short header followed by NumPy arrays.
+Every name and other string is stored once, in a string table, and referred
+to by its index. Recipes are stored as the arrays of CompiledPrototypes, for
+both modes. Products, the group tree, Fuels, Producers, Beacons and Recipe
+cycles are stored as parallel arrays. Nothing in it needs unpickling.
+
+PrototypeView reads a snapshot in place from any buffer, e.g. a memory-mapped
+file or the buf of a multiprocessing.shared_memory.SharedMemory, so that
+every process using it reads the same pages. It answers the same lookups as
+Prototypes, building each Item, Recipe or Producer object only when first
+asked for, so opening a view costs little more than decoding the string
+table.
+
+Snapshots keep only what the definitions say, e.g. no modules in Producers,
+and a view cannot be reloaded; write a new snapshot instead.
+
+Example
+-------
+>>> snapshot.write(path, prototypes)
+>>> # In each worker process
+>>> prototypes = snapshot.load(path)
+>>> solver = Solver(prototypes)
+"""
+
+from collections import abc
+import contextlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+import struct
+import tempfile
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Union
+
+import numpy as np
+
+from factoratio import item
+from factoratio.compiled import CompiledPrototypes
+from factoratio.fuel import Fuel
+from factoratio.producer import (Beacon, BurnerMiningDrill, BurnerProducer,
+                                 MiningDrill, Producer, Pumpjack)
+from factoratio.util import Watt
+
+logger = logging.getLogger('factoratio')
+
+MAGIC = b'FRATSNAP'
+
+# Bumped whenever the layout of snapshots changes
+SNAPSHOT_VERSION = 1
+
+# Arrays start at multiples of this many bytes
+ALIGNMENT = 64
+
+# Producer classes by the kind stored in a snapshot
+PRODUCER_KINDS = (Producer, BurnerProducer, MiningDrill, BurnerMiningDrill,
+                  Pumpjack)
+
+_PREFIX = struct.Struct('<8sII')
+
+# Recipe kinds
+_RECIPE, _PUMPJACK_RECIPE = 0, 1
+
+# Product kinds
+_ITEM, _FLUID = 0, 1
+
+
+def _number(x: float) -> Union[int, float]:
+  """Return a stored amount as an int if it is whole, as loaded."""
+  x = float(x)
+  return int(x) if x.is_integer() else x
+
+
+class _Packer():
+  """Lays out the string table and arrays of a snapshot."""
+
+  def __init__(self):
+    self.strings: Dict[str, int] = {}
+    self.arrays: Dict[str, np.ndarray] = {}
+
+  def string(self, s: Optional[str]) -> int:
+    """Return the index of a string in the string table; -1 for None."""
+    if s is None:
+      return -1
+    index = self.strings.get(s)
+    if index is None:
+      index = self.strings[s] = len(self.strings)
+    return index
+
+  def add(self, name: str, values, dtype):
+    self.arrays[name] = np.asarray(values, dtype=dtype)
+
+  def addStrings(self, name: str, values):
+    self.add(name, [self.string(x) for x in values], np.int32)
+
+  def addCsr(self, name: str, rows: List[List[int]]):
+    ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=ptr[1:])
+    self.add(f'{name}Ptr', ptr, np.int64)
+    self.add(f'{name}Ids', [x for row in rows for x in row], np.int64)
+
+  def pack(self) -> bytes:
+    """Return the snapshot, string table included."""
+    encoded = [s.encode('utf-8') for s in self.strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    self.add('strings.offsets', offsets, np.int64)
+    self.add('strings.data', np.frombuffer(b''.join(encoded), dtype=np.uint8),
+             np.uint8)
+
+    layout, offset = {}, 0
+    for name, array in self.arrays.items():
+      layout[name] = [array.dtype.str, offset, len(array)]
+      offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({'arrays': layout}).encode('utf-8')
+    start = -(-(_PREFIX.size + len(header)) // ALIGNMENT) * ALIGNMENT
+    data = bytearray(start + offset)
+    data[:_PREFIX.size] = _PREFIX.pack(MAGIC, SNAPSHOT_VERSION, len(header))
+    data[_PREFIX.size:_PREFIX.size + len(header)] = header
+    for name, array in self.arrays.items():
+      position = start + layout[name][1]
+      data[position:position + array.nbytes] = array.tobytes()
+    return bytes(data)
+
+
+def pack(prototypes) -> bytes:
+  """Convert Prototypes to a snapshot.
+
+  Parameters
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to convert.
+  """
+  packer = _Packer()
+  products = list(prototypes.products)
+  recipes = list(prototypes.recipes)
+  packer.addStrings('product.name', products)
+  packer.addStrings('recipe.name', recipes)
+
+  groups = list(prototypes.groups.values())
+  groupIndex = {id(group): i for i, group in enumerate(groups)}
+  subgroups = list(prototypes.subgroups.values())
+  subgroupIndex = {id(group): i for i, group in enumerate(subgroups)}
+  packer.addStrings('group.name', [x.name for x in groups])
+  packer.addStrings('group.order', [x.order for x in groups])
+  packer.addStrings('subgroup.name', [x.name for x in subgroups])
+  packer.addStrings('subgroup.order', [x.order for x in subgroups])
+  packer.add('subgroup.parent', [groupIndex.get(id(x.parent), -1)
+                                 for x in subgroups], np.int32)
+
+  kinds, types, orders, parents, temps, heat = [], [], [], [], [], []
+  for name in products:
+    product = prototypes.products[name]
+    orders.append(product.order)
+    if isinstance(product, item.Fluid):
+      kinds.append(_FLUID)
+      types.append('fluid')
+      parents.append(-1)
+      temps.append((np.nan if product.temp_default is None
+                    else product.temp_default,
+                    np.nan if product.temp_max is None else product.temp_max))
+      heat.append(product.heat_capacity.value)
+    else:
+      kinds.append(_ITEM)
+      types.append(product.type)
+      parents.append(subgroupIndex.get(id(product.subgroup), -1))
+      temps.append((np.nan, np.nan))
+      heat.append(np.nan)
+  packer.add('product.kind', kinds, np.uint8)
+  packer.addStrings('product.type', types)
+  packer.addStrings('product.order', orders)
+  packer.add('product.subgroup', parents, np.int32)
+  packer.add('product.temperature', np.reshape(temps, -1), np.float64)
+  packer.add('product.heatCapacity', heat, np.float64)
+
+  packer.addStrings('fuel.name', list(prototypes.fuels))
+  packer.add('fuel.energy', [x.energy.value
+                             for x in prototypes.fuels.values()], np.float64)
+
+  kinds, baseAmounts, hasExpensive = [], [], []
+  for recipe in prototypes.recipes.values():
+    pumpjack = isinstance(recipe, item.PumpjackRecipe)
+    kinds.append(_PUMPJACK_RECIPE if pumpjack else _RECIPE)
+    baseAmounts.append(recipe.baseAmt if pumpjack else np.nan)
+    hasExpensive.append(recipe.expensive() is not None)
+  packer.add('recipe.kind', kinds, np.uint8)
+  packer.add('recipe.baseAmount', baseAmounts, np.float64)
+  packer.add('recipe.hasExpensive', hasExpensive, np.bool_)
+  for mode, expensive in (('normal', False), ('expensive', True)):
+    compiled = prototypes.compiled(expensive)
+    packer.addStrings(f'{mode}.categories', compiled.categories)
+    for name in CompiledPrototypes.ARRAYS:
+      array = getattr(compiled, name)
+      packer.add(f'{mode}.{name}', array,
+                 np.int64 if array.dtype.kind == 'i' else array.dtype)
+    productIndex = compiled.productIndex
+    cycles = {id(x): x for x in prototypes.cycles(expensive).values()}
+    packer.addCsr(f'{mode}.cycles', [[productIndex[name] for name in cycle]
+                                     for cycle in cycles.values()])
+
+  producers = list(prototypes.producers.values())
+  packer.addStrings('producer.name', list(prototypes.producers))
+  packer.add('producer.kind', [PRODUCER_KINDS.index(type(x))
+                               for x in producers], np.uint8)
+  packer.add('producer.craftSpeed', [x.craftSpeed for x in producers],
+             np.float64)
+  packer.add('producer.maxSlots', [x.maxSlots for x in producers], np.int32)
+  packer.add('producer.energyUsage', [x.energyUsage.value
+                                      for x in producers], np.float64)
+  packer.add('producer.drain', [x.drain.value for x in producers],
+             np.float64)
+  packer.add('producer.pollution', [x.pollution for x in producers],
+             np.float64)
+  packer.addCsr('producer.categories', [[packer.string(c) for c in
+                                         sorted(x.categories)]
+                                        for x in producers])
+  packer.addStrings('categories', prototypes.categories)
+
+  beacons = list(prototypes.beacons.values())
+  packer.addStrings('beacon.name', list(prototypes.beacons))
+  packer.add('beacon.maxSlots', [x.maxSlots for x in beacons], np.int32)
+  packer.add('beacon.efficiency', [x.efficiency for x in beacons],
+             np.float64)
+  packer.add('beacon.energyUsage', [x.energyUsage.value
+                                    for x in beacons], np.float64)
+  return packer.pack()
+
+def write(path: Path, prototypes):
+  """Write a snapshot of Prototypes to a file.
+
+  The snapshot is written to a temporary file first and then moved into
+  place, so readers never see a partial snapshot.
+
+  Parameters
+  ----------
+  path: Path
+      The path of the snapshot file.
+
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to write.
+  """
+  data = pack(prototypes)
+  tmpPath = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+  try:
+    tmpPath.write_bytes(data)
+    os.replace(tmpPath, path)
+  except BaseException:
+    tmpPath.unlink(missing_ok=True)
+    raise
+  logger.debug(f"Wrote {len(data)} byte prototype snapshot to '{path}'")
+
+def load(path: Path) -> 'PrototypeView':
+  """Open a snapshot file, memory-mapped read-only.
+
+  Processes opening the same file share its pages.
+
+  Parameters
+  ----------
+  path: Path
+      The path of the snapshot file.
+  """
+  with open(path, 'rb') as f:
+    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  return PrototypeView(buffer)
+
+@contextlib.contextmanager
+def temporary(prototypes) -> Iterator[Path]:
+  """Write a snapshot of Prototypes to a temporary file, for worker
+  processes to load; yields its path and removes it on exit.
+
+  Workers that already opened the file keep reading it after it is removed.
+
+  Parameters
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to write.
+  """
+  fd, name = tempfile.mkstemp(prefix='factoratio-', suffix='.snapshot')
+  path = Path(name)
+  try:
+    with os.fdopen(fd, 'wb') as f:
+      f.write(pack(prototypes))
+    yield path
+  finally:
+    path.unlink(missing_ok=True)
+
+
+class _Strings():
+  """The string table of a snapshot, decoded in one pass."""
+
+  def __init__(self, offsets: np.ndarray, data: np.ndarray):
+    block = data.tobytes()
+    bounds = offsets.tolist()
+    if block.isascii():
+      # Offsets count bytes, which are characters too
+      block = block.decode('ascii')
+      self._strings = [block[start:end]
+                       for start, end in zip(bounds, bounds[1:])]
+    else:
+      self._strings = [block[start:end].decode('utf-8')
+                       for start, end in zip(bounds, bounds[1:])]
+
+  def __getitem__(self, index: int) -> Optional[str]:
+    return self._strings[index] if index >= 0 else None
+
+  def many(self, indexes: np.ndarray) -> List[Optional[str]]:
+    strings = self._strings
+    return [strings[i] if i >= 0 else None for i in indexes.tolist()]
+
+
+class _Table(abc.Mapping):
+  """A read-only mapping of names to prototypes, each built on first access
+  from its position in the snapshot."""
+
+  def __init__(self, names: List[str], make: Callable[[int], object],
+               positions: List[int]=None):
+    self._names = names
+    self._make = make
+    self._positions = positions
+    self._index: Optional[Dict[str, int]] = None
+    self._built = {}
+
+  def __repr__(self):
+    return f'<{self.__class__.__name__} of {len(self._names)} prototypes>'
+
+  def position(self, name: str) -> int:
+    """Return the position of a name in the snapshot; KeyError if absent."""
+    if self._index is None:
+      positions = self._positions or range(len(self._names))
+      self._index = dict(zip(self._names, positions))
+    return self._index[name]
+
+  def __getitem__(self, name: str):
+    try:
+      return self._built[name]
+    except KeyError:
+      pass
+    built = self._built[name] = self._make(self.position(name))
+    return built
+
+  def __contains__(self, name) -> bool:
+    try:
+      self.position(name)
+    except (KeyError, TypeError):
+      return False
+    return True
+
+  def __iter__(self):
+    return iter(self._names)
+
+  def __len__(self) -> int:
+    return len(self._names)
+
+
+class PrototypeView():
+  """Read-only Prototypes backed by a snapshot; see the module documentation.
+
+  Offers the lookups of Prototypes: items, fluids, products, fuels, groups,
+  subgroups, recipes, producers and beacons as read-only mappings, and
+  recipesProducing, recipesConsuming, cycles, producersFor, categories and
+  compiled. Objects are built once per view, on first access.
+
+  Attributes
+  ----------
+  path: None
+      Views are not read from a prototype path, and cannot be reloaded.
+
+  generation: int
+      Always zero, as views never change.
+  """
+
+  path = None
+  generation = 0
+
+  def __init__(self, buffer):
+    """
+    Parameters
+    ----------
+    buffer: bytes-like
+        The snapshot; see pack. Not copied, so it must outlive the view.
+    """
+    self._buffer = buffer
+    magic, version, length = _PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC:
+      raise ValueError('Not a prototype snapshot')
+    if version != SNAPSHOT_VERSION:
+      raise ValueError(f'Prototype snapshot version {version} is not '
+                       f'supported, expected {SNAPSHOT_VERSION}')
+    header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + length]))
+    start = -(-(_PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+    self._arrays = {
+      name: np.frombuffer(buffer, dtype=np.dtype(dtype), count=count,
+                          offset=start + offset)
+      for name, (dtype, offset, count) in header['arrays'].items()
+    }
+    self._strings = _Strings(self._arrays['strings.offsets'],
+                             self._arrays['strings.data'])
+    self._compiled = {}
+    self._cycles = {}
+    self._crafting = None
+    self._groupsBuilt = False
+
+    names = self._names
+    kinds = self._arrays['product.kind']
+    productNames = names('product.name')
+    self.products = _Table(productNames, self._product)
+    itemPositions = np.flatnonzero(kinds == _ITEM).tolist()
+    fluidPositions = np.flatnonzero(kinds == _FLUID).tolist()
+    self.items = _Table([productNames[i] for i in itemPositions],
+                        self._product, itemPositions)
+    self.fluids = _Table([productNames[i] for i in fluidPositions],
+                         self._product, fluidPositions)
+    self.fuels = _Table(names('fuel.name'), self._fuel)
+    self.recipes = _Table(names('recipe.name'), self._recipe)
+    self.producers = _Table(names('producer.name'), self._producer)
+    self.beacons = _Table(names('beacon.name'), self._beacon)
+
+  def __repr__(self):
+    return (f'<{self.__class__.__name__} {len(self.products)} products, '
+            f'{len(self.recipes)} Recipes, {len(self.producers)} Producers>')
+
+  def _names(self, array: str) -> List[Optional[str]]:
+    return self._strings.many(self._arrays[array])
+
+  @property
+  def nbytes(self) -> int:
+    """The size of the snapshot, in bytes."""
+    return len(self._buffer)
+
+  def _product(self, i: int):
+    """Build the Item or Fluid at position i."""
+    arrays, strings = self._arrays, self._strings
+    name = self.products._names[i]
+    order = strings[arrays['product.order'][i]]
+    if arrays['product.kind'][i] == _FLUID:
+      default, maximum = arrays['product.temperature'][2 * i:2 * i + 2]
+      return item.Fluid(
+        name, None if np.isnan(default) else _number(default),
+        None if np.isnan(maximum) else _number(maximum),
+        f"{float(arrays['product.heatCapacity'][i])!r}J", order)
+    self._buildGroups()
+    subgroup = self._subgroupList[arrays['product.subgroup'][i]] \
+               if arrays['product.subgroup'][i] >= 0 else None
+    built = item.Item(name, strings[arrays['product.type'][i]], subgroup,
+                      order)
+    if subgroup is not None:
+      subgroup[name] = built
+    return built
+
+  def _buildGroups(self):
+    """Build the group tree, without the Items in it."""
+    if self._groupsBuilt:
+      return
+    self._groupsBuilt = True
+    arrays, strings = self._arrays, self._strings
+    groups = [item.ItemGroup(strings[name], strings[order])
+              for name, order in zip(arrays['group.name'].tolist(),
+                                     arrays['group.order'].tolist())]
+    subgroups = []
+    for name, order, parent in zip(arrays['subgroup.name'].tolist(),
+                                   arrays['subgroup.order'].tolist(),
+                                   arrays['subgroup.parent'].tolist()):
+      parent = groups[parent] if parent >= 0 else None
+      subgroup = item.ItemGroup(strings[name], strings[order], parent)
+      if parent is not None:
+        parent[subgroup.name] = subgroup
+      subgroups.append(subgroup)
+    self._groupList, self._subgroupList = groups, subgroups
+
+  @property
+  def groups(self) -> Dict[str, item.ItemGroup]:
+    """The top-level ItemGroups, with every Item built into the tree."""
+    self._buildItems()
+    return {group.name: group for group in self._groupList}
+
+  @property
+  def subgroups(self) -> Dict[str, item.ItemGroup]:
+    """The Item subgroups, with every Item built into the tree."""
+    self._buildItems()
+    return {group.name: group for group in self._subgroupList}
+
+  def _buildItems(self):
+    """Build every Item, completing the group tree."""
+    self._buildGroups()
+    for name in self.items:
+      self.items[name]
+
+  def _fuel(self, i: int) -> Fuel:
+    return Fuel(self.fuels._names[i],
+                f"{float(self._arrays['fuel.energy'][i])!r}J")
+
+  def _variant(self, i: int, expensive: bool) -> item.Recipe:
+    """Build the normal or Expensive Mode variant of the Recipe at i."""
+    compiled = self.compiled(expensive)
+    products = self.products
+    names = compiled.products
+    inputs = [item.Ingredient(products[names[x]], _number(amount))
+              for x, amount in zip(*(a.tolist() for a in compiled.inputs(i)))]
+    start, end = compiled.outputPtr[i], compiled.outputPtr[i + 1]
+    outputs = [item.Ingredient(products[names[x]], _number(amount),
+                               _number(probability))
+               for x, amount, probability in zip(
+                 compiled.outputIds[start:end].tolist(),
+                 compiled.outputAmounts[start:end].tolist(),
+                 compiled.outputProbabilities[start:end].tolist())]
+    time = _number(compiled.time[i])
+    if self._arrays['recipe.kind'][i] == _PUMPJACK_RECIPE:
+      return item.PumpjackRecipe(
+        time, outputs[0], _number(self._arrays['recipe.baseAmount'][i]))
+    return item.Recipe(time, inputs, outputs,
+                       compiled.categories[compiled.category[i]])
+
+  def _recipe(self, i: int) -> item.Recipe:
+    recipe = self._variant(i, False)
+    if self._arrays['recipe.hasExpensive'][i]:
+      recipe.addExpensiveMode(self._variant(i, True))
+    return recipe
+
+  def _producer(self, i: int) -> Producer:
+    arrays = self._arrays
+    start, end = arrays['producer.categoriesPtr'][i:i + 2]
+    categories = self._strings.many(
+      arrays['producer.categoriesIds'][start:end])
+    cls = PRODUCER_KINDS[arrays['producer.kind'][i]]
+    return cls(self.producers._names[i],
+               _number(arrays['producer.craftSpeed'][i]),
+               int(arrays['producer.maxSlots'][i]),
+               Watt(float(arrays['producer.energyUsage'][i])),
+               Watt(float(arrays['producer.drain'][i])),
+               _number(arrays['producer.pollution'][i]), categories)
+
+  def _beacon(self, i: int) -> Beacon:
+    arrays = self._arrays
+    return Beacon(self.beacons._names[i], int(arrays['beacon.maxSlots'][i]),
+                  _number(arrays['beacon.efficiency'][i]),
+                  Watt(float(arrays['beacon.energyUsage'][i])))
+
+  def compiled(self, expensive: bool=False) -> CompiledPrototypes:
+    """Return the array-backed form of the Recipes, reading the arrays of
+    the snapshot in place; see Prototypes.compiled."""
+    compiled = self._compiled.get(expensive)
+    if compiled is None:
+      mode = 'expensive' if expensive else 'normal'
+      compiled = self._compiled[expensive] = CompiledPrototypes.fromArrays(
+        self.products._names, self.recipes._names,
+        self._names(f'{mode}.categories'),
+        {name: self._arrays[f'{mode}.{name}']
+         for name in CompiledPrototypes.ARRAYS},
+        expensive)
+    return compiled
+
+  def _lookup(self, ids: Callable[[int], np.ndarray], name: str,
+              expensive: bool) -> Dict[str, item.Recipe]:
+    compiled = self.compiled(expensive)
+    product = compiled.productIndex.get(name)
+    if product is None:
+      return {}
+    result = {}
+    for r in ids(compiled, product).tolist():
+      recipeName = compiled.recipes[r]
+      recipe = self.recipes[recipeName]
+      result[recipeName] = (recipe.expensive() or recipe) if expensive \
+                           else recipe
+    return result
+
+  def recipesProducing(self, name: str,
+                       expensive: bool=False) -> Dict[str, item.Recipe]:
+    """Return the Recipes that have the named Item or Fluid as output; see
+    Prototypes.recipesProducing."""
+    return self._lookup(CompiledPrototypes.producing, name, expensive)
+
+  def recipesConsuming(self, name: str,
+                       expensive: bool=False) -> Dict[str, item.Recipe]:
+    """Return the Recipes that have the named Item or Fluid as input; see
+    Prototypes.recipesConsuming."""
+    return self._lookup(CompiledPrototypes.consuming, name, expensive)
+
+  def cycles(self, expensive: bool=False) -> Dict[str, FrozenSet[str]]:
+    """Return the products that take part in Recipe cycles; see
+    Prototypes.cycles."""
+    cycles = self._cycles.get(expensive)
+    if cycles is None:
+      mode = 'expensive' if expensive else 'normal'
+      ptr = self._arrays[f'{mode}.cyclesPtr'].tolist()
+      ids = self._arrays[f'{mode}.cyclesIds']
+      names = self.products._names
+      cycles = {}
+      for start, end in zip(ptr, ptr[1:]):
+        members = frozenset(names[x] for x in ids[start:end].tolist())
+        cycles.update(dict.fromkeys(members, members))
+      self._cycles[expensive] = cycles
+    return cycles
+
+  def producersFor(self, category: str) -> Dict[str, Producer]:
+    """Return the Producers that can craft Recipes of a crafting category;
+    see Prototypes.producersFor."""
+    if self._crafting is None:
+      arrays = self._arrays
+      ptr = arrays['producer.categoriesPtr'].tolist()
+      ids = arrays['producer.categoriesIds']
+      crafting = {}
+      for name, start, end in zip(self.producers._names, ptr, ptr[1:]):
+        for c in self._strings.many(ids[start:end]):
+          crafting.setdefault(c, []).append(name)
+      self._crafting = crafting
+    return {name: self.producers[name]
+            for name in self._crafting.get(category, ())}
+
+  @property
+  def categories(self) -> List[str]:
+    """The crafting categories that some Producer can craft."""
+    return self._names('categories')
+
+  def sourceOf(self, kind: str, name: str) -> None:
+    """Views do not know definition files; always returns None."""
+    return None
@@ -0,0 +1,625 @@
+"""solver.py
+
+Production chain solving: given a target product and rate, works out the
+Recipes, Producers and machine counts needed to make it, all the way down to
+raw resources.
+"""
+
+from dataclasses import dataclass, field
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from factoratio import producer, util
+from factoratio.compiled import CompiledPrototypes
+from factoratio.item import Recipe
+from factoratio.producer import Producer, energyArray
+from factoratio.prototype import Prototypes
+
+logger = logging.getLogger('factoratio')
+
+# Crafting category -> key into producer.base; the Producers used when none
+# were loaded from the Prototypes
+CATEGORIES = {
+  'crafting': 'Assembler2',
+  'advanced-crafting': 'Assembler2',
+  'crafting-with-fluid': 'Assembler2',
+  'smelting': 'SteelFurance',
+  'chemistry': 'ChemPlant',
+  'oil-processing': 'OilRefinery',
+  'centrifuging': 'Centrifuge',
+  'rocket-building': 'RocketSilo',
+  'basic-solid': 'ElecDrill',
+  'basic-fluid': 'Pumpjack'
+}
+
+# Crafting category -> name of the entity preferred among the Producers
+# loaded from the Prototypes; other categories, or those where it is
+# missing, use the first Producer loaded that can craft them
+ENTITIES = {
+  'crafting': 'assembling-machine-2',
+  'advanced-crafting': 'assembling-machine-2',
+  'crafting-with-fluid': 'assembling-machine-2',
+  'smelting': 'steel-furnace',
+  'chemistry': 'chemical-plant',
+  'oil-processing': 'oil-refinery',
+  'centrifuging': 'centrifuge',
+  'rocket-building': 'rocket-silo',
+  'basic-solid': 'electric-mining-drill',
+  'basic-fluid': 'pumpjack'
+}
+
+# Products that are treated as inputs to the chain by default, rather than
+# being solved for.
+RAW = ('iron-ore', 'copper-ore', 'stone', 'coal', 'uranium-ore', 'wood',
+       'crude-oil', 'water')
+
+# Rates smaller than this are considered zero.
+EPSILON = 1e-9
+
+def configKey(producer: Producer) -> tuple:
+  """Return a hashable key describing a Producer's current configuration.
+
+  Two Producers with equal keys yield identical rates for any Recipe.
+  """
+  return producer.name, producer.craftSpeed, producer.effects
+
+
+@dataclass
+class Step():
+  """How one product of a chain is made, scaled to one unit per second.
+
+  Attributes
+  ----------
+  item: str
+      The name of the product.
+
+  recipe: str
+      The name of the Recipe making the product, or None for raw resources.
+
+  producer: factoratio.producer.Producer
+      The Producer crafting the Recipe, or None for raw resources.
+
+  machines: float
+      The number of Producers needed for one unit per second.
+
+  inputs: list of (str, float) tuples
+      The ingredients consumed for one unit per second, by name.
+
+  byproducts: list of (str, float) tuples
+      Any other products of the Recipe made alongside one unit per second.
+
+  cycle: list of (str, float) tuples
+      For a product in a Recipe cycle, the number of Producers needed for one
+      unit per second by the other Recipes of the cycle, by Recipe name.
+      Inputs and byproducts then cover the whole cycle.
+  """
+
+  item: str
+  recipe: Optional[str] = None
+  producer: Optional[Producer] = None
+  machines: float = 0.0
+  inputs: List[Tuple[str, float]] = field(default_factory=list)
+  byproducts: List[Tuple[str, float]] = field(default_factory=list)
+  cycle: List[Tuple[str, float]] = field(default_factory=list)
+
+
+class ChainNode():
+  """A node in the tree of a solved production chain.
+
+  Children are created when accessed, so walking the tree only costs as much
+  as the part of it that is actually visited; shared intermediates appear
+  once per use, each with its share of the rate.
+
+  Attributes
+  ----------
+  item: str
+      The name of the product.
+
+  rate: float
+      The rate the product is needed at, in units per second.
+
+  recipe: str
+      The name of the Recipe making the product, or None for raw resources.
+
+  producer: factoratio.producer.Producer
+      The Producer crafting the Recipe, or None for raw resources.
+
+  machines: float
+      The number of Producers needed to meet the rate.
+  """
+
+  def __init__(self, step: Step, rate: float, steps: Dict[str, Step]):
+    self._step = step
+    self._steps = steps
+    self.item = step.item
+    self.rate = rate
+    self.recipe = step.recipe
+    self.producer = step.producer
+    self.machines = step.machines * rate
+
+  def __repr__(self):
+    return (f'{self.__class__.__name__}({self.item!r}, {self.rate!r}, '
+            f'{self.recipe!r}, {self.machines!r})')
+
+  @property
+  def inputs(self) -> List['ChainNode']:
+    """The nodes for the ingredients of this node's Recipe."""
+    return [ChainNode(self._steps[name], amount * self.rate, self._steps)
+            for name, amount in self._step.inputs]
+
+  @property
+  def byproducts(self) -> Dict[str, float]:
+    """The other products of this node's Recipe, in units per second."""
+    return {name: amount * self.rate for name, amount in self._step.byproducts}
+
+  @property
+  def cycle(self) -> Dict[str, float]:
+    """The number of Producers needed by the other Recipes of this node's
+    Recipe cycle, if any, by Recipe name."""
+    return {name: amount * self.rate for name, amount in self._step.cycle}
+
+
+@dataclass
+class Chain():
+  """A solved production chain.
+
+  Attributes
+  ----------
+  item: str
+      The name of the target product.
+
+  rate: float
+      The target rate, in units per second.
+
+  flows: dict of str: float
+      The total rate of every product in the chain, target and raw resources
+      included.
+
+  machines: dict of str: float
+      The number of Producers needed for each Recipe in the chain.
+
+  raw: dict of str: float
+      The rate at which each raw resource is drawn.
+
+  byproducts: dict of str: float
+      The rate at which products not consumed by the chain are made.
+
+  steps: dict of str: Step
+      The Step making each product, scaled to one unit per second.
+
+  producers: dict of str: factoratio.producer.Producer
+      The Producer crafting each Recipe in the chain.
+  """
+
+  item: str
+  rate: float
+  flows: Dict[str, float]
+  machines: Dict[str, float]
+  raw: Dict[str, float]
+  byproducts: Dict[str, float]
+  steps: Dict[str, Step] = field(repr=False)
+  producers: Dict[str, Producer] = field(default_factory=dict, repr=False)
+
+  @property
+  def energy(self) -> util.WattArray:
+    """The power drawn by the Producers of each Recipe, in the order of
+    machines. Its sum is the power drawn by the whole chain."""
+    return energyArray([self.producers[name] for name in self.machines],
+                       list(self.machines.values()))
+
+  @property
+  def root(self) -> ChainNode:
+    """The root of the full tree of the chain."""
+    return ChainNode(self.steps[self.item], self.rate, self.steps)
+
+
+class Solver():
+  """Solves production chains from a set of Prototypes.
+
+  Each product is made by a single Recipe, chosen from the Recipes producing
+  it: one named in the preferences, else one named after the product, else
+  the first that does not consume the product itself. The Producer crafting a
+  Recipe is chosen by its crafting category.
+
+  Chosen Recipes may form cycles, e.g. Kovarex enrichment consuming the
+  uranium-235 it makes. Each cycle is solved in closed form, by inverting the
+  matrix of the net output of its Recipes, and then behaves as a single step
+  of the chain. Cycles are only looked for among the products that
+  Prototypes.cycles reports.
+
+  Steps are computed once per product and Producer configuration, and the
+  order to walk a chain in once per target, so shared intermediates and
+  repeated queries cost little. Changing the modules of a
+  Producer is picked up on the next solve.
+
+  Attributes
+  ----------
+  prototypes: factoratio.prototype.Prototypes
+      The Prototypes to take Recipes from.
+
+  producers: dict of str: factoratio.producer.Producer
+      The Producer used for each crafting category.
+
+  raw: set of str
+      The names of products treated as raw resources. Products without any
+      Recipe are always raw.
+
+  expensive: bool
+      Whether to use Expensive Mode Recipes.
+  """
+
+  def __init__(self, prototypes: Prototypes,
+               producers: Dict[str, Producer]=None,
+               recipes: Dict[str, str]=None, raw: Iterable[str]=RAW,
+               expensive: bool=False):
+    """
+    Parameters
+    ----------
+    prototypes: factoratio.prototype.Prototypes
+        The Prototypes to take Recipes from.
+
+    producers: dict of str: factoratio.producer.Producer, optional
+        Producers to use for crafting categories, overriding the defaults:
+        the Producers loaded from the Prototypes, see ENTITIES, or if none
+        were loaded, those of producer.base named in CATEGORIES.
+
+    recipes: dict of str: str, optional
+        The name of the Recipe to use for a product, by product name.
+
+    raw: Iterable of str, optional
+        The names of products to treat as raw resources. Defaults to RAW.
+
+    expensive: bool, optional
+        Whether to use Expensive Mode Recipes. Defaults to False.
+    """
+    self.prototypes = prototypes
+    if prototypes.categories:
+      self.producers = {}
+      for category in prototypes.categories:
+        loaded = prototypes.producersFor(category)
+        name = ENTITIES.get(category)
+        self.producers[category] = (loaded[name] if name in loaded
+                                    else next(iter(loaded.values())))
+    else:
+      self.producers = {category: producer.base[name]
+                        for category, name in CATEGORIES.items()}
+    self.producers.update(producers or {})
+    self.raw = set(raw)
+    self.expensive = expensive
+    self._preferred = dict(recipes or {})
+    self._choices = {}
+    self._steps = {}
+    self._orders = {}
+    self._loops = {}
+
+  def clear(self):
+    """Forget all memoized Recipe choices, Steps and chain orders.
+
+    Needed after the Prototypes change, e.g. on a reload.
+    """
+    self._choices.clear()
+    self._steps.clear()
+    self._orders.clear()
+    self._loops.clear()
+
+  def preferred(self, itemName: str) -> Optional[str]:
+    """Return the name of the Recipe set to make a product, if any."""
+    return self._preferred.get(itemName)
+
+  def prefer(self, itemName: str, recipeName: Optional[str]):
+    """Set the Recipe used to make a product.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the product.
+
+    recipeName: str
+        The name of the Recipe, or None to go back to the default choice.
+    """
+    if recipeName is None:
+      self._preferred.pop(itemName, None)
+    else:
+      self._preferred[itemName] = recipeName
+    self.clear()
+
+  def recipeFor(self, itemName: str) -> Tuple[Optional[str], Optional[Recipe]]:
+    """Return the name and Recipe used to make a product.
+
+    Returns (None, None) if the product is a raw resource.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the product.
+    """
+    try:
+      return self._choices[itemName]
+    except KeyError:
+      pass
+    choice = None, None
+    compiled = self.compiled
+    product = compiled.productIndex.get(itemName)
+    if itemName not in self.raw and product is not None:
+      candidates = compiled.producing(product).tolist()
+      recipeIndex = compiled.recipeIndex
+      name = self._preferred.get(itemName)
+      if name is not None:
+        if recipeIndex.get(name) not in candidates:
+          raise ValueError(f"Recipe '{name}' does not produce '{itemName}'")
+      elif recipeIndex.get(itemName) in candidates:
+        name = itemName
+      elif candidates:
+        r = next((r for r in candidates
+                  if product not in compiled.inputs(r)[0]), candidates[0])
+        name = compiled.recipes[r]
+      if name is not None:
+        choice = name, self._recipe(name)
+    self._choices[itemName] = choice
+    return choice
+
+  def _recipe(self, name: str) -> Recipe:
+    """Return the named Recipe, in the Solver's mode."""
+    recipe = self.prototypes.recipes[name]
+    return (recipe.expensive() or recipe) if self.expensive else recipe
+
+  @property
+  def compiled(self) -> CompiledPrototypes:
+    """The compiled form of the Prototypes, in the Solver's mode."""
+    return self.prototypes.compiled(self.expensive)
+
+  def producerFor(self, recipe: Recipe) -> Producer:
+    """Return the Producer used to craft a Recipe."""
+    try:
+      return self.producers[recipe.category]
+    except KeyError:
+      raise ValueError(f"No Producer for crafting category '{recipe.category}'")
+
+  def loopOf(self, itemName: str) -> Optional[FrozenSet[str]]:
+    """Return the products in the same cycle of chosen Recipes as a product.
+
+    Returns None if the product is not in a cycle.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the product.
+    """
+    try:
+      return self._loops[itemName]
+    except KeyError:
+      pass
+    component = self.prototypes.cycles(self.expensive).get(itemName)
+    if component is None:
+      self._loops[itemName] = None
+      return None
+
+    # Only the chosen Recipes count, so a cycle of the full Recipe graph may
+    # break up or vanish
+    compiled = self.compiled
+    def ingredients(name):
+      recipeName = self.recipeFor(name)[0]
+      if recipeName is None:
+        return ()
+      ids = compiled.inputs(compiled.recipeIndex[recipeName])[0].tolist()
+      return [compiled.products[i] for i in ids
+              if compiled.products[i] in component]
+
+    for members in util.stronglyConnected(component, ingredients):
+      loop = None
+      if len(members) > 1 or members[0] in ingredients(members[0]):
+        loop = frozenset(members)
+      self._loops.update(dict.fromkeys(members, loop))
+    return self._loops[itemName]
+
+  def configuration(self) -> tuple:
+    """Return a hashable key describing the current Producer of every
+    crafting category; see configKey."""
+    return tuple((category, configKey(machine))
+                 for category, machine in self.producers.items())
+
+  def _table(self) -> Dict[str, Step]:
+    """Return the memoized Steps for the current Producer configuration."""
+    key = self.configuration()
+    table = self._steps.get(key)
+    if table is None:
+      table = self._steps[key] = {}
+    return table
+
+  def step(self, itemName: str, table: Dict[str, Step]=None) -> Step:
+    """Return the Step making a product, scaled to one unit per second.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the product.
+
+    table: dict of str: Step, optional
+        The memoized Steps for the current Producer configuration, if
+        already looked up.
+    """
+    if table is None:
+      table = self._table()
+    try:
+      return table[itemName]
+    except KeyError:
+      pass
+
+    loop = self.loopOf(itemName)
+    if loop is not None:
+      self._loopSteps(loop, table)
+      return table[itemName]
+
+    name, recipe = self.recipeFor(itemName)
+    if recipe is None:
+      step = Step(itemName)
+    else:
+      compiled = self.compiled
+      products = compiled.products
+      r = compiled.recipeIndex[name]
+      product = compiled.productIndex[itemName]
+      machine = self.producerFor(recipe)
+      productivity = machine.productivityMultiplier()
+      ids, amounts = (x.tolist() for x in compiled.outputs(r))
+      made = sum(amount for i, amount in zip(ids, amounts)
+                 if i == product) * productivity
+      crafts = 1 / made # Crafts per second for one unit per second
+      byproducts = {}
+      for i, amount in zip(ids, amounts):
+        if i != product:
+          byproducts[products[i]] = (byproducts.get(products[i], 0)
+                                     + amount * productivity * crafts)
+      inputs = {}
+      for i, amount in zip(*(x.tolist() for x in compiled.inputs(r))):
+        inputs[products[i]] = inputs.get(products[i], 0) + amount * crafts
+      step = Step(itemName, name, machine,
+                  machine.craft(recipe)['duration'] * crafts,
+                  list(inputs.items()), list(byproducts.items()))
+    table[itemName] = step
+    return step
+
+  def _loopSteps(self, loop: FrozenSet[str], table: Dict[str, Step]):
+    """Add the Steps of every product in a Recipe cycle to table."""
+    compiled = self.compiled
+    members = sorted(loop)
+    index = {compiled.productIndex[name]: i for i, name in enumerate(members)}
+    chosen = [self.recipeFor(name) for name in members]
+    producers = [self.producerFor(recipe) for _, recipe in chosen]
+    n = len(members)
+    # Net output per craft of each Recipe, for products in the cycle and for
+    # everything else
+    net = np.zeros((n, n))
+    external = {}
+    for j, ((name, _), machine) in enumerate(zip(chosen, producers)):
+      r = compiled.recipeIndex[name]
+      productivity = machine.productivityMultiplier()
+      for (ids, amounts), scale in ((compiled.inputs(r), -1.0),
+                                    (compiled.outputs(r), productivity)):
+        for product, amount in zip(ids.tolist(), (amounts * scale).tolist()):
+          i = index.get(product)
+          if i is not None:
+            net[i, j] += amount
+          else:
+            external.setdefault(compiled.products[product],
+                                np.zeros(n))[j] += amount
+    try:
+      # Column k: crafts per second of each Recipe for one unit per second of
+      # product k
+      crafts = np.linalg.inv(net)
+    except np.linalg.LinAlgError:
+      raise ValueError('Cannot solve the Recipe cycle through '
+                       + ', '.join(f"'{name}'" for name in members))
+    if (crafts < -EPSILON).any():
+      raise ValueError('The Recipe cycle through '
+                       + ', '.join(f"'{name}'" for name in members)
+                       + ' consumes more than it makes')
+    durations = np.array([machine.craft(recipe)['duration']
+                          for (_, recipe), machine in zip(chosen, producers)])
+    for k, itemName in enumerate(members):
+      machines = crafts[:, k] * durations
+      flows = {name: float(amounts @ crafts[:, k])
+               for name, amounts in external.items()}
+      table[itemName] = Step(
+        itemName, chosen[k][0], producers[k], float(machines[k]),
+        [(name, -rate) for name, rate in flows.items() if rate < -EPSILON],
+        [(name, rate) for name, rate in flows.items() if rate > EPSILON],
+        [(chosen[j][0], float(machines[j])) for j in range(n)
+         if j != k and machines[j] > EPSILON])
+    logger.debug('Solved Recipe cycle through '
+                 + ', '.join(f"'{name}'" for name in members))
+
+  def order(self, itemName: str, table: Dict[str, Step]=None) -> List[str]:
+    """Return every product in the chain of a product, users first.
+
+    Each product comes before all of its ingredients, so rates can be pushed
+    down the chain in a single pass.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the target product.
+
+    table: dict of str: Step, optional
+        See step.
+
+    Raises
+    ------
+    ValueError
+        If the chain contains a cycle.
+    """
+    try:
+      return self._orders[itemName]
+    except KeyError:
+      pass
+    if table is None:
+      table = self._table()
+    step = self.step
+    # Iterative depth-first search; deep chains would otherwise hit the
+    # recursion limit
+    postorder = []
+    state = {itemName: False} # False while on the stack, True when done
+    stack = [(itemName, iter(step(itemName, table).inputs))]
+    while stack:
+      name, children = stack[-1]
+      for child, _ in children:
+        done = state.get(child)
+        if done is None:
+          state[child] = False
+          stack.append((child, iter(step(child, table).inputs)))
+          break
+        elif not done:
+          raise ValueError(f"Recipe cycle through '{child}' in the chain "
+                           f"of '{itemName}'")
+      else:
+        stack.pop()
+        state[name] = True
+        postorder.append(name)
+    postorder.reverse()
+    self._orders[itemName] = postorder
+    return postorder
+
+  def solve(self, itemName: str, rate: float=1.0) -> Chain:
+    """Solve the production chain of a product.
+
+    Parameters
+    ----------
+    itemName: str
+        The name of the target product.
+
+    rate: float, optional
+        The target rate, in units per second. Defaults to one.
+
+    Raises
+    ------
+    ValueError
+        If a Recipe cycle in the chain cannot be solved, or a Recipe in it
+        has a crafting category without a Producer.
+    """
+    table = self._table()
+    order = self.order(itemName, table)
+    steps = {name: self.step(name, table) for name in order}
+    flows = dict.fromkeys(order, 0.0)
+    flows[itemName] = rate
+    machines, raw, byproducts, producers = {}, {}, {}, {}
+    for name in order:
+      step, amount = steps[name], flows[name]
+      if step.recipe is None:
+        raw[name] = amount
+        continue
+      machines[step.recipe] = machines.get(step.recipe, 0) + step.machines * amount
+      producers[step.recipe] = step.producer
+      if step.cycle:
+        for recipe, perUnit in step.cycle:
+          machines[recipe] = machines.get(recipe, 0) + perUnit * amount
+          if recipe not in producers:
+            producers[recipe] = self.producerFor(self._recipe(recipe))
+      for child, perUnit in step.inputs:
+        flows[child] += perUnit * amount
+      for other, perUnit in step.byproducts:
+        byproducts[other] = byproducts.get(other, 0) + perUnit * amount
+    logger.debug(f"Solved chain of '{itemName}' at {rate}/s: {len(order)} "
+                 f"products, {len(machines)} recipes")
+    return Chain(itemName, rate, flows, machines, raw, byproducts, steps,
+                 producers)
@@ -8,7 +8,9 @@ import logging
 import math
 from pathlib import Path
 import sys
-from typing import Union
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
 from xdgappdirs import user_config_dir
 
 from factoratio import APPNAME
@@ -98,6 +100,132 @@ def getFactorioPath():
     logger.warning('Could not find a stand-alone installation!')
     return None
 
+def stronglyConnected(nodes: Iterable[Hashable],
+                      successors: Callable[[Hashable], Iterable[Hashable]]
+                      ) -> List[List[Hashable]]:
+  """Return the strongly connected components of a directed graph.
+
+  Uses Tarjan's algorithm, iteratively so that deep graphs don't hit the
+  recursion limit. Components are returned in reverse topological order:
+  every component comes after all components reachable from it.
+
+  Parameters
+  ----------
+  nodes: Iterable
+      The nodes to start searching from. Nodes reachable from them are
+      included as well.
+
+  successors: Callable
+      Returns the nodes that a node has an edge to.
+  """
+  index, lowlink = {}, {}
+  onStack = set()
+  stack, components = [], []
+  for root in nodes:
+    if root in index:
+      continue
+    index[root] = lowlink[root] = len(index)
+    stack.append(root)
+    onStack.add(root)
+    work = [(root, iter(successors(root)))]
+    while work:
+      node, children = work[-1]
+      for child in children:
+        if child not in index:
+          index[child] = lowlink[child] = len(index)
+          stack.append(child)
+          onStack.add(child)
+          work.append((child, iter(successors(child))))
+          break
+        elif child in onStack:
+          lowlink[node] = min(lowlink[node], index[child])
+      else:
+        work.pop()
+        if work:
+          parent = work[-1][0]
+          lowlink[parent] = min(lowlink[parent], lowlink[node])
+        if lowlink[node] == index[node]:
+          component = []
+          while True:
+            member = stack.pop()
+            onStack.discard(member)
+            component.append(member)
+            if member == node:
+              break
+          components.append(component)
+  return components
+
+
+# Maximum number of distinct unit strings remembered by parseUnits
+PARSE_CACHE_SIZE = 4096
+
+_SUFFIXES = {'k': 1e3, 'm': 1e6, 'g': 1e9, 't': 1e12}
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parseUnits(units: str, baseSymbol: str) -> Tuple[float, Optional[str]]:
+  """Parse a quantity string such as '150kW' or '4MJ'.
+
+  Returns the value in the base unit and the SI suffix used, if any. Results
+  are cached, since prototype definitions repeat the same few strings many
+  times; the cache is bounded and safe to use from several threads.
+
+  Parameters
+  ----------
+  units: str
+      A real number or integer, optionally followed by an SI suffix and the
+      base unit symbol, case-insensitively.
+
+  baseSymbol: str
+      Short string representing the base unit, e.g. 'W' for Watts.
+  """
+  if units and units[-1].casefold() == baseSymbol.casefold():
+    units = units[:-1]
+  try:
+    suffix = units[-1].casefold()
+  except IndexError:
+    raise ValueError('units string cannot be empty')
+  try:
+    scalar = float(units[:-1]) if suffix.isalpha() else float(units)
+  except ValueError:
+    raise ValueError('units string must contain a valid number')
+  if not suffix.isalpha():
+    return scalar, None
+  if suffix not in _SUFFIXES:
+    raise ValueError(f"Invalid suffix: '{suffix}'")
+  return scalar * _SUFFIXES[suffix], suffix
+
+def parseUnitsMany(units: Iterable[str], baseSymbol: str) -> np.ndarray:
+  """Parse many quantity strings at once; see parseUnits.
+
+  Returns an array of the values in the base unit. Each distinct string is
+  parsed once.
+
+  Parameters
+  ----------
+  units: Iterable of str
+      The quantity strings.
+
+  baseSymbol: str
+      Short string representing the base unit.
+  """
+  units = list(units)
+  values = {x: parseUnits(x, baseSymbol)[0] for x in dict.fromkeys(units)}
+  return np.fromiter(map(values.__getitem__, units), dtype=float,
+                     count=len(units))
+
+def _siFormat(value: float, baseSymbol: str) -> str:
+  """Format a quantity with an SI suffix; see SINumber.__str__."""
+  # Adapted from https://stackoverflow.com/a/29749228/1208424
+  if value == 0:
+    return f'0{baseSymbol}'
+
+  # Limit to TW
+  power = min(12, math.floor(math.log10(abs(value))))
+  d, m = divmod(power, 3)
+  reduced = value * 10**(m - power)
+
+  return f"{reduced:.4} {' kMGT'[d] if d > 0 else ''}{baseSymbol}"
+
 
 class SINumber():
   """A class representing an arbitrary unit number supporting SI suffixes.
@@ -118,7 +246,9 @@ class SINumber():
       The SI suffix originally used to specify the magnitude of the unit.
   """
 
-  _suffixTable = {'k': 1e3, 'm': 1e6, 'g': 1e9, 't': 1e12}
+  __slots__ = ('value', 'baseSymbol', 'origSuffix')
+
+  _suffixTable = _SUFFIXES
 
   def _unitOrNumber(func):
     """Internal decorator for implementing special methods.
@@ -139,40 +269,27 @@ class SINumber():
   def __init__(self, units: Union[str, int, float], baseSymbol: str):
     self.baseSymbol = baseSymbol
     if isinstance(units, str):
-      if units[-1].casefold() == self.baseSymbol.casefold():
-        units = units[:-1]
-      try:
-        suffix = units[-1].casefold()
-      except IndexError:
-        raise ValueError('units string cannot be empty')
-      try:
-        scalar = float(units[:-1]) if suffix.isalpha() else float(units)
-      except ValueError:
-        raise ValueError('units string must contain a valid number')
-      if suffix.isalpha():
-        if suffix in self._suffixTable:
-          scalar *= self._suffixTable[suffix]
-          self.origSuffix = suffix
-        else:
-          raise ValueError(f"Invalid suffix: '{suffix}'")
-      self.value = scalar
+      self.value, suffix = parseUnits(units, baseSymbol)
+      if suffix is not None:
+        self.origSuffix = suffix
     elif isinstance(units, (int, float)):
       self.value = units
 
+  def _new(self, value):
+    """Return a number of the same unit with the given value.
+
+    The fast path for arithmetic, skipping the parsing done by __init__.
+    """
+    number = object.__new__(self.__class__)
+    number.value = value
+    number.baseSymbol = self.baseSymbol
+    return number
+
   def __repr__(self):
     return f'{self.__class__.__name__}({self.value!r})'
 
   def __str__(self):
-    # Adapted from https://stackoverflow.com/a/29749228/1208424
-    if self.value == 0:
-      return f'0{self.baseSymbol}'
-
-    # Limit to TW
-    power = min(12, math.floor(math.log10(abs(self.value))))
-    d, m = divmod(power, 3)
-    reduced = self.value * 10**(m - power)
-
-    return f"{reduced:.4} {' kMGT'[d] if d > 0 else ''}{self.baseSymbol}"
+    return _siFormat(self.value, self.baseSymbol)
 
   @_unitOrNumber
   def __eq__(self, other) -> bool:
@@ -181,31 +298,44 @@ class SINumber():
   def __bool__(self) -> bool:
     return bool(self.value)
 
-  @_unitOrNumber
+  # The most common operations are written out rather than decorated, as
+  # they are used on every craft. UnitArrays handle mixed operations.
+
   def __add__(self, other):
-    return self.__class__(self.value + other)
+    if isinstance(other, SINumber):
+      other = other.value
+    elif isinstance(other, UnitArray):
+      return NotImplemented
+    return self._new(self.value + other)
   __radd__ = __add__
 
-  @_unitOrNumber
   def __sub__(self, other):
-    return self.__class__(self.value - other)
+    if isinstance(other, SINumber):
+      other = other.value
+    elif isinstance(other, UnitArray):
+      return NotImplemented
+    return self._new(self.value - other)
 
-  @_unitOrNumber
   def __rsub__(self, other):
-    return self.__class__(other - self.value)
+    return self._new(other - self.value)
 
-  @_unitOrNumber
   def __mul__(self, other):
-    return self.__class__(self.value * other)
+    if isinstance(other, SINumber):
+      other = other.value
+    elif isinstance(other, UnitArray):
+      return NotImplemented
+    return self._new(self.value * other)
   __rmul__ = __mul__
 
-  @_unitOrNumber
   def __truediv__(self, other):
-    return self.__class__(self.value / other)
+    if isinstance(other, SINumber):
+      other = other.value
+    elif isinstance(other, UnitArray):
+      return NotImplemented
+    return self._new(self.value / other)
 
-  @_unitOrNumber
   def __rtruediv__(self, other):
-    return self.__class__(other / self.value)
+    return self._new(other / self.value)
 
   @_unitOrNumber
   def __floordiv__(self, other):
@@ -303,6 +433,8 @@ class SINumber():
 class Watt(SINumber):
   """A class representing a Watt unit supporting SI suffixes."""
 
+  __slots__ = ()
+
   def __init__(self, watts: Union[str, int, float]):
     super().__init__(watts, 'W')
 
@@ -310,5 +442,157 @@ class Watt(SINumber):
 class Joule(SINumber):
   """A class representing a Joule unit supporting SI suffixes."""
 
+  __slots__ = ()
+
   def __init__(self, joules: Union[str, int, float]):
-    super().__init__(joules, 'J')
\ No newline at end of file
+    super().__init__(joules, 'J')
+
+
+class UnitArray():
+  """A NumPy array of quantities of one unit, e.g. the power draw of every
+  machine in a factory.
+
+  The vector counterpart of SINumber, supporting the same arithmetic with
+  numbers, arrays, SINumbers and other UnitArrays, always done on the whole
+  array at once. Indexing with an integer returns the scalar unit type,
+  e.g. a Watt for a WattArray; slicing returns a UnitArray.
+
+  Attributes
+  ----------
+  value: numpy.ndarray
+      The quantities, in the base unit.
+
+  baseSymbol: str
+      Short string representing the base unit, e.g. 'W' for Watts.
+  """
+
+  __slots__ = ('value', 'baseSymbol')
+
+  # The scalar type of the elements; None for plain SINumbers
+  scalar = None
+
+  # Make NumPy defer to the reflected operators of this class, rather than
+  # treating it as an object to broadcast over
+  __array_ufunc__ = None
+
+  def __init__(self, units, baseSymbol: str):
+    """
+    Parameters
+    ----------
+    units: array_like or Iterable of str, SINumber, int or float
+        The quantities, either as numbers in the base unit or in any form
+        SINumber accepts.
+
+    baseSymbol: str
+        Short string representing the base unit.
+    """
+    self.baseSymbol = baseSymbol
+    if isinstance(units, UnitArray):
+      units = units.value
+    elif not isinstance(units, np.ndarray):
+      units = list(units)
+      if all(isinstance(x, str) for x in units):
+        units = parseUnitsMany(units, baseSymbol)
+      else:
+        units = [parseUnits(x, baseSymbol)[0] if isinstance(x, str)
+                 else x.value if isinstance(x, SINumber) else x
+                 for x in units]
+    self.value = np.asarray(units, dtype=float)
+
+  def _new(self, value):
+    """Return an array of the same unit with the given values."""
+    array = object.__new__(self.__class__)
+    array.value = value
+    array.baseSymbol = self.baseSymbol
+    return array
+
+  def _element(self, value: float) -> SINumber:
+    if self.scalar is None:
+      return SINumber(value, self.baseSymbol)
+    return self.scalar(value)
+
+  @staticmethod
+  def _operand(other):
+    """Return the numeric value of the other side of an operation."""
+    if isinstance(other, (SINumber, UnitArray)):
+      return other.value
+    return other
+
+  def __repr__(self):
+    return f'{self.__class__.__name__}({self.value.tolist()!r})'
+
+  def __str__(self):
+    return ('[' + ', '.join(_siFormat(x, self.baseSymbol)
+                            for x in self.value.tolist()) + ']')
+
+  def __array__(self, dtype=None, copy=None):
+    return self.value if dtype is None else self.value.astype(dtype)
+
+  def __len__(self) -> int:
+    return len(self.value)
+
+  def __iter__(self):
+    return map(self._element, self.value.tolist())
+
+  def __getitem__(self, key):
+    value = self.value[key]
+    if np.ndim(value):
+      return self._new(value)
+    return self._element(float(value))
+
+  def __eq__(self, other) -> np.ndarray:
+    return self.value == self._operand(other)
+
+  __hash__ = None
+
+  def __add__(self, other):
+    return self._new(self.value + self._operand(other))
+  __radd__ = __add__
+
+  def __sub__(self, other):
+    return self._new(self.value - self._operand(other))
+
+  def __rsub__(self, other):
+    return self._new(self._operand(other) - self.value)
+
+  def __mul__(self, other):
+    return self._new(self.value * self._operand(other))
+  __rmul__ = __mul__
+
+  def __truediv__(self, other):
+    return self._new(self.value / self._operand(other))
+
+  def __rtruediv__(self, other):
+    return self._new(self._operand(other) / self.value)
+
+  def __neg__(self):
+    return self._new(-self.value)
+
+  def __abs__(self):
+    return self._new(abs(self.value))
+
+  def sum(self) -> SINumber:
+    """Return the total of the quantities as a scalar unit number."""
+    return self._element(float(self.value.sum()))
+
+
+class WattArray(UnitArray):
+  """A class representing an array of Watts; see UnitArray."""
+
+  __slots__ = ()
+
+  scalar = Watt
+
+  def __init__(self, watts):
+    super().__init__(watts, 'W')
+
+
+class JouleArray(UnitArray):
+  """A class representing an array of Joules; see UnitArray."""
+
+  __slots__ = ()
+
+  scalar = Joule
+
+  def __init__(self, joules):
+    super().__init__(joules, 'J')
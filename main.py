@@ -1,3 +1,5 @@
+import argparse
+import asyncio
 import configparser
 import logging
 from pathlib import Path
@@ -9,6 +11,8 @@ import factoratio.fuel as fuel
 import factoratio.item as item
 import factoratio.producer as producer
 import factoratio.prototype as prototype
+import factoratio.query as query
+import factoratio.server as server
 import factoratio.util as util
 from factoratio.util import Joule, Watt
 
@@ -30,26 +34,100 @@ def readConfig(cfg: Path) -> configparser.ConfigParser:
   config.read(cfg)
   return config
 
+def parseArgs(argv=None) -> argparse.Namespace:
+  """Parse Factoratio's command line arguments."""
+  parser = argparse.ArgumentParser(prog=APPNAME.lower())
+  parser.add_argument('--config', type=Path,
+                      help='configuration file to read (default: '
+                           f'{APPNAME}.ini in the user configuration directory)')
+  parser.add_argument('--gamedir', type=Path,
+                      help='Factorio installation to load prototypes from, '
+                           'overriding the configuration')
+  parser.add_argument('--no-cache', dest='cache', action='store_false',
+                      default=None, help='do not use the prototype cache')
+  parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                      help='answer JSON Lines queries read from FILE, or from '
+                           'standard input if no FILE is given; see '
+                           'factoratio/query.py')
+  parser.add_argument('-o', '--output', type=Path,
+                      help='write batch answers to this file instead of '
+                           'standard output')
+  parser.add_argument('--serve', action='store_true',
+                      help='keep running, answering queries over a local '
+                           'socket; see factoratio/server.py')
+  parser.add_argument('--host', default=server.HOST,
+                      help='address to serve on (default: %(default)s)')
+  parser.add_argument('--port', type=int, default=server.PORT,
+                      help='TCP port to serve on (default: %(default)s)')
+  parser.add_argument('--socket', type=Path,
+                      help='serve on this Unix socket instead of a TCP port')
+  parser.add_argument('--watch', type=float, default=server.WATCH_INTERVAL,
+                      help='seconds between checks for changed prototype '
+                           'definitions while serving; 0 turns reloading off '
+                           '(default: %(default)s)')
+  parser.add_argument('--cache-size', type=int, default=server.CACHE_SIZE,
+                      help='answers kept by the service and each of its '
+                           'workers; 0 turns caching off (default: '
+                           '%(default)s)')
+  parser.add_argument('--cache-ttl', type=float,
+                      help='seconds to keep each served answer (default: '
+                           'until the prototypes are reloaded)')
+  parser.add_argument('-j', '--workers', type=int, default=1,
+                      help='worker processes answering batch or served '
+                           'queries (default: %(default)s)')
+  parser.add_argument('-v', '--verbose', action='store_true',
+                      help='log debug messages to the console')
+  return parser.parse_args(argv)
+
 if __name__ == "__main__":
+  args = parseArgs()
   configDir = util.getConfigPath()
   if not configDir.exists(): configDir.mkdir()
 
   # Set up logging
   # TODO: formatting
-  logger.setLevel(logging.DEBUG) # TEMP
-  logger.addHandler(logging.StreamHandler())
+  # Batch answers go to stdout, so the console only gets log messages, on
+  # stderr
+  logger.setLevel(logging.DEBUG)
+  console = logging.StreamHandler()
+  console.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+  logger.addHandler(console)
   logPath = util.getConfigPath(Path(f'{APPNAME}.log'))
   logger.addHandler(logging.FileHandler(logPath))
 
-  # TODO: check for --config option. use argparse
-  configPath = util.getConfigPath(f'{APPNAME}.ini')
+  configPath = args.config or util.getConfigPath(f'{APPNAME}.ini')
   config = readConfig(configPath)
-  factorioPath = config.get(APPNAME, 'gamedir',
-                            fallback=util.getFactorioPath())
+  factorioPath = args.gamedir or config.get(APPNAME, 'gamedir',
+                                            fallback=util.getFactorioPath())
   if factorioPath is None:
     logger.error('Could not determine Factorio install location.')
-    factorioPath = Path(input('Enter path to Factorio installation: '))
-  protoPath = factorioPath / 'data' / 'base' / 'prototypes'
-  prototypes = prototype.initialize(protoPath)
+    if args.batch == '-':
+      # Standard input holds the queries
+      sys.exit('Pass --gamedir or set gamedir in the configuration.')
+    factorioPath = input('Enter path to Factorio installation: ')
+  protoPath = Path(factorioPath) / 'data' / 'base' / 'prototypes'
+  useCache = args.cache
+  if useCache is None:
+    useCache = config.getboolean(APPNAME, 'cache', fallback=True)
+  parallel = config.getboolean(APPNAME, 'parallel', fallback=True)
+  prototypes = prototype.initialize(protoPath, useCache, parallel)
+
+  if args.batch is not None:
+    source = (sys.stdin if args.batch == '-'
+              else open(args.batch, encoding='utf-8'))
+    sink = (args.output.open('w', encoding='utf-8') if args.output
+            else sys.stdout)
+    with source, sink:
+      failed = query.run(prototypes, source, sink, args.workers)
+    sys.exit(1 if failed else 0)
+
+  if args.serve:
+    service = server.Server(prototypes, args.workers, args.cache_size,
+                            args.watch, args.cache_ttl)
+    try:
+      asyncio.run(service.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+      logger.info('Stopped serving')
+    sys.exit(0)
 
   pass